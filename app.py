@@ -1,6 +1,7 @@
 import json, re, os
 import uvicorn, glob, uvicorn
 from dotenv import load_dotenv
+from erendil.database.trade_journal import read_trade_log
 from fastapi import FastAPI, Request
 from datetime import datetime, timedelta
 from fastapi.staticfiles import StaticFiles
@@ -21,17 +22,19 @@ templates = Jinja2Templates(directory="templates")
 def read_trading_logs():
     data = {}
     pattern = r'([A-Z]+USDT)_(\w+)_log_file\.json'
-    for filename in glob.glob("*_log_file.json"):
+    # A bot's first trades may still only be in its journal
+    journaled = [name.replace(".journal.jsonl", ".json") for name in glob.glob("*_log_file.journal.jsonl")]
+    for filename in sorted(set(glob.glob("*_log_file.json") + journaled)):
         match = re.match(pattern, filename)
         if match:
             pair = match.group(1)
             interval = match.group(2)
             try:
-                with open(filename, 'r') as f:
-                    content = json.load(f)
-                    if content:
-                        key = f"{pair}_{interval}"
-                        data[key] = content
+                # Snapshot plus any trades journaled since
+                content = read_trade_log(filename)
+                if content:
+                    key = f"{pair}_{interval}"
+                    data[key] = content
             except json.JSONDecodeError as e:
                 print(f"Error reading {filename}: {e}")
                 continue
@@ -0,0 +1,19 @@
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta, timezone
+
+
+def make_history(n: int, seed: int = 0, volatility: float = 0.002) -> pl.DataFrame:
+    """Random-walk 1m candles (open_time, open/high/low/close, close_time), oldest first"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    open_time = pl.datetime_range(start, start + timedelta(minutes=n - 1), "1m", eager=True, time_zone="UTC")
+    return pl.DataFrame({
+        "open_time": open_time,
+        "open": close,
+        "high": close * (1 + np.abs(rng.normal(0, volatility / 2, n))),
+        "low": close * (1 - np.abs(rng.normal(0, volatility / 2, n))),
+        "close": close,
+        "close_time": open_time + timedelta(seconds=59, milliseconds=999),
+    })
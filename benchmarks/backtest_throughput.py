@@ -0,0 +1,29 @@
+"""
+Backtest throughput over a long synthetic candle history.
+
+    uv run python -m benchmarks.backtest_throughput
+
+Trade parity with the live TradeManager is checked by tests/test_backtest.py.
+"""
+import time
+import logging
+
+from erendil.backtest.backtester import Backtester
+from benchmarks._data import make_history
+
+
+CANDLES = 2_000_000
+
+
+def main():
+    logging.disable(logging.INFO)
+    history = make_history(CANDLES, seed=7, volatility=0.004)
+    start = time.perf_counter()
+    result = Backtester().run(history)
+    elapsed = time.perf_counter() - start
+    print(f"{CANDLES} candles in {elapsed:.2f}s "
+          f"({CANDLES / elapsed * 60 / 1e6:.0f}M candles/min), stats: {result.stats}")
+
+
+if __name__ == "__main__":
+    main()
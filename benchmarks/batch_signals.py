@@ -0,0 +1,65 @@
+"""
+Close-time signal evaluation for many symbols: one process_data call per symbol vs one
+process_batch call over the symbols x time matrix.
+
+    uv run python -m benchmarks.batch_signals
+
+That the batch rows equal the per-symbol results is checked by tests/test_batch.py.
+"""
+import time
+import numpy as np
+import polars as pl
+
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.trailing_stop import TrailingStoploss
+
+
+CANDLES = 1000
+SYMBOLS = [10, 100, 500]
+
+
+def make_frames(symbols: int, n: int):
+    rng = np.random.default_rng(symbols)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (symbols, n)), axis=1))
+    high = close * (1 + np.abs(rng.normal(0, 0.001, close.shape)))
+    low = close * (1 - np.abs(rng.normal(0, 0.001, close.shape)))
+    return [pl.DataFrame({"high": high[i], "low": low[i], "close": close[i]}) for i in range(symbols)]
+
+
+def per_symbol(indicator: BuySellIndicator, stoploss: TrailingStoploss, frames):
+    results = []
+    for df in frames:
+        hist_buy, hist_sell = indicator.process_data(df)
+        _, current_ts, _ = stoploss.process_data(df)
+        results.append((hist_buy, hist_sell, current_ts))
+    return results
+
+
+def batched(indicator: BuySellIndicator, stoploss: TrailingStoploss, frames):
+    high = np.stack([df['high'].to_numpy() for df in frames])
+    low = np.stack([df['low'].to_numpy() for df in frames])
+    close = np.stack([df['close'].to_numpy() for df in frames])
+    hist_buy, hist_sell = indicator.process_batch(high, low, close)
+    ts = stoploss.process_batch(high, low, close)
+    return [(hist_buy[i], hist_sell[i], ts[i, -1]) for i in range(len(frames))]
+
+
+def main():
+    indicator, stoploss = BuySellIndicator(), TrailingStoploss()
+    print(f"{'symbols':>8} {'per symbol (ms)':>16} {'batch (ms)':>11} {'speedup':>8}")
+    for symbols in SYMBOLS:
+        frames = make_frames(symbols, CANDLES)
+
+        start = time.perf_counter()
+        per_symbol(indicator, stoploss, frames)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched(indicator, stoploss, frames)
+        batch = time.perf_counter() - start
+
+        print(f"{symbols:>8} {loop * 1000:16.1f} {batch * 1000:11.1f} {loop / batch:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
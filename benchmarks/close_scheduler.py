@@ -0,0 +1,96 @@
+"""
+Close-to-decision latency when every symbol closes on the same boundary.
+
+    uv run python -m benchmarks.close_scheduler [symbols...]
+
+Every symbol closes at once, as on the top of the minute, and recomputes
+a 2000-candle history; one in ten holds an open position. Starting every
+close immediately (the feed's create_task per close) is compared with the
+CloseScheduler. Exits non-zero if any close goes unhandled.
+"""
+import sys
+import time
+import asyncio
+import logging
+import tempfile
+import numpy as np
+
+from erendil.trading.scheduler import CloseScheduler
+from erendil.trading.trade_manager import TradeManager
+from benchmarks._data import make_history
+
+
+CANDLES = 2_000
+ROUNDS = 5
+
+
+def make_managers(directory: str, count: int) -> list:
+    managers = []
+    for i in range(count):
+        manager = TradeManager(f"SYM{i}USDT", "1m", incremental=False,
+                               log_file=f"{directory}/{i}_log_file.json", db_path=f"{directory}/{i}.db")
+        if i % 10 == 0:
+            manager.position_log.position, manager.position_log.entry_price = 1.0, 100.0
+        managers.append(manager)
+    return managers
+
+
+async def herd(managers, frames) -> dict:
+    latencies = {}
+
+    async def close(manager, df, received):
+        await manager.handle_candle_close(df)
+        latencies[manager.symbol] = time.monotonic() - received
+
+    received = time.monotonic()
+    await asyncio.gather(*(close(m, df, received) for m, df in zip(managers, frames)))
+    return latencies
+
+
+async def scheduled(managers, frames, scheduler: CloseScheduler) -> dict:
+    callbacks = [scheduler.callback(m) for m in managers]
+    for onclose, df in zip(callbacks, frames):
+        await onclose(df)
+    await scheduler.join()
+    return {m.symbol: scheduler.latencies[f"{m.symbol}_1m"][-1] for m in managers}
+
+
+def report(name: str, rounds: list, managers: list) -> None:
+    held = {m.symbol for m in managers if m.position_log.position > 0}
+    every = np.array([lat for latencies in rounds for lat in latencies.values()]) * 1e3
+    open_ = np.array([lat for latencies in rounds for s, lat in latencies.items() if s in held]) * 1e3
+    print(f"  {name}: all p50 {np.percentile(every, 50):.0f}ms p99 {np.percentile(every, 99):.0f}ms; "
+          f"open positions p50 {np.percentile(open_, 50):.0f}ms p99 {np.percentile(open_, 99):.0f}ms")
+
+
+async def run(symbols: int) -> bool:
+    histories = [make_history(CANDLES + ROUNDS, i) for i in range(symbols)]
+    with tempfile.TemporaryDirectory() as directory:
+        managers = make_managers(directory, symbols)
+        for manager in managers:
+            await manager.initialize()
+        scheduler = CloseScheduler(max_concurrent=8)
+        herd_rounds, scheduled_rounds = [], []
+        for r in range(ROUNDS):
+            frames = [history.slice(r, CANDLES) for history in histories]
+            herd_rounds.append(await herd(managers, frames))
+            scheduled_rounds.append(await scheduled(managers, frames, scheduler))
+        for manager in managers:
+            await manager.close()
+
+    print(f"{symbols} symbols closing together:")
+    report("create_task per close", herd_rounds, managers)
+    report("CloseScheduler", scheduled_rounds, managers)
+    return scheduler.stats["handled"] == symbols * ROUNDS and scheduler.stats["failed"] == 0
+
+
+def main():
+    logging.disable(logging.INFO)
+    counts = [int(n) for n in sys.argv[1:]] or [100, 200, 400]
+    ok = all(asyncio.run(run(count)) for count in counts)
+    print(f"closes {'all handled' if ok else 'MISSING'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Close-to-signal latency of many symbols closing together, thread against process pool.
+
+    uv run python -m benchmarks.compute_executor [symbols] [workers...]
+
+Every symbol holds a 5000-candle history; each round appends one candle
+to all of them and waits for every signal. The process pool's signals
+must match the thread's; exits non-zero on any difference.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import tempfile
+import numpy as np
+
+from erendil.trading.compute import SIGNAL_TAIL, ComputeExecutor
+from erendil.trading.trade_manager import TradeManager
+from benchmarks._data import make_history
+
+
+CANDLES = 5_000
+ROUNDS = 10
+
+
+async def run(managers, histories, executor: ComputeExecutor) -> tuple:
+    latencies, results = [], []
+    for r in range(ROUNDS):
+        # Sliding window, like the feed's ring buffer
+        frames = [history.slice(r + 1, CANDLES) for history in histories]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(executor.signals(m, df) for m, df in zip(managers, frames)))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies[1:]), results
+
+
+def main():
+    logging.disable(logging.INFO)
+    symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    workers = [int(w) for w in sys.argv[2:]] or sorted({1, os.cpu_count() or 1})
+    histories = [make_history(CANDLES + ROUNDS, i) for i in range(symbols)]
+
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        managers = [
+            TradeManager(f"SYM{i}USDT", "1m", incremental=False,
+                         log_file=f"{directory}/{i}_log_file.json", db_path=f"{directory}/{i}.db")
+            for i in range(symbols)
+        ]
+        executor = ComputeExecutor("thread")
+        latencies, expected = asyncio.run(run(managers, histories, executor))
+        print(f"thread: {symbols} closes in p50 {np.median(latencies) * 1e3:.0f}ms")
+
+        for count in workers:
+            executor = ComputeExecutor("process", count)
+            latencies, results = asyncio.run(run(managers, histories, executor))
+            print(f"process x{count}: {symbols} closes in p50 {np.median(latencies) * 1e3:.0f}ms, {executor.stats}")
+            executor.close()
+            for (buy, sell, ts), (exp_buy, exp_sell, exp_ts) in zip(results, expected):
+                ok &= np.allclose(buy, exp_buy[-SIGNAL_TAIL:]) and np.allclose(sell, exp_sell[-SIGNAL_TAIL:])
+                ok &= np.isclose(ts, exp_ts)
+
+    print(f"process signals {'match' if ok else 'DIFFER'} ({os.cpu_count()} cores here)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Hourly strategy backtest with the trailing stop checked on candle closes vs along 1m candles.
+
+    uv run python -m benchmarks.intrabar_backtest
+
+The 1m candles are written to a kline cache snapshot and streamed back in
+chunks, as a year of fine data would be.
+"""
+import time
+import tempfile
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta, timezone
+
+from erendil.backtest.backtester import Backtester
+from erendil.backtest.intrabar import PATHS, IntrabarStops
+from erendil.database.kline_store import KlineStore
+from erendil.exchange.klines import KLINE_COLUMNS
+
+
+MINUTES = 365 * 24 * 60
+CHUNK_ROWS = 50_000
+
+
+def make_minutes(n: int) -> pl.DataFrame:
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    open_time = pl.datetime_range(start, start + timedelta(minutes=n - 1), "1m", eager=True, time_zone="UTC")
+    return pl.DataFrame({
+        "open_time": open_time,
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0003, n))),
+        "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0003, n))),
+        "close": close,
+        "volume": np.ones(n),
+        "close_time": open_time + timedelta(seconds=59, milliseconds=999),
+        "quote_volume": close,
+        "trades": np.ones(n, dtype=np.int64),
+        "taker_buy_volume": np.ones(n) / 2,
+        "taker_buy_quote_volume": close / 2,
+    }).select(KLINE_COLUMNS)
+
+
+def to_hours(minutes: pl.DataFrame) -> pl.DataFrame:
+    return (
+        minutes.group_by_dynamic("open_time", every="1h")
+        .agg(
+            pl.col("open").first(), pl.col("high").max(), pl.col("low").min(),
+            pl.col("close").last(), pl.col("close_time").last(),
+        )
+    )
+
+
+def main():
+    minutes = make_minutes(MINUTES)
+    hours = to_hours(minutes)
+    backtester = Backtester()
+
+    with tempfile.TemporaryDirectory() as directory:
+        KlineStore(directory, "TESTUSDT", "1m").save(minutes)
+        del minutes
+
+        print(f"{'stop check':>22} {'pnl':>10} {'stop exits':>11} {'time (s)':>9} {'chunks read':>12}")
+        start = time.perf_counter()
+        result = backtester.run(hours)
+        exits = sum(t["action"] == "SELL_SECOND" for t in result.trades)
+        print(f"{'hourly close':>22} {result.stats['pnl']:10.2f} {exits:>11} {time.perf_counter() - start:9.2f} {'-':>12}")
+
+        for path in PATHS:
+            intrabar = IntrabarStops.from_store(directory, "TESTUSDT", "1m", path=path, chunk_rows=CHUNK_ROWS)
+            start = time.perf_counter()
+            result = backtester.run(hours, intrabar)
+            exits = sum(t["action"] == "SELL_SECOND" for t in result.trades)
+            print(f"{'1m ' + path:>22} {result.stats['pnl']:10.2f} {exits:>11} "
+                  f"{time.perf_counter() - start:9.2f} {intrabar.chunks_loaded:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Startup ingestion benchmark: per-row KlineData models vs the columnar path.
+
+    uv run python -m benchmarks.kline_ingest
+"""
+import time
+import polars as pl
+from datetime import datetime, timezone
+
+from erendil.models.data_models import KlineData
+from erendil.exchange.binance import BinanceKlineManager
+from erendil.exchange.klines import klines_to_polars, merge_klines
+
+
+BATCH_SIZE = 1000
+SIZES = [5_000, 50_000, 500_000]
+
+
+def make_raw_batches(n: int):
+    """Build REST-shaped kline arrays in batches of 1000, newest batch first"""
+    start = 1_700_000_000_000
+    rows = [
+        [
+            start + i * 60_000, "1.2345", "1.3000", "1.1000", "1.2500", "100.50",
+            start + i * 60_000 + 59_999, "125.60", 42, "50.10", "60.20", "0"
+        ]
+        for i in range(n)
+    ]
+    batches = [rows[i:i + BATCH_SIZE] for i in range(0, n, BATCH_SIZE)]
+    return batches[::-1]
+
+
+def legacy_ingest(manager: BinanceKlineManager, batches) -> pl.DataFrame:
+    all_klines = []
+    for data in batches:
+        all_klines.extend(
+            KlineData(
+                open_time=datetime.fromtimestamp(k[0] / 1000, tz=timezone.utc),
+                open=float(k[1]),
+                high=float(k[2]),
+                low=float(k[3]),
+                close=float(k[4]),
+                volume=float(k[5]),
+                close_time=datetime.fromtimestamp(k[6] / 1000, tz=timezone.utc),
+                quote_volume=float(k[7]),
+                trades=int(k[8]),
+                taker_buy_volume=float(k[9]),
+                taker_buy_quote_volume=float(k[10])
+            )
+            for k in data
+        )
+    dfs = [manager.kline_to_polars(kline) for kline in all_klines]
+    return pl.concat(dfs).sort("open_time").unique(subset=["open_time"])
+
+
+def columnar_ingest(batches) -> pl.DataFrame:
+    return merge_klines([klines_to_polars(data) for data in batches])
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    manager = BinanceKlineManager("btcusdt", "1m", None, None)
+    print(f"{'candles':>10} {'legacy (s)':>12} {'columnar (s)':>14} {'speedup':>9}")
+    for n in SIZES:
+        batches = make_raw_batches(n)
+        # The legacy path takes minutes at 500k, so it is extrapolated from 50k
+        if n <= 50_000:
+            legacy = timed(legacy_ingest, manager, batches)
+            legacy_label = f"{legacy:12.3f}"
+        else:
+            legacy = legacy * (n / 50_000)
+            legacy_label = f"~{legacy:11.1f}"
+        columnar = timed(columnar_ingest, batches)
+        print(f"{n:>10} {legacy_label} {columnar:14.3f} {legacy / columnar:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
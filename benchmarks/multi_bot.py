@@ -0,0 +1,97 @@
+"""
+Memory and CPU per bot when many bots share one process, against the local simulator.
+
+    uv run python -m benchmarks.multi_bot --bots 100 --speed 60 --seconds 20
+
+Bots are added in two waves while the feed runs, then half are removed.
+The cost of one extra bot is compared with a fresh interpreter that has
+imported what main.py needs, i.e. the least a process per bot costs.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+PORT = 8765
+os.environ.setdefault("BINANCE_BASE_URL", f"http://127.0.0.1:{PORT}")
+os.environ.setdefault("BINANCE_WS_URL", f"ws://127.0.0.1:{PORT}/ws")
+os.environ.setdefault("BINANCE_STREAM_URL", f"ws://127.0.0.1:{PORT}/stream")
+from erendil.exchange.rest import close_http_client
+from erendil.simulator.server import BinanceSimulator, SimulatorConfig
+from erendil.trading.runtime import BotConfig, BotRuntime, RuntimeConfig
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def process_baseline_mb() -> float:
+    code = (
+        "import main, polars, numpy\n"
+        "from erendil.trading.trade_manager import TradeManager\n"
+        "for line in open('/proc/self/status'):\n"
+        "    line.startswith('VmRSS:') and print(int(line.split()[1]) / 1024)\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    return float(subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True).stdout)
+
+
+async def run(args: argparse.Namespace) -> None:
+    logging.basicConfig(level=logging.ERROR)
+    simulator = BinanceSimulator(SimulatorConfig(speed=args.speed, ticks_per_candle=args.ticks))
+    runner = await simulator.start("127.0.0.1", PORT)
+    bots = [BotConfig(f"SIM{i:04d}USDT", args.interval, limit=args.limit) for i in range(args.bots)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        runtime = BotRuntime(RuntimeConfig(bots=[], data_dir=directory, cache_dir=None))
+        await runtime.start()
+        empty = rss_mb()
+
+        await runtime.apply(bots[:args.bots // 2])
+        await asyncio.sleep(args.seconds / 2)
+        half = rss_mb()
+        cpu = time.process_time()
+        await runtime.apply(bots)
+        started = time.perf_counter()
+        await asyncio.sleep(args.seconds / 2)
+        cpu = (time.process_time() - cpu) / (time.perf_counter() - started)
+        full = rss_mb()
+
+        await runtime.apply(bots[:args.bots // 2])
+        running = len(runtime.bots)
+        stopping = time.perf_counter()
+        await runtime.stop()
+        stopped = time.perf_counter() - stopping
+        await close_http_client()
+        await runner.cleanup()
+
+    per_bot = (full - half) / (args.bots - args.bots // 2)
+    baseline = process_baseline_mb()
+    print(f"RSS: runtime {empty:.0f}MB, {args.bots // 2} bots {half:.0f}MB, {args.bots} bots {full:.0f}MB")
+    print(f"per extra bot: {per_bot:.2f}MB vs {baseline:.0f}MB for a process per bot "
+          f"({per_bot / baseline:.1%}); CPU {cpu:.0%} of a core for {args.bots} bots, simulator included")
+    print(f"{running} bots running after removing half, stopped in {stopped:.2f}s; simulator: {simulator.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--speed", type=float, default=60.0)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
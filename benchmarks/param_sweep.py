@@ -0,0 +1,42 @@
+"""
+Parameter sweep throughput over a synthetic candle history.
+
+    uv run python -m benchmarks.param_sweep [processes]
+"""
+import sys
+import time
+
+from erendil.backtest.sweep import expand_grid, sweep
+from benchmarks._data import make_history
+
+
+CANDLES = 200_000
+GRID = {
+    "fast_length": [8, 12, 16],
+    "slow_length": [21, 26, 34],
+    "signal_length": [7, 9],
+    "atr_avg_length": [10, 12],
+    "smoothing_length": [10, 14],
+    "atr_period": [5, 10],
+    "hhv_period": [10, 20],
+    "multiplier": [2.0, 2.5, 3.0],
+}
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    history = make_history(CANDLES)
+    indicators, stoplosses = expand_grid(GRID)
+    combinations = len(indicators) * len(stoplosses)
+
+    start = time.perf_counter()
+    results = sweep(history, GRID, processes=processes)
+    elapsed = time.perf_counter() - start
+
+    print(results.head(10))
+    print(f"{combinations} combinations x {CANDLES} candles in {elapsed:.1f}s "
+          f"({combinations * CANDLES / elapsed / 1e6:.1f}M candle-combinations/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+EMA / RMA / Wilder ATR recurrence kernels: time of every backend.
+
+    uv run python -m benchmarks.recurrence_kernels
+
+Their parity with the reference loop is checked by tests/test_kernels.py.
+"""
+import time
+import numpy as np
+
+from erendil.indicators import kernels
+
+
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def make_series(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+
+
+def timings() -> None:
+    print(f"active backend: {kernels.active_backend}")
+    print(f"{'candles':>10}" + "".join(f"{name + ' (ms)':>15}" for name in kernels.BACKENDS))
+    for n in SIZES:
+        x = make_series(n)
+        cells = []
+        for backend in kernels.BACKENDS:
+            if backend == "python" and n > 100_000:
+                cells.append(f"{'-':>15}")
+                continue
+            kernels.recurrence(x[:10], 0.1, backend)  # warm up (JIT compile)
+            start = time.perf_counter()
+            kernels.recurrence(x, 0.1, backend)
+            cells.append(f"{(time.perf_counter() - start) * 1000:15.2f}")
+        print(f"{n:>10}" + "".join(cells))
+
+
+def main():
+    timings()
+
+
+if __name__ == "__main__":
+    main()
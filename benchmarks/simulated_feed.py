@@ -0,0 +1,87 @@
+"""
+Offline load test: many symbols over one combined stream against the local simulator.
+
+    uv run python -m benchmarks.simulated_feed --symbols 200 --speed 60 --seconds 20
+"""
+import os
+import time
+import asyncio
+import argparse
+import numpy as np
+
+PORT = 8765
+os.environ.setdefault("BINANCE_BASE_URL", f"http://127.0.0.1:{PORT}")
+os.environ.setdefault("BINANCE_WS_URL", f"ws://127.0.0.1:{PORT}/ws")
+os.environ.setdefault("BINANCE_STREAM_URL", f"ws://127.0.0.1:{PORT}/stream")
+from erendil.exchange.rest import close_http_client
+from erendil.exchange.binance import BinanceExchange, BinanceKlineManager
+from erendil.simulator.server import BinanceSimulator, SimulatorConfig
+
+
+async def run(args: argparse.Namespace) -> None:
+    simulator = BinanceSimulator(SimulatorConfig(speed=args.speed, ticks_per_candle=args.ticks))
+    runner = await simulator.start("127.0.0.1", PORT)
+    exchange = BinanceExchange()
+    latencies = []
+    closes = 0
+
+    route = exchange._route_message
+
+    async def timed_route(message: str) -> None:
+        # Frame latency: simulated emission time (E) to the end of handling
+        await route(message)
+        start = message.find('"E":') + 4
+        if start < 4:
+            return  # SUBSCRIBE response
+        event_time = int(message[start:message.find(",", start)])
+        latencies.append(time.monotonic() - simulator.clock.monotonic_at(event_time))
+
+    exchange._route_message = timed_route
+
+    async def on_close(df):
+        nonlocal closes
+        closes += 1
+
+    async def on_message(price):
+        pass
+
+    started = time.perf_counter()
+    managers = [
+        BinanceKlineManager(f"sim{i:04d}usdt", args.interval, on_close, on_message, limit=args.limit)
+        for i in range(args.symbols)
+    ]
+    await asyncio.gather(*(m.fetch_historical_data() for m in managers))
+    print(f"history for {args.symbols} symbols loaded in {time.perf_counter() - started:.2f}s")
+
+    for manager in managers:
+        await exchange.add_manager(manager)
+    feed = asyncio.create_task(exchange.start())
+    await asyncio.sleep(args.seconds)
+    await exchange.stop_all()
+    feed.cancel()
+    await close_http_client()
+    await runner.cleanup()
+
+    lat = np.array(latencies) * 1000
+    print(f"frames handled: {len(lat)} ({len(lat) / args.seconds:,.0f}/s), candle closes: {closes}")
+    if len(lat):
+        print(
+            f"latency ms  p50={np.percentile(lat, 50):.2f}  p99={np.percentile(lat, 99):.2f}  "
+            f"max={lat.max():.2f}"
+        )
+    print(f"simulator: {simulator.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--speed", type=float, default=60.0)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Trade persistence latency as the trades table grows, against the per-trade connection it replaced.
+
+    uv run python -m benchmarks.trade_db [rows]
+
+The table is prefilled with `rows` trades spread over many symbols, then
+single trades and bursts are saved and one symbol's history is read back.
+Exits non-zero if a duplicate is saved or a new trade is not.
+"""
+import sys
+import time
+import sqlite3
+import asyncio
+import tempfile
+import aiosqlite
+import numpy as np
+
+from erendil.database.trade_db import TradeDatabase
+
+
+ROWS = 1_000_000
+SYMBOLS = 200
+SAVES = 200
+BURST = 20
+
+
+def trade(i: int) -> dict:
+    return {
+        "fee": 0.1, "pnl": None, "action": "BUY", "price": 100.0 + i * 1e-4, "signal_reason": "Buy signal detected",
+        "position_size": 1.0, "total_invested": 100.0, "entry_price": 100.0, "remaining_position": 1.0,
+        "total_pnl": None, "timestamp": f"2030-01-01T00:00:{i:012d}",
+    }
+
+
+def prefill(db_path: str, rows: int) -> None:
+    db = sqlite3.connect(db_path)
+    db.executemany(
+        "INSERT INTO trades (symbol, action, price, fee, signal_reason, position_size, total_invested, "
+        "remaining_position, timestamp, trade_hash, interval) VALUES (?, 'BUY', 1, 0.1, 'x', 1, 100, 1, ?, ?, '1m')",
+        ((f"SYM{i % SYMBOLS}USDT", f"2024-01-01T{i:012d}", f"prefill-{i}") for i in range(rows)),
+    )
+    db.commit()
+    db.close()
+
+
+async def save_per_connection(db_path: str, entry: dict, database: TradeDatabase) -> bool:
+    # The old save_trade: connect, look the hash up, insert, commit
+    trade_hash = database._generate_trade_hash(entry)
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("SELECT COUNT(*) FROM trades WHERE trade_hash = ?", (trade_hash,))
+        if (await cursor.fetchone())[0] > 0:
+            return False
+        await db.execute(
+            "INSERT INTO trades (symbol, action, price, fee, pnl, signal_reason, position_size, total_invested, "
+            "entry_price, remaining_position, total_pnl, timestamp, trade_hash, interval) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ("BENCHUSDT", entry["action"], entry["price"], entry["fee"], entry["pnl"], entry["signal_reason"],
+             entry["position_size"], entry["total_invested"], entry["entry_price"], entry["remaining_position"],
+             entry["total_pnl"], entry["timestamp"], trade_hash, "1m"),
+        )
+        await db.commit()
+        return True
+
+
+def report(name: str, latencies: list) -> None:
+    latencies = np.array(latencies) * 1e3
+    print(f"  {name}: p50 {np.percentile(latencies, 50):.2f}ms, p99 {np.percentile(latencies, 99):.2f}ms")
+
+
+async def run(rows: int) -> bool:
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = f"{directory}/trades.db"
+        database = TradeDatabase(db_path)
+        await database.initialize()
+        prefill(db_path, rows)
+        print(f"{rows} trades in the table:")
+
+        latencies = []
+        for i in range(SAVES):
+            start = time.perf_counter()
+            ok &= await save_per_connection(db_path, trade(i), database)
+            latencies.append(time.perf_counter() - start)
+        report("per-trade connection", latencies)
+
+        latencies = []
+        for i in range(SAVES, 2 * SAVES):
+            start = time.perf_counter()
+            ok &= await database.save_trade(trade(i), "BENCHUSDT", "1m")
+            latencies.append(time.perf_counter() - start)
+        report("persistent connection", latencies)
+
+        start = time.perf_counter()
+        for burst in range(SAVES // BURST):
+            base = 2 * SAVES + burst * BURST
+            saved = await asyncio.gather(*(database.save_trade(trade(base + i), "BENCHUSDT", "1m") for i in range(BURST)))
+            ok &= all(saved)
+        elapsed = time.perf_counter() - start
+        print(f"  bursts of {BURST}: {elapsed / SAVES * 1e3:.2f}ms/trade")
+
+        duplicates = await asyncio.gather(*(database.save_trade(trade(i), "BENCHUSDT", "1m") for i in range(BURST)))
+        ok &= not any(duplicates)
+
+        start = time.perf_counter()
+        history = await database.get_trades("SYM7USDT", "1m")
+        print(f"  get_trades: {len(history)} rows in {(time.perf_counter() - start) * 1e3:.1f}ms")
+        await database.close()
+    return ok
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    ok = asyncio.run(run(rows))
+    print(f"duplicate handling {'ok' if ok else 'WRONG'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-trade write latency of the trade journal against the full JSON rewrite it replaced.
+
+    uv run python -m benchmarks.trade_journal
+
+Trades are appended back to back, snapshots included. Also checks that
+the snapshot plus journal tail hold every trade in order, and exits
+non-zero if not.
+"""
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+from pathlib import Path
+
+from erendil.database.trade_journal import TradeJournal, read_trade_log
+
+
+TRADES = (1_000, 5_000, 20_000)
+# The rewrite is quadratic; past this it is not worth waiting for
+REWRITE_MAX = 5_000
+ENTRY = {
+    "fee": 0.1, "pnl": 1.5, "action": "SELL_FIRST", "price": 101.25, "signal_reason": "Sell signal detected",
+    "position_size": 0.5, "total_invested": 100.0, "entry_price": 100.0, "remaining_position": 0.5,
+    "total_pnl": 12.0, "timestamp": "2024-01-01T05:30:00+05:30",
+}
+
+
+def rewrite(log_file: Path, trades: int) -> np.ndarray:
+    # The old _save_trade_entry: read, append, rewrite everything
+    latencies = np.empty(trades)
+    for i in range(trades):
+        start = time.perf_counter()
+        data = {"trades": [], "symbol": "TESTUSDT", "interval": "1m"}
+        if log_file.exists():
+            data = json.loads(log_file.read_text())
+        data["trades"].append(dict(ENTRY, seq=i))
+        log_file.write_text(json.dumps(data, indent=2, default=str))
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def journal(log_file: Path, trades: int, fsync: str) -> np.ndarray:
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync=fsync)
+    latencies = np.empty(trades)
+    for i in range(trades):
+        start = time.perf_counter()
+        journal.append(dict(ENTRY, seq=i))
+        latencies[i] = time.perf_counter() - start
+    journal.close()
+    return latencies
+
+
+def main():
+    ok = True
+    for trades in TRADES:
+        with tempfile.TemporaryDirectory() as directory:
+            timings = {}
+            if trades <= REWRITE_MAX:
+                timings["rewrite"] = rewrite(Path(directory) / "rewrite_log_file.json", trades)
+            for fsync in ("never", "always"):
+                log_file = Path(directory) / f"{fsync}_log_file.json"
+                timings[f"journal fsync={fsync}"] = journal(log_file, trades, fsync)
+                logged = read_trade_log(str(log_file))["trades"]
+                ok &= [trade["seq"] for trade in logged] == list(range(trades))
+
+        print(f"{trades} trades, write latency of the last {trades // 10}:")
+        for name, latencies in timings.items():
+            tail = latencies[-(trades // 10):] * 1e6
+            print(f"  {name}: p50 {np.percentile(tail, 50):.0f}us, p99 {np.percentile(tail, 99):.0f}us, "
+                  f"max {tail.max():.0f}us")
+    print(f"journaled trades {'complete' if ok else 'INCOMPLETE'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+TrailingStoploss.process_data: the per-row loops it replaced vs the O(n) vectorized version.
+
+    uv run python -m benchmarks.trailing_stop
+
+That they agree on every candle is checked by tests/test_trailing_stop.py.
+"""
+import time
+import numpy as np
+import polars as pl
+
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import StoplossParams
+from benchmarks._data import make_history
+
+
+SIZES = [1_000, 20_000, 200_000]
+HHV_PERIODS = [1, 10, 100, 1_000]
+
+
+def loop_process_data(stoploss: TrailingStoploss, df: pl.DataFrame) -> np.ndarray:
+    """The previous implementation: per-row window max and ts recurrence"""
+    close = df['close'].to_numpy()
+    high = df['high'].to_numpy()
+    offset = high - (stoploss.params.multiplier * stoploss.calculate_atr(df))
+
+    highest = np.zeros_like(offset)
+    prev = np.zeros_like(offset)
+    for i in range(len(offset)):
+        start_idx = max(0, i - stoploss.params.hhv_period + 1)
+        highest[i] = np.max(offset[start_idx:i+1])
+        prev[i] = highest[i]
+
+    ts = np.zeros_like(close)
+    for i in range(len(close)):
+        if i < 16:
+            ts[i] = close[i]
+        else:
+            condition = close[i] > highest[i] and close[i] > close[i-1]
+            ts[i] = highest[i] if condition else prev[i]
+        if i + 1 < len(prev):
+            prev[i+1] = ts[i]
+    return ts
+
+
+def main():
+    print(f"{'candles':>9} {'hhv':>6} {'loop (ms)':>11} {'vectorized (ms)':>17} {'speedup':>9}")
+    for n in SIZES:
+        df = make_history(n, seed=n)
+        for hhv in HHV_PERIODS:
+            stoploss = TrailingStoploss(StoplossParams(hhv_period=hhv))
+
+            start = time.perf_counter()
+            loop_process_data(stoploss, df)
+            loop = time.perf_counter() - start
+
+            start = time.perf_counter()
+            stoploss.process_data(df)
+            vectorized = time.perf_counter() - start
+
+            print(f"{n:>9} {hhv:>6} {loop * 1000:11.1f} {vectorized * 1000:17.2f} {loop / vectorized:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
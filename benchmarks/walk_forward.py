@@ -0,0 +1,53 @@
+"""
+Walk-forward optimization over synthetic symbols, then a resume from its checkpoint.
+
+    uv run python -m benchmarks.walk_forward [processes]
+
+The checkpoint is cut back to its first half and the run repeated, timing
+the recompute of the missing windows. Resume, refusal of another run's
+checkpoint and recompute over changed candles are checked by
+tests/test_walk_forward.py.
+"""
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from erendil.backtest.walk_forward import walk_forward
+from benchmarks._data import make_history
+
+
+SYMBOLS = 4
+CANDLES = 60_000
+TRAIN, TEST = 20_000, 5_000
+GRID = {
+    "fast_length": [8, 12],
+    "slow_length": [21, 26],
+    "signal_length": [7, 9],
+    "atr_period": [5, 10],
+    "hhv_period": [10, 20],
+    "multiplier": [2.0, 3.0],
+}
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    histories = {f"SYM{i}USDT": make_history(CANDLES, i) for i in range(SYMBOLS)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = Path(directory) / "walk_forward.jsonl"
+        start = time.perf_counter()
+        full = walk_forward(histories, GRID, TRAIN, TEST, processes=processes, checkpoint=str(checkpoint))
+        elapsed = time.perf_counter() - start
+        print(full.select("symbol", "window", "fast_length", "slow_length", "train_pnl", "test_pnl", "test_trades"))
+        print(f"{full.height} windows in {elapsed:.1f}s")
+
+        lines = checkpoint.read_text().splitlines(keepends=True)
+        checkpoint.write_text("".join(lines[:len(lines) // 2]))
+        start = time.perf_counter()
+        walk_forward(histories, GRID, TRAIN, TEST, processes=processes, checkpoint=str(checkpoint))
+        print(f"resumed {len(lines) - len(lines) // 2} windows in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
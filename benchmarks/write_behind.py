@@ -0,0 +1,107 @@
+"""
+Time a trade decision spends on persistence, writing inline against writing behind.
+
+    uv run python -m benchmarks.write_behind
+
+A TradeManager opens a position, exits half on a sell signal and the
+rest on its trailing stop, over and over; the inline case
+awaits the database and journal in the signal path the way _save_trade_entry
+used to. A database that fails its first writes then checks the retries.
+Exits non-zero if any trade is missing from the database or the journal.
+"""
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+import numpy as np
+from datetime import datetime, timezone
+
+from erendil.database.trade_db import TradeDatabase
+from erendil.database.trade_journal import read_trade_log
+from erendil.models.data_models import MarketSignal
+from erendil.trading.trade_manager import TradeManager
+
+
+DECISIONS = 999
+REASONS = ("Buy signal detected", "Sell signal detected", "Trailing stoploss hit")
+
+
+class FlakyDatabase:
+    """Fails the first `failures` inserts"""
+
+    def __init__(self, db, failures: int):
+        self.db = db
+        self.failures = failures
+
+    async def insert_trade(self, *args):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk I/O error")
+        return await self.db.insert_trade(*args)
+
+    async def close(self):
+        await self.db.close()
+
+
+async def inline_save(manager: TradeManager, trade_entry: dict) -> None:
+    # The old _save_trade_entry, awaited in the signal path
+    if await manager.db.save_trade(trade_entry, manager.symbol, manager.interval):
+        await asyncio.to_thread(manager.journal.append, trade_entry)
+
+
+async def trade(manager: TradeManager, decisions: int) -> np.ndarray:
+    latencies = np.empty(decisions)
+    for i in range(decisions):
+        signal = MarketSignal(
+            price=100 + i % 3, action="BUY" if i % 3 == 0 else "SELL", reason=REASONS[i % 3],
+            timestamp=datetime.fromtimestamp(1.7e9 + i * 60, timezone.utc),
+        )
+        start = time.perf_counter()
+        if i % 3 == 0:
+            await manager.buy(signal)
+        else:
+            await manager.sell(signal, trailing_stoploss=99.0)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+async def run(directory: str, name: str, inline: bool = False, failures: int = 0) -> tuple:
+    log_file = f"{directory}/{name}_log_file.json"
+    manager = TradeManager("TESTUSDT", "1m", log_file=log_file, db_path=f"{directory}/{name}.db")
+    await manager.initialize()
+    if inline:
+        manager._save_trade_entry = lambda entry: inline_save(manager, entry)
+    if failures:
+        manager.persister.db = FlakyDatabase(manager.db, failures)
+        manager.persister.retry_delay = 0.01
+
+    latencies = await trade(manager, DECISIONS)
+    await manager.persister.flush()
+    stats = manager.persister.stats
+    await manager.close()
+
+    db = TradeDatabase(f"{directory}/{name}.db")
+    saved = len(await db.get_trades("TESTUSDT", "1m"))
+    await db.close()
+    journaled = len(read_trade_log(log_file)["trades"])
+    return latencies, stats, saved, journaled
+
+
+def main():
+    logging.disable(logging.WARNING)
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        for name, kwargs in (("inline", {"inline": True}), ("write-behind", {}), ("flaky", {"failures": 20})):
+            latencies, stats, saved, journaled = asyncio.run(run(directory, name, **kwargs))
+            latencies *= 1e6
+            print(f"{name}: decision p50 {np.percentile(latencies, 50):.0f}us, p99 {np.percentile(latencies, 99):.0f}us; "
+                  f"{saved} saved, {journaled} journaled" + ("" if kwargs.get("inline") else f", stats {json.dumps(stats)}"))
+            ok &= saved == journaled == DECISIONS
+    print(f"trades {'complete' if ok else 'MISSING'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
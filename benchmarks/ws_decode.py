@@ -0,0 +1,60 @@
+"""
+WebSocket kline frame decoding throughput: pydantic model vs the fast decoder.
+
+    uv run python -m benchmarks.ws_decode
+"""
+import json
+import time
+
+from erendil.models.data_models import WebsocketKline
+from erendil.exchange import decoder
+
+
+FRAMES = 200_000
+TICKS_PER_CANDLE = 50
+
+
+def make_frames(n: int):
+    frames = []
+    for i in range(n):
+        closed = i % TICKS_PER_CANDLE == TICKS_PER_CANDLE - 1
+        t = 1_700_000_000_000 + (i // TICKS_PER_CANDLE) * 60_000
+        frames.append(json.dumps({
+            "e": "kline", "E": t + 1000, "s": "BTCUSDT",
+            "k": {
+                "t": t, "T": t + 59_999, "s": "BTCUSDT", "i": "1m", "f": 100, "L": 200,
+                "o": "0.0010", "c": f"{0.002 + i * 1e-6:.6f}", "h": "0.0025", "l": "0.0015",
+                "v": "1000", "n": 100, "x": closed, "q": "1.0000", "V": "500",
+                "Q": "0.500", "B": "123456",
+            },
+        }))
+    return frames
+
+
+def legacy_decode(message: str):
+    ws_data = WebsocketKline.model_validate_json(message)
+    if ws_data.kline.get('x', False):
+        return ws_data.to_kline_data
+    return float(ws_data.kline['c'])
+
+
+def rate(fn, frames) -> float:
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return len(frames) / (time.perf_counter() - start)
+
+
+def main():
+    frames = make_frames(FRAMES)
+    backend = "msgspec" if decoder.msgspec is not None else "json"
+
+    legacy = rate(legacy_decode, frames)
+    fast = rate(decoder.decode_kline, frames)
+    print(f"{'path':<22} {'frames/sec':>12}")
+    print(f"{'pydantic model':<22} {legacy:12,.0f}")
+    print(f"{'decoder (' + backend + ')':<22} {fast:12,.0f}  ({fast / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import numpy as np
+import polars as pl
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from erendil.backtest.engine import Fill, TradingRules, close_stop_finder, signal_arrays, simulate
+from erendil.backtest.intrabar import IntrabarStops
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.features import CandleFeatures
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, StoplossParams
+
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+REASONS = {
+    "BUY": "Buy signal detected",
+    "SELL_FIRST": "Sell signal detected",
+    "SELL_SECOND": "Trailing stoploss hit",
+}
+
+
+@dataclass
+class BacktestResult:
+    # Trade entries shaped like TradeManager._create_trade_entry
+    trades: List[Dict]
+    # close_time and mark-to-market equity at every candle
+    equity: pl.DataFrame
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+class Backtester:
+    """Offline replay of TradeManager's trading rules over a stored candle history.
+
+    Indicators are computed once over the whole history and the rules run
+    on the resulting signal arrays, without asyncio, locks or persistence.
+    A candle's close acts on its signals like handle_candle_close, and the
+    trailing stop is checked against the candle's close price like a tick
+    in handle_price_update, or along finer candles with IntrabarStops.
+    """
+
+    def __init__(
+        self,
+        indicator_params: Optional[IndicatorParams] = None,
+        stoploss_params: Optional[StoplossParams] = None,
+        rules: Optional[TradingRules] = None,
+    ):
+        """
+        Initialize the backtester.
+
+        Args:
+            indicator_params: BuySellIndicator parameters
+            stoploss_params: TrailingStoploss parameters
+            rules: Position sizing and fees, as given to TradeManager
+        """
+        self.indicator = BuySellIndicator(indicator_params)
+        self.stoploss = TrailingStoploss(stoploss_params)
+        self.rules = rules or TradingRules()
+
+    @property
+    def min_candles(self) -> int:
+        """Same warm-up as TradeManager.min_candles"""
+        return max(self.indicator.params.slow_length, self.stoploss.params.hhv_period) + 2
+
+    def run(self, history: pl.DataFrame, intrabar: Optional[IntrabarStops] = None) -> BacktestResult:
+        """Backtest over closed candles (oldest first).
+
+        Args:
+            history: Strategy candles with high/low/close and open_time/close_time
+            intrabar: Finer candles to check the trailing stop against; the
+                stop is only checked on each candle's close when None
+        """
+        if history.height < self.min_candles:
+            return BacktestResult([], pl.DataFrame({"close_time": history["close_time"], "equity": np.zeros(history.height)}))
+
+        features = CandleFeatures(history)
+        close = features.column("close")
+        buy, sell = signal_arrays(*self.indicator.process_features(features))
+        ts = self.stoploss.process_features(features)
+        find_stop = intrabar.finder(history, ts) if intrabar is not None else close_stop_finder(close, ts)
+        result = simulate(close, buy, sell, ts, self.min_candles - 1, self.rules, find_stop, record=True)
+
+        close_times = history["close_time"]
+        trades = [self._trade_entry(fill, close_times[fill.index]) for fill in result.fills]
+        equity = pl.DataFrame({"close_time": close_times, "equity": result.equity})
+        return BacktestResult(trades, equity, self._stats(result.fills, result.equity, result.max_drawdown))
+
+    @staticmethod
+    def _trade_entry(fill: Fill, timestamp: datetime) -> Dict:
+        # Stop exits happen on a tick inside the candle; its close time stands in for the tick time
+        return {
+            "fee": fill.fee,
+            "pnl": fill.pnl,
+            "action": fill.action,
+            "price": fill.price,
+            "signal_reason": REASONS[fill.action],
+            "position_size": fill.position_size,
+            "total_invested": fill.total_invested,
+            "entry_price": fill.entry_price,
+            "remaining_position": fill.remaining_position,
+            "total_pnl": fill.total_pnl,
+            "timestamp": timestamp.astimezone(IST).isoformat(),
+        }
+
+    @staticmethod
+    def _stats(fills: List[Fill], equity: np.ndarray, max_drawdown: float) -> Dict[str, float]:
+        exits = [fill.pnl for fill in fills if fill.pnl is not None]
+        # Open position in force at every close
+        position = np.zeros(len(equity))
+        for fill, following in zip(fills, fills[1:] + [None]):
+            position[fill.index:following.index if following else None] = fill.remaining_position
+        return {
+            "pnl": sum(exits),
+            "final_equity": float(equity[-1]),
+            "trades": len(fills),
+            "buys": len(fills) - len(exits),
+            "exits": len(exits),
+            "win_rate": sum(pnl > 0 for pnl in exits) / len(exits) if exits else 0.0,
+            "fees": sum(fill.fee for fill in fills),
+            "max_drawdown": max_drawdown,
+            "exposure": float(np.mean(position > 0)),
+        }
@@ -0,0 +1,184 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+
+@dataclass
+class TradingRules:
+    capital_per_trade: float = 100
+    fee_percent: float = 0.1
+    max_buys: int = 3
+
+
+class Fill(NamedTuple):
+    index: int
+    action: str  # BUY, SELL_FIRST or SELL_SECOND
+    price: float
+    position_size: float
+    fee: float
+    pnl: Optional[float]
+    total_invested: float
+    entry_price: Optional[float]
+    remaining_position: float
+    total_pnl: Optional[float]
+
+
+class SimulationResult(NamedTuple):
+    pnl: float
+    trades: int
+    max_drawdown: float
+    # Mark-to-market equity (realized PnL plus open position) at every close
+    equity: np.ndarray
+    fills: Optional[List[Fill]] = None
+
+
+# Finds the first stop hit in candles [start, stop): (candle index, fill price) or None
+StopFinder = Callable[[int, int], Optional[Tuple[int, float]]]
+
+
+def signal_arrays(hist_buy: np.ndarray, hist_sell: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """BuySellIndicator.check_buy_signal / check_sell_signal at every candle, over the last axis"""
+    buy = np.zeros(hist_buy.shape, dtype=bool)
+    sell = np.zeros(hist_sell.shape, dtype=bool)
+    h = hist_buy
+    buy[..., 2:] = (h[..., 2:] > h[..., 1:-1]) & (h[..., 1:-1] < h[..., :-2]) & (h[..., 2:] <= 0)
+    h = hist_sell
+    sell[..., 2:] = (h[..., 2:] < h[..., 1:-1]) & (h[..., 1:-1] > h[..., :-2]) & (h[..., 2:] >= 0)
+    return buy, sell
+
+
+def close_stop_finder(close: np.ndarray, ts: np.ndarray) -> StopFinder:
+    """Stop check on the close of each candle against the stop cached at the previous close"""
+    n = len(close)
+    hit = np.zeros(n, dtype=bool)
+    hit[1:] = close[1:] < ts[:-1]
+    # First hit at or after every candle, so each lookup is O(1)
+    next_hit = np.minimum.accumulate(np.where(hit, np.arange(n), n)[::-1])[::-1]
+
+    def find(start: int, stop: int) -> Optional[Tuple[int, float]]:
+        if start >= n:
+            return None
+        index = int(next_hit[start])
+        if index >= stop:
+            return None
+        return index, float(close[index])
+    return find
+
+
+def simulate(
+    close: np.ndarray,
+    buy: np.ndarray,
+    sell: np.ndarray,
+    ts: np.ndarray,
+    start: int,
+    rules: Optional[TradingRules] = None,
+    find_stop: Optional[StopFinder] = None,
+    record: bool = False,
+) -> SimulationResult:
+    """Replay TradeManager's buy/DCA/first-exit/trailing-stop rules over signal arrays.
+
+    Candle `i` first sees its ticks checked against the stop cached at close
+    `i - 1` (only once the first exit is taken), then its close acts on
+    buy[i] / sell[i]. Closes before `start` are ignored, like the warm-up
+    of handle_candle_close. Only candles with a signal are visited one by
+    one; stop hits in between are located with `find_stop`.
+    """
+    rules = rules or TradingRules()
+    find_stop = find_stop or close_stop_finder(close, ts)
+    n = len(close)
+    buy_fee = rules.capital_per_trade * (rules.fee_percent / 100)
+    fee_rate = rules.fee_percent / 100
+
+    pnl = 0.0
+    position = 0.0
+    entry: Optional[float] = None
+    invested = 0.0
+    buy_count = 0
+    first_exit = False
+    trades = 0
+    fills: List[Fill] = []
+    # Open position and realized PnL after every change, for the equity curve
+    changes: List[Tuple[int, float, float, float]] = []
+
+    def fill(index, action, price, size, fee, exit_pnl):
+        changes.append((index, pnl, position, entry or 0.0))
+        if record:
+            fills.append(Fill(
+                index, action, price, size, fee, exit_pnl, invested, entry, position,
+                pnl if exit_pnl is not None else None,
+            ))
+
+    def second_exit(index: int, price: float) -> None:
+        nonlocal pnl, position, entry, invested, buy_count, first_exit, trades
+        size = position
+        fee = size * price * fee_rate
+        exit_pnl = size * price - size * entry - fee
+        pnl += exit_pnl
+        position, entry, invested, buy_count, first_exit = 0.0, None, 0.0, 0, False
+        trades += 1
+        fill(index, "SELL_SECOND", price, size, fee, exit_pnl)
+
+    events = np.flatnonzero(buy | sell)
+    events = events[events >= start].tolist()
+    check_from = start + 1
+    for i in events:
+        if first_exit:
+            hit = find_stop(check_from, i + 1)
+            if hit is not None:
+                second_exit(*hit)
+        check_from = i + 1
+
+        price = float(close[i])
+        if buy[i]:
+            if buy_count >= rules.max_buys:
+                continue
+            size = (rules.capital_per_trade - buy_fee) / price
+            if position == 0:
+                entry = price
+                invested = rules.capital_per_trade
+                buy_count = 1
+            elif price < entry:
+                entry = (position * entry + size * price) / (position + size)
+                invested += rules.capital_per_trade
+                buy_count += 1
+            else:
+                continue
+            position += size
+            trades += 1
+            fill(i, "BUY", price, size, buy_fee, None)
+
+        elif sell[i] and position > 0 and not first_exit:
+            size = position * 0.5
+            fee = size * price * fee_rate
+            exit_pnl = size * price - size * entry - fee
+            pnl += exit_pnl
+            position -= size
+            first_exit = True
+            buy_count = 0
+            trades += 1
+            fill(i, "SELL_FIRST", price, size, fee, exit_pnl)
+
+    if first_exit:
+        hit = find_stop(check_from, n)
+        if hit is not None:
+            second_exit(*hit)
+
+    equity = _equity_curve(close, changes)
+    peak = np.maximum.accumulate(equity) if n else equity
+    max_drawdown = float(np.max(peak - equity)) if n else 0.0
+    return SimulationResult(pnl, trades, max_drawdown, equity, fills if record else None)
+
+
+def _equity_curve(close: np.ndarray, changes: List[Tuple[int, float, float, float]]) -> np.ndarray:
+    """Realized PnL plus the open position marked at every close"""
+    equity = np.zeros(len(close))
+    if not changes:
+        return equity
+    index, realized, position, entry = (np.array(column) for column in zip(*changes))
+    # State in force at each close: the last change at or before it
+    counts = np.diff(np.append(index, len(close)))
+    first = index[0]
+    equity[first:] = np.repeat(realized, counts) + np.repeat(position, counts) * (
+        close[first:] - np.repeat(entry, counts)
+    )
+    return equity
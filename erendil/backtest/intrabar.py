@@ -0,0 +1,140 @@
+import logging
+import numpy as np
+import polars as pl
+from pathlib import Path
+from typing import Optional, Tuple, Union
+from erendil.backtest.engine import StopFinder
+from erendil.database.kline_store import KlineStore
+
+
+logger = logging.getLogger(__name__)
+
+# Order in which a candle's open/high/low/close are visited
+PATHS = ("low_first", "high_first", "nearest")
+
+
+def candle_paths(ohlc: np.ndarray, path: str) -> np.ndarray:
+    """(candles, 4) price points each candle is assumed to trade through, in order"""
+    o, h, l, c = ohlc.T
+    if path == "low_first":
+        low_first = np.ones(len(o), dtype=bool)
+    elif path == "high_first":
+        low_first = np.zeros(len(o), dtype=bool)
+    elif path == "nearest":
+        # Visit the extreme closer to the open first
+        low_first = (o - l) <= (h - o)
+    else:
+        raise ValueError(f"Unknown intrabar path {path!r}, expected one of {', '.join(PATHS)}")
+    first = np.where(low_first, l, h)
+    second = np.where(low_first, h, l)
+    return np.stack([o, first, second, c], axis=1)
+
+
+class IntrabarStops:
+    """Trailing-stop checks driven by a finer candle series stored on disk.
+
+    Under the stop cached at the previous strategy close, only strategy
+    candles whose low breaks the stop are inspected. Their fine candles
+    are walked along `path` and the stop fills at the first point below
+    it, like the first tick under the stop in handle_price_update. Fine
+    candles are read from Parquet in time-ordered chunks of `chunk_rows`,
+    so only one chunk is held in memory, extended by further chunks only
+    while a strategy candle spans more fine candles than that.
+    """
+
+    def __init__(self, source: Union[str, Path, pl.LazyFrame], path: str = "low_first", chunk_rows: int = 200_000):
+        """
+        Initialize the intrabar stop model.
+
+        Args:
+            source: Parquet file (or lazy frame) of fine candles sorted by open_time
+            path: Intrabar order of each fine candle: low_first, high_first or nearest
+            chunk_rows: Fine candles loaded per read
+        """
+        if path not in PATHS:
+            raise ValueError(f"Unknown intrabar path {path!r}, expected one of {', '.join(PATHS)}")
+        self.scan = source if isinstance(source, pl.LazyFrame) else pl.scan_parquet(source)
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.chunks_loaded = 0
+        self._times = np.empty(0, dtype=np.int64)
+        self._points = np.empty((0, 4))
+        self._first = self._last = 0
+        self._exhausted = False
+
+    @classmethod
+    def from_store(cls, directory: str, symbol: str, interval: str, **kwargs) -> "IntrabarStops":
+        """Fine candles from a kline cache snapshot (its unsnapshotted tail is ignored)"""
+        return cls(KlineStore(directory, symbol, interval).snapshot_path, **kwargs)
+
+    def finder(self, history: pl.DataFrame, ts: np.ndarray) -> StopFinder:
+        """StopFinder for the strategy candles `history` and their trailing stops `ts`"""
+        open_us = history["open_time"].dt.epoch("us").to_numpy()
+        close_us = history["close_time"].dt.epoch("us").to_numpy()
+        low = history["low"].to_numpy()
+        coarse = candle_paths(history.select("open", "high", "low", "close").to_numpy(), self.path)
+
+        n = len(low)
+        # Candles whose low breaks the stop cached at the previous close
+        candidate = np.zeros(n, dtype=bool)
+        candidate[1:] = low[1:] < ts[:-1]
+        candidates = np.flatnonzero(candidate)
+
+        def find(start: int, stop: int) -> Optional[Tuple[int, float]]:
+            k = np.searchsorted(candidates, start)
+            while k < len(candidates) and candidates[k] < stop:
+                index = int(candidates[k])
+                points = self._fine_points(open_us[index], close_us[index])
+                if not len(points):
+                    logger.debug(f"No fine candles for candle {index}, walking the candle itself")
+                    points = coarse[index:index + 1]
+                price = self._first_below(points, ts[index - 1])
+                if price is not None:
+                    return index, price
+                k += 1
+            return None
+        return find
+
+    @staticmethod
+    def _first_below(points: np.ndarray, level: float) -> Optional[float]:
+        below = np.flatnonzero(points.ravel() < level)
+        return float(points.ravel()[below[0]]) if len(below) else None
+
+    def _fine_points(self, open_us: int, close_us: int) -> np.ndarray:
+        """Path points of the fine candles opening within [open_us, close_us]"""
+        covered = (
+            self.chunks_loaded
+            and self._first <= open_us
+            and (close_us <= self._last or self._exhausted)
+        )
+        if not covered:
+            self._load(open_us, close_us)
+        i = np.searchsorted(self._times, open_us)
+        j = np.searchsorted(self._times, close_us, side="right")
+        return self._points[i:j]
+
+    def _load(self, from_us: int, until_us: int) -> None:
+        """Fine candles from `from_us` on, in chunks until one opens after `until_us` or the data ends"""
+        chunks = []
+        start = from_us
+        while True:
+            chunk = (
+                self.scan
+                .filter(pl.col("open_time") >= pl.lit(start).cast(pl.Datetime("us", "UTC")))
+                .head(self.chunk_rows)
+                .select("open_time", "open", "high", "low", "close")
+                .collect()
+            )
+            self.chunks_loaded += 1
+            chunks.append(chunk)
+            self._exhausted = len(chunk) < self.chunk_rows
+            last = int(chunk["open_time"].dt.epoch("us")[-1]) if len(chunk) else start
+            if self._exhausted or last > until_us:
+                break
+            start = last + 1
+
+        chunk = pl.concat(chunks)
+        self._times = chunk["open_time"].dt.epoch("us").to_numpy()
+        self._points = candle_paths(chunk.select("open", "high", "low", "close").to_numpy(), self.path)
+        self._first = from_us
+        self._last = int(self._times[-1]) if len(self._times) else from_us
@@ -0,0 +1,146 @@
+import os
+import logging
+import itertools
+import numpy as np
+import polars as pl
+from enum import Enum
+from dataclasses import asdict, fields
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from erendil.backtest.engine import TradingRules, close_stop_finder, signal_arrays, simulate
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.features import CandleFeatures
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, StoplossParams
+
+
+logger = logging.getLogger(__name__)
+
+INDICATOR_FIELDS = [f.name for f in fields(IndicatorParams)]
+STOPLOSS_FIELDS = [f.name for f in fields(StoplossParams)]
+
+# Worker state, built once per process by _init_worker
+_worker: Dict[str, object] = {}
+
+
+def expand_grid(grid: Dict[str, Sequence]) -> Tuple[List[IndicatorParams], List[StoplossParams]]:
+    """Every IndicatorParams and StoplossParams combination of a grid; missing fields keep their defaults"""
+    unknown = set(grid) - set(INDICATOR_FIELDS) - set(STOPLOSS_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    def combinations(cls, names):
+        names = [name for name in names if name in grid]
+        return [cls(**dict(zip(names, values))) for values in itertools.product(*(grid[n] for n in names))]
+
+    indicators = [
+        p for p in combinations(IndicatorParams, INDICATOR_FIELDS) if p.fast_length < p.slow_length
+    ]
+    return indicators, combinations(StoplossParams, STOPLOSS_FIELDS)
+
+
+def _signal_key(params: IndicatorParams) -> tuple:
+    return (params.oscillator_ma, params.fast_length, params.slow_length, params.signal_ma, params.signal_length)
+
+
+def _tasks(indicators: List[IndicatorParams], processes: int) -> List[List[IndicatorParams]]:
+    """Chunks of indicator combinations, each sharing one MACD signal line"""
+    groups: Dict[tuple, List[IndicatorParams]] = {}
+    for params in indicators:
+        groups.setdefault(_signal_key(params), []).append(params)
+    size = max(1, len(indicators) // (processes * 4))
+    return [group[i:i + size] for group in groups.values() for i in range(0, len(group), size)]
+
+
+def _init_worker(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 stoplosses: List[StoplossParams], rules: TradingRules) -> None:
+    _worker["features"] = CandleFeatures.from_arrays(high=high, low=low, close=close)
+    _worker["stoplosses"] = stoplosses
+    _worker["rules"] = rules
+    _worker["stops"] = {}
+
+
+def evaluate(
+    features: CandleFeatures,
+    indicators: List[IndicatorParams],
+    stoplosses: List[StoplossParams],
+    rules: TradingRules,
+    start: int = 0,
+    stops: Optional[Dict[int, tuple]] = None,
+) -> List[dict]:
+    """Backtest every indicator x stoploss combination over one feature cache.
+
+    Trading starts at the later of `start` and each combination's warm-up.
+    `stops` caches the trailing stops per stoploss index across calls.
+    """
+    stops = {} if stops is None else stops
+    close = features.column("close")
+
+    rows = []
+    for params in indicators:
+        buy, sell = signal_arrays(*BuySellIndicator(params).process_features(features))
+        for i, stoploss in enumerate(stoplosses):
+            if i not in stops:
+                ts = TrailingStoploss(stoploss).process_features(features)
+                stops[i] = (ts, close_stop_finder(close, ts))
+            ts, find_stop = stops[i]
+            # Same warm-up as TradeManager.min_candles
+            first = max(start, params.slow_length + 1, stoploss.hhv_period + 1)
+            result = simulate(close, buy, sell, ts, first, rules, find_stop)
+            rows.append({
+                **_flatten(params), **_flatten(stoploss),
+                "pnl": result.pnl, "trades": result.trades, "max_drawdown": result.max_drawdown,
+            })
+    return rows
+
+
+def _run_task(indicators: List[IndicatorParams]) -> List[dict]:
+    features: CandleFeatures = _worker["features"]
+    rows = evaluate(features, indicators, _worker["stoplosses"], _worker["rules"], stops=_worker["stops"])
+    # The next task most likely needs a different signal line
+    features.evict("signal")
+    return rows
+
+
+def _flatten(params) -> dict:
+    return {k: v.value if isinstance(v, Enum) else v for k, v in asdict(params).items()}
+
+
+def sweep(
+    history: pl.DataFrame,
+    grid: Dict[str, Sequence],
+    rules: Optional[TradingRules] = None,
+    processes: Optional[int] = None,
+) -> pl.DataFrame:
+    """Backtest every parameter combination of `grid` over a candle history.
+
+    Args:
+        history: Closed candles with high/low/close columns, oldest first
+        grid: IndicatorParams / StoplossParams field names mapped to the values to try
+        rules: Position sizing and fees, as given to TradeManager
+        processes: Worker processes (all cores when None, in-process when 1)
+
+    Returns:
+        One row per combination with pnl, trades and max_drawdown, best PnL first
+    """
+    rules = rules or TradingRules()
+    indicators, stoplosses = expand_grid(grid)
+    processes = processes or os.cpu_count() or 1
+    arrays = tuple(np.ascontiguousarray(history[c].to_numpy(), dtype=np.float64) for c in ("high", "low", "close"))
+    tasks = _tasks(indicators, processes)
+    logger.info(
+        f"Sweeping {len(indicators) * len(stoplosses)} combinations over {history.height} candles "
+        f"in {len(tasks)} tasks on {processes} processes"
+    )
+
+    if processes == 1:
+        _init_worker(*arrays, stoplosses, rules)
+        chunks = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(*arrays, stoplosses, rules)) as pool:
+            chunks = list(pool.map(_run_task, tasks))
+
+    rows = [row for chunk in chunks for row in chunk]
+    if not rows:
+        return pl.DataFrame()
+    return pl.DataFrame(rows).sort("pnl", descending=True)
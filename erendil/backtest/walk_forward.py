@@ -0,0 +1,234 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import polars as pl
+from enum import Enum
+from pathlib import Path
+from dataclasses import asdict, dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+from erendil.backtest.engine import TradingRules
+from erendil.backtest.sweep import INDICATOR_FIELDS, STOPLOSS_FIELDS, evaluate, expand_grid
+from erendil.indicators.features import CandleFeatures
+from erendil.models.data_models import IndicatorParams, StoplossParams
+from erendil.models.enums import MAType, SmoothingType
+
+
+logger = logging.getLogger(__name__)
+
+# Result columns a window's parameters can be chosen by, and whether higher is better
+METRICS = {"pnl": True, "trades": True, "max_drawdown": False}
+
+# Worker state, built once per process by _init_worker
+_worker: Dict[str, object] = {}
+
+
+@dataclass
+class Window:
+    symbol: str
+    index: int
+    train_start: int  # candle offsets into the symbol's history
+    test_start: int
+    test_end: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}:{self.index}"
+
+
+def rolling_windows(symbol: str, candles: int, train: int, test: int, step: Optional[int] = None) -> Iterator[Window]:
+    """Consecutive train/test splits, the test window following its train window"""
+    step = step or test
+    for index, start in enumerate(range(0, candles - train - test + 1, step)):
+        yield Window(symbol, index, start, start + train, start + train + test)
+
+
+def _init_worker(arrays: Dict[str, str], indicators, stoplosses, rules: TradingRules, metric: str) -> None:
+    # Memory-mapped, so every worker shares the page cache instead of a pickled copy
+    _worker["arrays"] = {symbol: np.load(path, mmap_mode="r") for symbol, path in arrays.items()}
+    _worker["indicators"] = indicators
+    _worker["stoplosses"] = stoplosses
+    _worker["rules"] = rules
+    _worker["metric"] = metric
+
+
+def _run_window(window: Window) -> dict:
+    high, low, close = _worker["arrays"][window.symbol][:, window.train_start:window.test_end]
+    rules, metric = _worker["rules"], _worker["metric"]
+
+    train = CandleFeatures.from_arrays(
+        high=high[:window.test_start - window.train_start],
+        low=low[:window.test_start - window.train_start],
+        close=close[:window.test_start - window.train_start],
+    )
+    ranked = evaluate(train, _worker["indicators"], _worker["stoplosses"], rules)
+    sign = 1 if METRICS[metric] else -1
+    best = max(ranked, key=lambda row: sign * row[metric])
+    params = {k: best[k] for k in INDICATOR_FIELDS + STOPLOSS_FIELDS}
+
+    # Score on the test window, warming the indicators up on the train candles before it
+    indicator, stoploss = _params(params)
+    full = CandleFeatures.from_arrays(high=high, low=low, close=close)
+    [test] = evaluate(full, [indicator], [stoploss], rules, start=window.test_start - window.train_start)
+
+    return {
+        "symbol": window.symbol,
+        "window": window.index,
+        "train_start": window.train_start,
+        "test_start": window.test_start,
+        "test_end": window.test_end,
+        **params,
+        **{f"train_{k}": best[k] for k in ("pnl", "trades", "max_drawdown")},
+        **{f"test_{k}": test[k] for k in ("pnl", "trades", "max_drawdown")},
+    }
+
+
+def _params(row: dict) -> Tuple[IndicatorParams, StoplossParams]:
+    indicator = {k: row[k] for k in INDICATOR_FIELDS}
+    indicator["oscillator_ma"] = MAType(indicator["oscillator_ma"])
+    indicator["signal_ma"] = MAType(indicator["signal_ma"])
+    indicator["smoothing"] = SmoothingType(indicator["smoothing"])
+    return IndicatorParams(**indicator), StoplossParams(**{k: row[k] for k in STOPLOSS_FIELDS})
+
+
+def _fingerprint(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, default=lambda v: v.value if isinstance(v, Enum) else str(v))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _candles_digest(candles: np.ndarray, window: Window) -> str:
+    """Hash of the high/low/close a window is computed from"""
+    return hashlib.sha256(np.ascontiguousarray(candles[:, window.train_start:window.test_end]).tobytes()).hexdigest()
+
+
+def _load_checkpoint(path: Path, fingerprint: str) -> Dict[str, dict]:
+    """Finished windows of a checkpoint written by a run with the same fingerprint"""
+    done = {}
+    if not path.exists():
+        return done
+    valid = 0
+    with open(path, "rb") as f:
+        for number, line in enumerate(f):
+            # A torn final line (crash mid-write) has no newline
+            if not line.endswith(b"\n"):
+                break
+            row = json.loads(line)
+            if number == 0:
+                if row.get("fingerprint") != fingerprint:
+                    raise ValueError(
+                        f"Checkpoint {path} was written with a different grid, windows, rules or metric; "
+                        f"remove it or pass another checkpoint path"
+                    )
+            else:
+                done[f"{row['symbol']}:{row['window']}"] = row
+            valid += len(line)
+    if valid < path.stat().st_size:
+        logger.warning(f"Dropping a torn record at the end of {path}")
+        # Cut it off so the next append starts on a fresh line
+        os.truncate(path, valid)
+    return done
+
+
+def _append_checkpoint(path: Path, row: dict) -> None:
+    with open(path, "a") as f:
+        f.write(json.dumps(row) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def walk_forward(
+    histories: Dict[str, pl.DataFrame],
+    grid: Dict[str, Sequence],
+    train: int,
+    test: int,
+    step: Optional[int] = None,
+    rules: Optional[TradingRules] = None,
+    metric: str = "pnl",
+    processes: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+) -> pl.DataFrame:
+    """Walk-forward optimization of the grid over rolling train/test windows of every symbol.
+
+    Args:
+        histories: Closed candles (high/low/close, oldest first) per symbol
+        grid: IndicatorParams / StoplossParams field names mapped to the values to try
+        train: Candles each optimization sees
+        test: Candles the chosen parameters are then scored on
+        step: Candles between window starts (defaults to `test`)
+        rules: Position sizing and fees, as given to TradeManager
+        metric: Result column optimized on the train window (pnl, trades or max_drawdown)
+        processes: Worker processes (all cores when None)
+        checkpoint: JSONL file of finished windows; a rerun with the same grid,
+            windows, rules and metric skips those whose candles are unchanged
+
+    Returns:
+        One row per window with the chosen parameters and their train and test results
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(METRICS)}")
+    rules = rules or TradingRules()
+    indicators, stoplosses = expand_grid(grid)
+    if not indicators or not stoplosses:
+        # Every window must have parameters to choose from
+        raise ValueError(
+            "Walk-forward grid has no parameter combinations to choose from; "
+            "it needs a fast_length below a slow_length and at least one value per parameter"
+        )
+    processes = processes or os.cpu_count() or 1
+    step = step or test
+    fingerprint = _fingerprint({
+        "grid": {name: list(values) for name, values in grid.items()},
+        "train": train, "test": test, "step": step, "rules": asdict(rules), "metric": metric,
+    })
+    checkpoint_path = Path(checkpoint) if checkpoint else None
+    done = _load_checkpoint(checkpoint_path, fingerprint) if checkpoint_path else {}
+    if checkpoint_path and (not checkpoint_path.exists() or not checkpoint_path.stat().st_size):
+        # The first record identifies the run the windows belong to
+        _append_checkpoint(checkpoint_path, {"fingerprint": fingerprint})
+
+    candles = {
+        symbol: history.select("high", "low", "close").to_numpy().T.astype(np.float64)
+        for symbol, history in histories.items()
+    }
+    windows = [
+        window
+        for symbol, history in histories.items()
+        for window in rolling_windows(symbol, history.height, train, test, step)
+    ]
+    digests = {window.key: _candles_digest(candles[window.symbol], window) for window in windows}
+    # A window whose candles changed since it was checkpointed is computed again
+    pending = [window for window in windows if done.get(window.key, {}).get("candles") != digests[window.key]]
+    logger.info(
+        f"Walk-forward: {len(windows)} windows ({len(windows) - len(pending)} checkpointed), "
+        f"{len(indicators) * len(stoplosses)} combinations each, {processes} processes"
+    )
+
+    with tempfile.TemporaryDirectory(prefix="erendil-wf-") as directory:
+        arrays = {}
+        for symbol in {window.symbol for window in pending}:
+            path = Path(directory) / f"{symbol}.npy"
+            np.save(path, candles[symbol])
+            arrays[symbol] = str(path)
+
+        with ProcessPoolExecutor(
+            processes, initializer=_init_worker, initargs=(arrays, indicators, stoplosses, rules, metric)
+        ) as pool:
+            futures = {pool.submit(_run_window, window): window for window in pending}
+            for future in as_completed(futures):
+                window = futures[future]
+                row = future.result()
+                done[window.key] = row
+                if checkpoint_path:
+                    _append_checkpoint(checkpoint_path, {**row, "candles": digests[window.key]})
+                logger.info(
+                    f"{window.symbol} window {window.index}: test pnl {row['test_pnl']:.2f} "
+                    f"({len(done)}/{len(windows)})"
+                )
+
+    rows = [{k: v for k, v in done[window.key].items() if k != "candles"} for window in windows]
+    if not rows:
+        return pl.DataFrame()
+    return pl.DataFrame(rows)
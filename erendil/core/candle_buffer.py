@@ -0,0 +1,121 @@
+import numpy as np
+import polars as pl
+from typing import Any, Dict, Optional, Sequence, Tuple
+from erendil.exchange.klines import KLINE_COLUMNS, KLINE_SCHEMA
+
+
+class CandleBuffer:
+    """Fixed-capacity columnar ring buffer of closed candles.
+
+    Every column is a preallocated NumPy array holding the ring twice in a
+    row (each value is written at `i` and `i + size`), so the most recent
+    candles are always one contiguous slice and can be handed out as
+    zero-copy views. Views and frames are snapshots: before a write would
+    overwrite candles a view handed out earlier may still show, the ring
+    moves to fresh memory and leaves the old arrays to those views. The
+    ring is `slack` slots larger than `capacity`, so that happens at most
+    once every `slack` appends.
+
+    Timestamps are stored as epoch microseconds (int64).
+    """
+
+    def __init__(self, capacity: int, slack: int = 64):
+        """
+        Initialize the candle buffer.
+
+        Args:
+            capacity: Maximum number of candles exposed through views
+            slack: Extra ring slots written before views handed out earlier are copied away from
+        """
+        self.capacity = capacity
+        self.slack = slack
+        self.reallocations = 0
+        self._size = capacity + slack
+        # Candles ever written and where the current contents start; both only grow
+        self._count = 0
+        self._start = 0
+        # Oldest candle a view handed out since the last reallocation may show
+        self._exposed: Optional[int] = None
+        self._version = 0
+        # Latest frame handed out and the version it shows, swapped as one so threads see a matching pair
+        self._frame: Optional[Tuple[int, pl.DataFrame]] = None
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(2 * self._size, dtype=np.float64 if dtype == pl.Float64 else np.int64)
+            for name, dtype in KLINE_SCHEMA.items()
+        }
+
+    @property
+    def version(self) -> int:
+        """Counter bumped on every change, usable as a cache key"""
+        return self._version
+
+    def __len__(self) -> int:
+        return min(self._count - self._start, self.capacity)
+
+    def clear(self) -> None:
+        self._start = self._count
+        self._version += 1
+
+    def _reserve(self, rows: int) -> None:
+        """Move to fresh memory if writing `rows` candles would overwrite one a view may show"""
+        # Writing candle i overwrites candle i - size
+        if self._exposed is not None and self._count + rows - 1 - self._size >= self._exposed:
+            self._columns = {name: column.copy() for name, column in self._columns.items()}
+            self._exposed = None
+            self.reallocations += 1
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Append one candle given as values in KLINE_COLUMNS order"""
+        self._reserve(1)
+        pos = self._count % self._size
+        for name, value in zip(KLINE_COLUMNS, row):
+            column = self._columns[name]
+            column[pos] = value
+            column[pos + self._size] = value
+        self._count += 1
+        self._version += 1
+
+    def extend(self, df: pl.DataFrame) -> None:
+        """Append every candle of a kline frame"""
+        if not len(df):
+            return
+
+        df = df.tail(self.capacity)
+        self._reserve(len(df))
+        positions = (self._count + np.arange(len(df))) % self._size
+        for name in KLINE_COLUMNS:
+            values = df[name].to_physical().to_numpy()
+            column = self._columns[name]
+            column[positions] = values
+            column[positions + self._size] = values
+        self._count += len(df)
+        self._version += 1
+
+    def view(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only contiguous view of a column, oldest first"""
+        first = self._count - len(self)
+        self._exposed = first if self._exposed is None else min(self._exposed, first)
+        start = first % self._size
+        view = self._columns[name][start:start + len(self)]
+        view.flags.writeable = False
+        return view
+
+    def last(self, name: str) -> Any:
+        """Value of a column for the most recent candle"""
+        if self._count == self._start:
+            raise IndexError("CandleBuffer is empty")
+        return self._columns[name][(self._count - 1) % self._size]
+
+    def to_polars(self) -> pl.DataFrame:
+        """Polars frame over the buffered candles, a zero-copy snapshot of the ring memory"""
+        if self._frame is None or self._frame[0] != self._version:
+            self._frame = (self._version, pl.DataFrame([
+                pl.Series(name, self.view(name)).cast(dtype)
+                for name, dtype in KLINE_SCHEMA.items()
+            ]))
+        return self._frame[1]
+
+    def frame_version(self, df: pl.DataFrame) -> Optional[int]:
+        """Version `df` shows if it is the latest frame from to_polars, else None"""
+        frame = self._frame
+        return frame[0] if frame is not None and frame[1] is df else None
@@ -6,6 +6,9 @@ class Settings(BaseSettings):
     default_symbol: str = "BTCUSDT"
     default_interval: str = "1m"
     log_level: str = "INFO"
+    binance_weight_limit: int = 6000
+    binance_http2: bool = False
+    kernel_backend: str = ""  # numba, polars, numpy or python; fastest available when empty
     username: str = ""  # Add this
     password: str = ""  # Add this
     
@@ -1,3 +1,7 @@
 # src/core/constants.py
-BINANCE_BASE_URL = "https://api.binance.com"
-BINANCE_WS_URL = "wss://stream.binance.com:9443/ws"
\ No newline at end of file
+import os
+
+# Override through the environment, e.g. to point at `python -m erendil.simulator`
+BINANCE_BASE_URL = os.getenv("BINANCE_BASE_URL", "https://api.binance.com")
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/ws")
+BINANCE_STREAM_URL = os.getenv("BINANCE_STREAM_URL", "wss://stream.binance.com:9443/stream")
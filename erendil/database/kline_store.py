@@ -0,0 +1,126 @@
+import os
+import logging
+import polars as pl
+from pathlib import Path
+from typing import Any, Iterable, Optional, Sequence
+from erendil.exchange.klines import KLINE_COLUMNS, empty_klines, klines_to_polars, merge_klines
+
+
+logger = logging.getLogger(__name__)
+
+TIME_COLUMNS = ("open_time", "close_time")
+
+
+class KlineStore:
+    """Local kline cache for one symbol/interval.
+
+    Closed candles are appended as single lines to a small tail file, and
+    the tail is periodically folded into a Parquet snapshot, so appends
+    stay O(1) and a crash loses at most the line being written.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        symbol: str,
+        interval: str,
+        max_rows: Optional[int] = None,
+        compact_every: int = 500,
+    ):
+        """
+        Initialize the kline store.
+
+        Args:
+            directory: Directory holding the cache files
+            symbol: Trading pair symbol (e.g., 'btcusdt')
+            interval: Kline interval (e.g., '1m')
+            max_rows: Number of most recent candles kept on compaction
+            compact_every: Appended candles before the tail is compacted
+        """
+        self.max_rows = max_rows
+        self.compact_every = compact_every
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{symbol.upper()}_{interval}"
+        self.snapshot_path = self.directory / f"{name}.parquet"
+        self.tail_path = self.directory / f"{name}.tail.csv"
+        self._tail_rows = 0
+
+    def load(self) -> pl.DataFrame:
+        """Load the snapshot and any appended candles, sorted and deduplicated"""
+        frames = []
+        if self.snapshot_path.exists():
+            try:
+                frames.append(pl.read_parquet(self.snapshot_path).select(KLINE_COLUMNS))
+            except Exception as e:
+                logger.error(f"Ignoring unreadable kline cache {self.snapshot_path}: {e}")
+
+        tail = self._read_tail()
+        self._tail_rows = len(tail)
+        frames.append(tail)
+        return merge_klines(frames, limit=self.max_rows)
+
+    def _read_tail(self) -> pl.DataFrame:
+        if not self.tail_path.exists():
+            return empty_klines()
+
+        rows = []
+        with open(self.tail_path, "r") as f:
+            for line in f:
+                # A torn final line (crash mid-write) has no newline; skip it
+                if not line.endswith("\n"):
+                    break
+                fields = line.rstrip("\n").split(",")
+                if len(fields) != len(KLINE_COLUMNS):
+                    continue
+                fields[0], fields[6], fields[8] = int(fields[0]), int(fields[6]), int(fields[8])
+                rows.append(fields)
+        return klines_to_polars(rows)
+
+    def append(self, df: pl.DataFrame) -> None:
+        """Append closed candles to the tail file"""
+        if not len(df):
+            return
+
+        rows = df.select(KLINE_COLUMNS).with_columns(
+            pl.col(name).dt.epoch("ms") for name in TIME_COLUMNS
+        )
+        self._write_lines(
+            ",".join(str(value) for value in row) + "\n"
+            for row in rows.iter_rows()
+        )
+
+    def append_row(self, row: Sequence[Any]) -> None:
+        """Append one closed candle given in KLINE_COLUMNS order (epoch-us timestamps)"""
+        fields = list(row)
+        fields[0] //= 1000
+        fields[6] //= 1000
+        self._write_lines([",".join(str(value) for value in fields) + "\n"])
+
+    def _write_lines(self, lines: Iterable[str]) -> None:
+        lines = list(lines)
+        with open(self.tail_path, "a") as f:
+            f.write("".join(lines))
+
+        self._tail_rows += len(lines)
+        if self._tail_rows >= self.compact_every:
+            self.compact()
+
+    def save(self, df: pl.DataFrame) -> None:
+        """Replace the cache with `df` and clear the tail"""
+        if self.max_rows:
+            df = df.tail(self.max_rows)
+
+        # Write then rename so a crash never leaves a half-written snapshot
+        tmp_path = self.snapshot_path.with_suffix(".parquet.tmp")
+        df.select(KLINE_COLUMNS).write_parquet(tmp_path)
+        os.replace(tmp_path, self.snapshot_path)
+
+        if self.tail_path.exists():
+            self.tail_path.unlink()
+        self._tail_rows = 0
+
+    def compact(self) -> None:
+        """Fold the tail file into the Parquet snapshot"""
+        self.save(self.load())
+        logger.debug(f"Compacted kline cache {self.snapshot_path}")
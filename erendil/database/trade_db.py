@@ -1,39 +1,97 @@
+import asyncio
 import hashlib
 import logging, aiosqlite
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+# Applied to every connection; WAL lets readers (the dashboard, other bots) run alongside the writer
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+)
+
+INSERT_TRADE = '''
+    INSERT INTO trades (
+        symbol, action, price, fee, pnl, signal_reason,
+        position_size, total_invested, entry_price,
+        remaining_position, total_pnl, timestamp,
+        trade_hash, interval
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(trade_hash) DO NOTHING
+'''
+
 
 class TradeDatabase:
-    def __init__(self, db_path: str = "trades.db"):
+    """Trade history in SQLite over one long-lived connection.
+
+    Trades are written by a single writer task: a trade saved while the
+    previous transaction is still committing joins the next one, so a
+    burst of trades shares a transaction. Duplicates are skipped by the
+    unique trade_hash index instead of a lookup before every insert.
+    """
+
+    def __init__(self, db_path: str = "trades.db", batch_window: float = 0, max_batch: int = 500):
+        """
+        Initialize the trade database.
+
+        Args:
+            db_path: SQLite database file
+            batch_window: Seconds an idle writer waits for more trades before writing
+            max_batch: Most trades written in one transaction
+        """
         self.db_path = db_path
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._db: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._pending: List[Tuple[tuple, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
 
     async def initialize(self):
         """Initialize the database and create necessary tables"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    price REAL NOT NULL,
-                    fee REAL NOT NULL,
-                    pnl REAL,
-                    signal_reason TEXT NOT NULL,
-                    position_size REAL NOT NULL,
-                    total_invested REAL NOT NULL,
-                    entry_price REAL,
-                    remaining_position REAL NOT NULL,
-                    total_pnl REAL,
-                    timestamp TEXT NOT NULL,
-                    trade_hash TEXT UNIQUE,
-                    interval TEXT NOT NULL
-                )
-            ''')
-            await db.commit()
+        db = await self._connection()
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                action TEXT NOT NULL,
+                price REAL NOT NULL,
+                fee REAL NOT NULL,
+                pnl REAL,
+                signal_reason TEXT NOT NULL,
+                position_size REAL NOT NULL,
+                total_invested REAL NOT NULL,
+                entry_price REAL,
+                remaining_position REAL NOT NULL,
+                total_pnl REAL,
+                timestamp TEXT NOT NULL,
+                trade_hash TEXT UNIQUE,
+                interval TEXT NOT NULL
+            )
+        ''')
+        # Finds get_trades' rows in timestamp order without a sort; not covering,
+        # since get_trades returns whole rows read from the table
+        await db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trades_symbol_interval_timestamp
+            ON trades (symbol, interval, timestamp)
+        ''')
+        await db.commit()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        async with self._connect_lock:
+            if self._db is None:
+                db = await aiosqlite.connect(self.db_path)
+                for pragma in PRAGMAS:
+                    await db.execute(pragma)
+                db.row_factory = aiosqlite.Row
+                self._db = db
+        return self._db
 
     def _generate_trade_hash(self, trade: Dict) -> str:
         """Generate a unique hash for a trade based on key attributes."""
@@ -44,50 +102,98 @@ class TradeDatabase:
 
     async def save_trade(self, trade: Dict, symbol: str, interval: str) -> bool:
         """Save a trade to the database with duplicate prevention"""
+        try:
+            return await self.insert_trade(trade, symbol, interval)
+        except Exception:
+            # Already logged by the writer
+            return False
+
+    async def insert_trade(self, trade: Dict, symbol: str, interval: str) -> bool:
+        """Save a trade; False for a duplicate, raises if the write failed"""
         trade_hash = self._generate_trade_hash(trade)
-        
+        row = (
+            symbol, trade['action'], trade['price'], trade['fee'],
+            trade['pnl'], trade['signal_reason'], trade['position_size'],
+            trade['total_invested'], trade['entry_price'],
+            trade['remaining_position'], trade['total_pnl'],
+            trade['timestamp'], trade_hash, interval
+        )
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+        return await future
+
+    async def _write_pending(self):
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Check for duplicate
-                cursor = await db.execute(
-                    'SELECT COUNT(*) FROM trades WHERE trade_hash = ?', 
-                    (trade_hash,)
-                )
-                count = await cursor.fetchone()
-                
-                if count[0] > 0:
-                    logger.warning(f"Duplicate trade detected and skipped: {trade_hash}")
-                    return False
-
-                # Insert new trade
-                await db.execute('''
-                    INSERT INTO trades (
-                        symbol, action, price, fee, pnl, signal_reason,
-                        position_size, total_invested, entry_price,
-                        remaining_position, total_pnl, timestamp,
-                        trade_hash, interval
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    symbol, trade['action'], trade['price'], trade['fee'],
-                    trade['pnl'], trade['signal_reason'], trade['position_size'],
-                    trade['total_invested'], trade['entry_price'],
-                    trade['remaining_position'], trade['total_pnl'],
-                    trade['timestamp'], trade_hash, interval
-                ))
-                await db.commit()
-                return True
+            # Lets trades saved in the same event loop pass join the first transaction
+            await asyncio.sleep(self.batch_window)
+            while self._pending:
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                await self._write(batch)
+        except asyncio.CancelledError:
+            pending, self._pending = self._pending, []
+            self._fail(pending, RuntimeError("Trade writer was cancelled"))
+            raise
 
+    async def _write(self, batch: List[Tuple[tuple, asyncio.Future]]):
+        """Write a batch of trades in one transaction"""
+        inserted: List[bool] = []
+        error: Exception = RuntimeError(f"Writing {len(batch)} trades was cancelled")
+        committed = False
+        try:
+            db = await self._connection()
+            for row, _ in batch:
+                cursor = await db.execute(INSERT_TRADE, row)
+                inserted.append(cursor.rowcount == 1)
+            await db.commit()
+            committed = True
         except Exception as e:
-            logger.error(f"Error saving trade to database: {e}")
-            return False
+            logger.error(f"Error saving {len(batch)} trades to database: {e}")
+            error = e
+        finally:
+            # Every caller gets an answer, even if the rollback fails or the writer is cancelled
+            if not committed:
+                self._fail(batch, error)
+                await self._rollback()
+        if not committed:
+            return
+
+        for (row, future), saved in zip(batch, inserted):
+            if not saved:
+                logger.warning(f"Duplicate trade detected and skipped: {row[12]}")
+            if not future.done():
+                future.set_result(saved)
+        logger.debug(f"Saved {sum(inserted)}/{len(batch)} trades in one transaction")
+
+    @staticmethod
+    def _fail(batch: List[Tuple[tuple, asyncio.Future]], error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _rollback(self):
+        if self._db is None:
+            return
+        try:
+            await self._db.rollback()
+        except Exception as e:
+            logger.error(f"Error rolling back trades: {e}")
 
     async def get_trades(self, symbol: str, interval: str) -> List[Dict]:
         """Retrieve trades for a symbol and interval"""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(
-                'SELECT * FROM trades WHERE symbol = ? AND interval = ? ORDER BY timestamp',
-                (symbol, interval)
-            )
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
\ No newline at end of file
+        db = await self._connection()
+        cursor = await db.execute(
+            'SELECT * FROM trades WHERE symbol = ? AND interval = ? ORDER BY timestamp',
+            (symbol, interval)
+        )
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+    async def close(self):
+        """Write pending trades and close the connection"""
+        if self._writer is not None:
+            await self._writer
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
@@ -0,0 +1,374 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# When appended trades are forced to disk
+FSYNC_POLICIES = ("always", "interval", "never")
+
+# Bytes copied at a time when a snapshot carries the previous one over
+COPY_CHUNK = 1 << 20
+# Journal bytes folded between two chances for appends to take the GIL
+SEGMENT_CHUNK = 1 << 16
+
+
+def journal_path(log_file: str) -> Path:
+    """Journal next to a trade log, e.g. BTCUSDT_1m_log_file.json -> BTCUSDT_1m_log_file.journal.jsonl"""
+    path = Path(log_file)
+    return path.with_name(f"{path.stem}.journal.jsonl")
+
+
+def sealed_path(log_file: str) -> Path:
+    """Journal segment rotated out for the snapshot being written"""
+    path = journal_path(log_file)
+    return path.with_name(f"{path.name}.1")
+
+
+def _read_snapshot(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, "r") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    if not content:
+        return None
+    data = json.loads(content)
+    # Logs written before the journal existed hold exactly their first trades
+    data.setdefault("journal_seq", len(data.get("trades", [])))
+    return data
+
+
+def _snapshot_tail(path: Path) -> Optional[Tuple[int, bool, Dict]]:
+    """Offset of the `]` closing the trades list, whether the list is empty and the fields after it.
+
+    None when the log is missing or not shaped {"trades": [...], ...}
+    with the trades first, so it cannot be extended in place.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        head = f.read(64).lstrip()
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - 4096)
+        f.seek(start)
+        tail = f.read()
+    if not head.startswith(b"{") or not head[1:].lstrip().startswith(b'"trades"'):
+        return None
+    end = tail.rfind(b"]")
+    if end < 0 or not tail[:end].strip():
+        return None
+    # What follows the list is the rest of the object: , "symbol": ..., "journal_seq": ...}
+    rest = tail[end + 1:].strip()
+    if rest == b"}":
+        fields = {}
+    elif rest.startswith(b","):
+        try:
+            fields = json.loads(b"{" + rest[1:])
+        except ValueError:
+            return None
+    else:
+        return None
+    return start + end, tail[:end].rstrip().endswith(b"["), fields
+
+
+def _snapshot_seq(path: Path) -> int:
+    """Last journal sequence number folded into a trade log"""
+    tail = _snapshot_tail(path)
+    if tail is not None and "journal_seq" in tail[2]:
+        return tail[2]["journal_seq"]
+    data = _read_snapshot(path)
+    return data["journal_seq"] if data else 0
+
+
+def _read_journal(path: Path, after: int) -> Tuple[List[Dict], int, int]:
+    """Trades with a sequence number above `after`, the last sequence number and the valid byte length"""
+    trades, seq, valid = [], after, 0
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return trades, seq, valid
+    with f:
+        for line in f:
+            # A torn final line (crash mid-write) has no newline; skip it
+            if not line.endswith(b"\n"):
+                break
+            record = json.loads(line)
+            valid += len(line)
+            # Lines already folded into the snapshot survive a crash before the journal was cleared
+            if record["seq"] > seq:
+                trades.append(record["trade"])
+                seq = record["seq"]
+    return trades, seq, valid
+
+
+# A journal line as append writes it; group 1 is the trade's JSON
+_RECORD = re.compile(rb'\{"seq": (?:\d+), "trade": (.*)\}\n')
+
+
+def _record_seq(line: bytes) -> Optional[int]:
+    if not line.startswith(b'{"seq": '):
+        return None
+    try:
+        return int(line[8:line.index(b",")])
+    except ValueError:
+        return None
+
+
+def _read_segment(path: Path, after: int) -> Tuple[List[bytes], int]:
+    """JSON text of the trades of a journal segment with a sequence number above `after`.
+
+    Returned as pieces of comma-separated trades, copied from the journal
+    without decoding them, a chunk at a time so appends on other threads
+    get the GIL between chunks.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    # A torn final line has no newline
+    data = data[:data.rfind(b"\n") + 1]
+    if not data:
+        return [], after
+    first = _record_seq(data)
+    last = _record_seq(data[data.rfind(b"\n", 0, len(data) - 1) + 1:])
+    if first is None or last is None or first <= after:
+        # Lines folded earlier, or not in the shape append writes
+        return _read_segment_lines(data, after)
+
+    pieces, start = [], 0
+    while start < len(data):
+        end = data.rfind(b"\n", start, start + SEGMENT_CHUNK) + 1 or data.find(b"\n", start) + 1
+        chunk = data[start:end]
+        piece, count = _RECORD.subn(rb"\1, ", chunk)
+        if count != chunk.count(b"\n"):
+            return _read_segment_lines(data, after)
+        pieces.append(piece[:-2])
+        start = end
+        time.sleep(0)
+    return pieces, last
+
+
+def _read_segment_lines(data: bytes, after: int) -> Tuple[List[bytes], int]:
+    trades, seq = [], after
+    for line in data.splitlines():
+        record = json.loads(line)
+        if record["seq"] > seq:
+            trades.append(json.dumps(record["trade"], default=str).encode())
+            seq = record["seq"]
+    return trades, seq
+
+
+def _files_state(log_file: str) -> Tuple:
+    """Changes whenever a snapshot rotates the journal or replaces the log, but not on appends"""
+    state = []
+    for path in (Path(log_file), sealed_path(log_file), journal_path(log_file)):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            state.append(None)
+            continue
+        state.append((stat.st_ino, stat.st_mtime_ns) if path.suffix != ".jsonl" else stat.st_ino)
+    return tuple(state)
+
+
+def read_trade_log(log_file: str, attempts: int = 5) -> Optional[Dict]:
+    """Trade log in its JSON shape, including trades journaled since the last snapshot"""
+    for _ in range(attempts):
+        state = _files_state(log_file)
+        data = _read_snapshot(Path(log_file))
+        seq = data["journal_seq"] if data else 0
+        trades = []
+        # The segment being folded, then the journal appended to meanwhile
+        for path in (sealed_path(log_file), journal_path(log_file)):
+            journaled, seq, _ = _read_journal(path, seq)
+            trades.extend(journaled)
+        # Read again if a snapshot moved trades between the files while they were read
+        if _files_state(log_file) == state:
+            break
+
+    if data is None:
+        if not trades:
+            return None
+        data = {"trades": [], "journal_seq": 0}
+    data["trades"].extend(trades)
+    data["journal_seq"] = seq
+    return data
+
+
+class TradeJournal:
+    """Append-only trade log for one symbol/interval.
+
+    Each trade is appended as one JSON line with a sequence number, so a
+    write costs the same however long the bot has run and a crash loses
+    at most the line being written. Trades are not kept in memory.
+
+    Once the journal has grown by `snapshot_growth` of the JSON log (and
+    by at least `snapshot_every` trades) it is rotated to a sealed
+    segment, and a background thread folds that segment into `log_file`
+    in its usual JSON shape: the previous log is copied up to the end of
+    its trades, the new trades are added, and the result is renamed over
+    it, recording the last folded sequence number as `journal_seq`.
+    Appends go to a fresh journal meanwhile and never wait on the fold.
+    """
+
+    def __init__(
+        self,
+        log_file: str,
+        symbol: str,
+        interval: str,
+        fsync: str = "always",
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 50,
+        snapshot_growth: float = 0.25,
+    ):
+        """
+        Initialize the journal, recovering trades from an earlier run.
+
+        Args:
+            log_file: JSON trade log read by the dashboard
+            symbol: Trading pair symbol
+            interval: Candle interval
+            fsync: always (every trade), interval (at most every `fsync_interval`
+                seconds) or never (left to the OS)
+            fsync_interval: Seconds between fsyncs under the interval policy
+            snapshot_every: Fewest journaled trades folded into `log_file` at once
+            snapshot_growth: Journal size, as a fraction of `log_file`, that triggers a fold
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {', '.join(FSYNC_POLICIES)}")
+        self.log_file = Path(log_file)
+        self.path = journal_path(log_file)
+        self.sealed = sealed_path(log_file)
+        self.symbol = symbol
+        self.interval = interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.snapshot_growth = snapshot_growth
+        self.snapshots = 0
+        self._last_fsync = 0.0
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._snapshotter: Optional[threading.Thread] = None
+
+        self.snapshot_seq = _snapshot_seq(self.log_file)
+        if self.sealed.exists():
+            # A fold interrupted by a crash
+            self._fold()
+        _, self.seq, valid = _read_journal(self.path, self.snapshot_seq)
+        self._journal_bytes = valid
+        self._snapshot_bytes = self.log_file.stat().st_size if self.log_file.exists() else 0
+
+        if self.path.exists() and valid < self.path.stat().st_size:
+            logger.warning(f"Dropping a torn record at the end of {self.path}")
+            # Cut it off so the next append starts on a fresh line
+            os.truncate(self.path, valid)
+        self._file = open(self.path, "a")
+
+    @property
+    def pending(self) -> int:
+        """Journaled trades not yet in the snapshot"""
+        return self.seq - self.snapshot_seq
+
+    def append(self, trade_entry: Dict) -> int:
+        """Journal one trade and return its sequence number"""
+        with self._lock:
+            self.seq += 1
+            line = json.dumps({"seq": self.seq, "trade": trade_entry}, default=str) + "\n"
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync == "always" or (
+                self.fsync == "interval" and time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                os.fsync(self._file.fileno())
+                self._last_fsync = time.monotonic()
+            self._journal_bytes += len(line)
+            seq = self.seq
+
+        if (
+            self.pending >= self.snapshot_every
+            and self._journal_bytes >= self.snapshot_growth * self._snapshot_bytes
+            and not (self._snapshotter and self._snapshotter.is_alive())
+        ):
+            self._snapshotter = threading.Thread(target=self.snapshot, name=f"snapshot-{self.path.name}", daemon=True)
+            self._snapshotter.start()
+        return seq
+
+    def snapshot(self) -> None:
+        """Rotate the journal and fold it into the JSON log"""
+        with self._snapshot_lock:
+            if self.sealed.exists():
+                # Left by a fold that failed
+                self._fold()
+            with self._lock:
+                if not self.pending:
+                    return
+                self._rotate()
+            self._fold()
+
+    def _rotate(self) -> None:
+        """Seal the journal and start an empty one; called under the lock"""
+        self._file.close()
+        os.replace(self.path, self.sealed)
+        self._file = open(self.path, "a")
+        self._journal_bytes = 0
+
+    def _fold(self) -> None:
+        """Write the sealed segment's trades into the JSON log, then drop the segment"""
+        trades, seq = _read_segment(self.sealed, self.snapshot_seq)
+        if trades:
+            self._write_snapshot(trades, seq)
+        self.sealed.unlink()
+        self.snapshot_seq = max(self.snapshot_seq, seq)
+        self._snapshot_bytes = self.log_file.stat().st_size if self.log_file.exists() else 0
+        self.snapshots += 1
+        logger.debug(f"Snapshotted trade journal into {self.log_file} at seq {seq}")
+
+    def _write_snapshot(self, trades: List[bytes], seq: int) -> None:
+        tail = _snapshot_tail(self.log_file)
+        if tail is None and self.log_file.exists():
+            # Not extendable in place (e.g. an empty file): rewrite it once in the compact shape
+            previous = _read_snapshot(self.log_file)
+            trades = [json.dumps(trade, default=str).encode() for trade in (previous or {}).get("trades", [])] + trades
+
+        # Write then rename so a crash never leaves a half-written log
+        tmp_path = self.log_file.with_name(f"{self.log_file.name}.tmp")
+        with open(tmp_path, "wb") as out:
+            first = True
+            if tail is None:
+                out.write(b'{"trades": [')
+            else:
+                end, first, _ = tail
+                with open(self.log_file, "rb") as f:
+                    while end > 0:
+                        chunk = f.read(min(COPY_CHUNK, end))
+                        out.write(chunk)
+                        end -= len(chunk)
+            if trades:
+                out.write((b"" if first else b", ") + b", ".join(trades))
+            out.write(
+                f'], "symbol": {json.dumps(self.symbol)}, "interval": {json.dumps(self.interval)}, '
+                f'"journal_seq": {seq}}}'.encode()
+            )
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.log_file)
+
+    def close(self) -> None:
+        """Snapshot outstanding trades and close the journal"""
+        if self._file.closed:
+            return
+        if self._snapshotter:
+            self._snapshotter.join()
+        self.snapshot()
+        with self._lock:
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
@@ -7,10 +7,16 @@ import polars as pl
 from erendil.core.config import settings
 from datetime import datetime, timezone, timedelta
 from websockets.exceptions import ConnectionClosed
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Set, Tuple, Awaitable
 from erendil.models.exceptions import BinanceAPIException
-from erendil.models.data_models import KlineData, WebsocketKline
-from erendil.core.constants import BINANCE_BASE_URL, BINANCE_WS_URL
+from erendil.models.data_models import KlineData
+from erendil.core.constants import BINANCE_BASE_URL, BINANCE_WS_URL, BINANCE_STREAM_URL
+from erendil.core.candle_buffer import CandleBuffer
+from erendil.database.kline_store import KlineStore
+from erendil.exchange.klines import KLINE_SCHEMA, empty_klines, klines_to_polars, merge_klines
+from erendil.exchange.rest import KLINES_WEIGHT, get_http_client, rate_limiter
+from erendil.exchange.decoder import KlineUpdate, decode_combined, decode_kline
+from erendil.exchange.dispatcher import LatestValueDispatcher
 
 
 logger = logging.getLogger(__name__)
@@ -26,7 +32,8 @@ class BinanceKlineManager:
         limit: int = 1000,
         retry_delay: int = 5,
         max_retries: int = 3,
-        semaphore_limit: int = 10
+        semaphore_limit: int = 10,
+        cache_dir: Optional[str] = None
     ):
         """
         Initialize the Binance Kline Manager.
@@ -40,6 +47,7 @@ class BinanceKlineManager:
             retry_delay: Delay between retries in seconds
             max_retries: Maximum number of retry attempts
             semaphore_limit: Maximum number of concurrent requests
+            cache_dir: Directory for the local kline cache (disabled when None)
         """
         self.limit = limit
         self.is_running = False
@@ -49,19 +57,40 @@ class BinanceKlineManager:
         self.max_retries = max_retries
         self.onclose_callback = onclose_callback
         self.onmessage_callback = onmessage_callback
+        self.tick_dispatcher = LatestValueDispatcher(onmessage_callback)
+        # Backfills and catch-ups running in the background, cancelled on stop
+        self._tasks: Set[asyncio.Task] = set()
+        # Close callbacks in flight, awaited on stop so their decisions finish
+        self._callbacks: Set[asyncio.Task] = set()
+        self._update_lock = asyncio.Lock()
         self._temp_data: Optional[pl.DataFrame] = None
-        self.historical_data: Optional[pl.DataFrame] = None
+        self.candles = CandleBuffer(capacity=limit)
         self.request_semaphore = asyncio.Semaphore(semaphore_limit)
+        self.store = KlineStore(cache_dir, self.symbol, interval, max_rows=limit) if cache_dir else None
         
         # API endpoints
         self.base_rest_url = f"{BINANCE_BASE_URL}/api/v3"
-        self.ws_url = f"{BINANCE_WS_URL}/{self.symbol}@kline_{self.interval}"
+        self.stream_name = f"{self.symbol}@kline_{self.interval}"
+        self.ws_url = f"{BINANCE_WS_URL}/{self.stream_name}"
         
         # Authentication headers if API keys are provided
         self.headers = {}
         if settings.binance_api_key:
             self.headers["X-MBX-APIKEY"] = settings.binance_api_key
             
+    @property
+    def historical_data(self) -> Optional[pl.DataFrame]:
+        """Closed candles as a Polars frame over the ring buffer"""
+        if not len(self.candles):
+            return None
+        return self.candles.to_polars()
+    
+    @historical_data.setter
+    def historical_data(self, df: Optional[pl.DataFrame]) -> None:
+        self.candles.clear()
+        if df is not None:
+            self.candles.extend(df)
+            
     def convert_to_ist(self, utc_time: datetime) -> datetime:
         """Convert UTC datetime to IST datetime"""
         ist = timezone(timedelta(hours=5, minutes=30))
@@ -81,30 +110,33 @@ class BinanceKlineManager:
             "trades": kline.trades,
             "taker_buy_volume": kline.taker_buy_volume,
             "taker_buy_quote_volume": kline.taker_buy_quote_volume
-        }])
+        }], schema=KLINE_SCHEMA)
     
-    async def _make_request(self, method: str, endpoint: str, params: Dict[str, Any] = None) -> Any:
+    async def _make_request(
+        self, method: str, endpoint: str, params: Dict[str, Any] = None, weight: int = 1
+    ) -> Any:
         """Make HTTP request to Binance API with retry logic"""
         url = f"{self.base_rest_url}/{endpoint}"
+        client = get_http_client()
         
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(
-                        method=method,
-                        url=url,
-                        params=params,
-                        headers=self.headers,
-                        timeout=30.0
-                    )
-                    response.raise_for_status()
-                    return response.json()
+                await rate_limiter.acquire(weight)
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    headers=self.headers,
+                )
+                rate_limiter.update_from_headers(response.headers)
+                response.raise_for_status()
+                return response.json()
                     
             except httpx.HTTPStatusError as e:
-                if e.response.status_code == 429:  # Rate limit exceeded
+                if e.response.status_code in (418, 429):  # Rate limit exceeded / IP ban
                     retry_after = int(e.response.headers.get('Retry-After', self.retry_delay))
-                    logger.warning(f"Rate limit exceeded. Waiting {retry_after} seconds...")
-                    await asyncio.sleep(retry_after)
+                    logger.warning(f"Rate limit exceeded. Pausing all requests for {retry_after} seconds...")
+                    rate_limiter.pause(retry_after)
                     continue
                     
                 raise BinanceAPIException(f"HTTP error occurred: {e.response.text}")
@@ -116,22 +148,18 @@ class BinanceKlineManager:
                 raise BinanceAPIException(f"Request failed: {str(e)}")
     
     async def fetch_historical_data(self) -> None:
-        """Fetch historical kline data using parallel requests"""
+        """Load cached klines and fetch only the missing ranges using parallel requests"""
         try:
-            # Calculate number of requests needed and time ranges
-            requests_needed = (self.limit + 999) // 1000  # Ceiling division
-            batch_size = 1000
-            
-            end_time = int(datetime.now(timezone.utc).timestamp() * 1000)
+            now = int(datetime.now(timezone.utc).timestamp() * 1000)
             interval_ms = self._get_interval_ms(self.interval)
-            batch_ms = interval_ms * batch_size
+            window_start = now - interval_ms * (self.limit + 1)
             
-            # Create time ranges for each request
-            time_ranges = []
-            for i in range(requests_needed):
-                start = end_time - batch_ms
-                time_ranges.append((start, end_time))
-                end_time = start - 1
+            cached = self._load_cache()
+            time_ranges = [
+                batch
+                for start, end in self._missing_ranges(cached, window_start, now, interval_ms)
+                for batch in self._time_ranges(start, end, interval_ms)
+            ]
             
             # Create tasks for parallel execution
             tasks = [
@@ -142,31 +170,78 @@ class BinanceKlineManager:
             # Execute all requests in parallel
             batches = await asyncio.gather(*tasks)
             
-            # Combine and sort all klines
-            all_klines = []
-            for batch in batches:
-                all_klines.extend(batch)
+            # Merge the columnar batches with a single sort/dedup pass,
+            # leaving out the candle that is still open
+            history = (
+                merge_klines([cached, *batches])
+                .filter(pl.col("close_time").dt.epoch("ms") < now)
+                .tail(self.limit)
+            )
             
-            # Convert to Polars DataFrame
-            if all_klines:
-                dfs = [self.kline_to_polars(kline) for kline in all_klines]
-                self.historical_data = pl.concat(dfs)
-                
-                # Sort by open_time and remove duplicates
-                self.historical_data = (
-                    self.historical_data
-                    .sort("open_time")
-                    .unique(subset=["open_time"])
-                    .tail(self.limit)
+            if len(history):
+                self.historical_data = history
+                logger.debug(
+                    f"Loaded {len(cached)} cached and fetched {len(history) - len(cached)} "
+                    f"new klines in {len(time_ranges)} requests"
                 )
-                
-                logger.debug(f"Fetched {len(self.historical_data)} historical klines")
+                self._save_cache(history)
             else:
                 logger.warning("No historical data retrieved")
             
         except Exception as e:
             logger.error(f"Error fetching historical data: {e}")
             raise
+    
+    def _missing_ranges(
+        self, cached: pl.DataFrame, window_start: int, now: int, interval_ms: int
+    ) -> List[Tuple[int, int]]:
+        """Work out which parts of [window_start, now] are not covered by the cache"""
+        if not len(cached):
+            return [(window_start, now)]
+        
+        first = cached["open_time"].dt.epoch("ms")[0]
+        last = cached["open_time"].dt.epoch("ms")[-1]
+        if last < window_start:
+            return [(window_start, now)]
+        
+        ranges = []
+        if first - window_start >= interval_ms:
+            ranges.append((window_start, first - 1))
+        ranges.append((last + interval_ms, now))
+        return ranges
+    
+    def _time_ranges(self, start: int, end: int, interval_ms: int) -> List[Tuple[int, int]]:
+        """Split [start, end] into request ranges of at most 1000 klines"""
+        batch_ms = interval_ms * 1000
+        return [
+            (batch_start, min(batch_start + batch_ms - 1, end))
+            for batch_start in range(start, end + 1, batch_ms)
+        ]
+    
+    def _load_cache(self) -> pl.DataFrame:
+        if self.store is None:
+            return empty_klines()
+        try:
+            return self.store.load()
+        except Exception as e:
+            logger.error(f"Error loading kline cache: {e}")
+            return empty_klines()
+    
+    def _save_cache(self, history: pl.DataFrame) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.save(history)
+        except Exception as e:
+            logger.error(f"Error saving kline cache: {e}")
+    
+    def _append_cache(self, row: tuple) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.append_row(row)
+        except Exception as e:
+            logger.error(f"Error appending to kline cache: {e}")
 
     def _get_interval_ms(self, interval: str) -> int:
         """Convert interval string to milliseconds"""
@@ -191,8 +266,8 @@ class BinanceKlineManager:
         self, 
         start_time: int, 
         end_time: int
-    ) -> List[KlineData]:
-        """Fetch a single batch of klines"""
+    ) -> pl.DataFrame:
+        """Fetch a single batch of klines as a typed DataFrame"""
         params = {
             "limit": 1000,
             "endTime": end_time,
@@ -202,81 +277,155 @@ class BinanceKlineManager:
         }
         async with self.request_semaphore:
             try:
-                data = await self._make_request("GET", "klines", params)
-                
-                return [
-                    KlineData(
-                        open_time=datetime.fromtimestamp(k[0] / 1000, tz=timezone.utc),
-                        open=float(k[1]),
-                        high=float(k[2]),
-                        low=float(k[3]),
-                        close=float(k[4]),
-                        volume=float(k[5]),
-                        close_time=datetime.fromtimestamp(k[6] / 1000, tz=timezone.utc),
-                        quote_volume=float(k[7]),
-                        trades=int(k[8]),
-                        taker_buy_volume=float(k[9]),
-                        taker_buy_quote_volume=float(k[10])
-                    )
-                    for k in data
-                ]
+                data = await self._make_request("GET", "klines", params, weight=KLINES_WEIGHT)
+                return klines_to_polars(data)
             except Exception as e:
                 logger.error(f"Error fetching batch {start_time}-{end_time}: {e}")
-                return []
+                return klines_to_polars([])
     
     async def process_data_onmessage(self, current_price: float) -> None:
         """Process data received from the websocket"""
-        try:
-            asyncio.create_task(self.onmessage_callback(current_price))
-        except Exception as e:
-            logger.error(f"Error in callback processing: {e}")
+        # Only the newest price is evaluated; stale ticks are coalesced away
+        self.tick_dispatcher.submit(current_price)
     
     async def process_data_onclose(self) -> None:
         """Process data received from the websocket on candle close"""
         # Use historical data for confirmed candles
-        if self.historical_data is not None:
-            try:
-                asyncio.create_task(self.onclose_callback(self.historical_data))
-            except Exception as e:
-                logger.error(f"Error in callback processing: {e}")
+        if len(self.candles):
+            self._track(self._callbacks, self._run_onclose(self.historical_data))
+    
+    async def _run_onclose(self, df: pl.DataFrame) -> None:
+        try:
+            await self.onclose_callback(df)
+        except Exception as e:
+            logger.error(f"Error in callback processing: {e}")
+    
+    @staticmethod
+    def _track(tasks: Set[asyncio.Task], coro: Awaitable[None]) -> asyncio.Task:
+        """Run `coro` as a task kept in `tasks` until it finishes"""
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+    
+    def catch_up(self) -> None:
+        """Backfill, in the background, the candles that closed while the websocket was down"""
+        self._track(self._tasks, self._catch_up())
     
     async def _handle_websocket_message(self, message: str) -> None:
         """Handle incoming websocket messages"""
         try:
-            ws_data = WebsocketKline.model_validate_json(message)
-            
+            update = decode_kline(message)
+        except Exception as e:
+            logger.error(f"Error processing websocket message: {e}")
+            return
+        await self._handle_kline_update(update)
+    
+    async def _handle_kline_update(self, update: KlineUpdate) -> None:
+        """Handle a decoded kline event for this symbol/interval"""
+        try:
             # Process completed candles
-            if ws_data.kline.get('x', False):  # Candle closed
-                kline_data = ws_data.to_kline_data
-                new_row = self.kline_to_polars(kline_data)
-                
-                # Update permanent historical data
-                self.historical_data = pl.concat([
-                    self.historical_data, new_row
-                ])
-                
-                logger.debug(
-                    f"New kline added - Time: {self.convert_to_ist(kline_data.close_time)}, "
-                    f"Close: {kline_data.close_price:.2f}"
-                )
-
-                await self.process_data_onclose()
+            if update.closed:
+                if self._update_lock.locked() or self._has_gap(update.row[0] // 1000):
+                    # Backfill in the background so the socket keeps being read;
+                    # the lock keeps closed candles in arrival order
+                    self._track(self._tasks, self._append_closed_candle(update))
+                else:
+                    await self._append_closed_candle(update)
             
             # Real-time updates - Just pass current price
-            else:
-                if self.historical_data is not None:
-                    current_price = float(ws_data.kline['c'])
-                    await self.process_data_onmessage(current_price)  # Just pass the price
+            elif len(self.candles):
+                await self.process_data_onmessage(update.close)
                 
         except Exception as e:
             logger.error(f"Error processing websocket message: {e}")
     
+    async def _append_closed_candle(self, update: KlineUpdate) -> None:
+        """Splice any missed candles, append the closed one and fire the callback"""
+        try:
+            async with self._update_lock:
+                open_time = update.row[0] // 1000
+                if len(self.candles) and open_time <= self.candles.last("open_time") // 1000:
+                    return  # Already present (delivered by a backfill)
+                
+                await self._backfill_until(open_time)
+                
+                # Update permanent historical data (O(1), oldest candle drops out)
+                self.candles.append(update.row)
+                self._append_cache(update.row)
+                
+                if logger.isEnabledFor(logging.DEBUG):
+                    close_time = datetime.fromtimestamp(update.row[6] / 1e6, tz=timezone.utc)
+                    logger.debug(
+                        f"New kline added - Time: {self.convert_to_ist(close_time)}, "
+                        f"Close: {update.close:.2f}"
+                    )
+
+                await self.process_data_onclose()
+        
+        except Exception as e:
+            logger.error(f"Error processing closed candle: {e}")
+    
+    def _has_gap(self, open_time: int) -> bool:
+        """Check whether candles are missing before the candle opening at `open_time` (ms)"""
+        if not len(self.candles) or self.interval[-1] in "wM":
+            # Weekly and monthly candles are not aligned to the epoch, so the
+            # next open time cannot be derived from the interval length
+            return False
+        expected = self.candles.last("open_time") // 1000 + self._get_interval_ms(self.interval)
+        return open_time > expected
+    
+    async def _backfill_until(self, open_time: int) -> int:
+        """Fetch candles missing before `open_time` (ms) through REST and append them"""
+        if not self._has_gap(open_time):
+            return 0
+        
+        interval_ms = self._get_interval_ms(self.interval)
+        start = self.candles.last("open_time") // 1000 + interval_ms
+        # Only the newest `limit` candles fit in the buffer anyway
+        start = max(start, open_time - interval_ms * self.limit)
+        
+        batches = await asyncio.gather(*[
+            self._fetch_klines_batch(batch_start, batch_end)
+            for batch_start, batch_end in self._time_ranges(start, open_time - 1, interval_ms)
+        ])
+        gap = merge_klines(batches).filter(
+            pl.col("open_time").dt.epoch("ms").is_between(start, open_time - 1)
+        )
+        
+        logger.warning(
+            f"{self.stream_name}: {(open_time - start) // interval_ms} candles missing, "
+            f"backfilled {len(gap)} from REST"
+        )
+        if len(gap):
+            self.candles.extend(gap)
+            if self.store is not None:
+                try:
+                    self.store.append(gap)
+                except Exception as e:
+                    logger.error(f"Error appending to kline cache: {e}")
+        return len(gap)
+    
+    async def _catch_up(self) -> None:
+        """Backfill candles that closed while the websocket was disconnected"""
+        try:
+            async with self._update_lock:
+                now = int(datetime.now(timezone.utc).timestamp() * 1000)
+                interval_ms = self._get_interval_ms(self.interval)
+                current_open = now - now % interval_ms
+                if await self._backfill_until(current_open):
+                    await self.process_data_onclose()
+        except Exception as e:
+            logger.error(f"Error backfilling after reconnect: {e}")
+    
     async def _maintain_websocket(self) -> None:
         """Maintain the websocket connection with heartbeat"""
         while self.is_running:
             try:
                 async with websockets.connect(self.ws_url) as websocket:
                     logger.info("WebSocket connection established")
+                    if len(self.candles):
+                        self.catch_up()
                     
                     # Set up ping/pong
                     ping_task = asyncio.create_task(self._ping_websocket(websocket))
@@ -322,8 +471,204 @@ class BinanceKlineManager:
     async def stop(self) -> None:
         """Stop the websocket stream"""
         self.is_running = False
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*list(self._callbacks), return_exceptions=True)
+        await self.tick_dispatcher.stop()
+        logger.info(f"{self.stream_name} tick dispatch stats: {self.tick_dispatcher.stats}")
+
+
+class BinanceExchange:
+    """Multiplex many kline streams over a single combined-stream connection"""
+    
+    MAX_STREAMS = 1024            # Binance limit per combined-stream connection
+    MAX_PARAMS_PER_REQUEST = 200  # Streams per SUBSCRIBE/UNSUBSCRIBE message
+    CONTROL_MESSAGE_DELAY = 0.25  # Binance accepts 5 control messages per second
+    
+    def __init__(self, retry_delay: int = 5, ping_interval: int = 180):
+        """
+        Initialize the multiplexed exchange client.
+        
+        Args:
+            retry_delay: Delay between reconnect attempts in seconds
+            ping_interval: Interval between keep-alive pings in seconds
+        """
+        self.is_running = False
+        self.retry_delay = retry_delay
+        self.ping_interval = ping_interval
+        self.kline_managers: Dict[str, BinanceKlineManager] = {}
+        self._request_id = 0
+        self._send_lock = asyncio.Lock()
+        self._websocket: Optional[websockets.WebSocketClientProtocol] = None
+    
+    async def add_symbol_stream(
+        self,
+        symbol: str,
+        interval: str,
+        onclose_callback: Callable[[pl.DataFrame], None],
+        onmessage_callback: Callable[[pl.DataFrame], None],
+        limit: int = 1000,
+        cache_dir: Optional[str] = None,
+        subscribe: bool = True,
+    ) -> BinanceKlineManager:
+        """Create a kline manager, load its history and subscribe its stream
+        (unless `subscribe` is False, to pass it to add_managers with others)"""
+        manager = BinanceKlineManager(
+            limit=limit,
+            symbol=symbol.lower(),
+            interval=interval,
+            onclose_callback=onclose_callback,
+            onmessage_callback=onmessage_callback,
+            cache_dir=cache_dir
+        )
+        await manager.fetch_historical_data()
+        if subscribe:
+            await self.add_manager(manager)
+        return manager
+    
+    async def add_manager(self, manager: BinanceKlineManager) -> None:
+        """Route an existing kline manager's stream through this connection"""
+        await self.add_managers([manager])
+    
+    async def add_managers(self, managers: List[BinanceKlineManager]) -> None:
+        """Route existing kline managers' streams through this connection in one SUBSCRIBE"""
+        stream_names = [manager.stream_name for manager in managers]
+        duplicates = {name for name in stream_names if name in self.kline_managers or stream_names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Stream already subscribed: {', '.join(sorted(duplicates))}")
+        if len(self.kline_managers) + len(managers) > self.MAX_STREAMS:
+            raise BinanceAPIException(
+                f"Cannot subscribe more than {self.MAX_STREAMS} streams on one connection"
+            )
+        
+        for manager in managers:
+            self.kline_managers[manager.stream_name] = manager
+            manager.is_running = True
+        await self._send_control("SUBSCRIBE", stream_names)
+        logger.info(f"Subscribed to {', '.join(stream_names)}")
+    
+    async def remove_symbol_stream(self, symbol: str, interval: str) -> None:
+        """Unsubscribe a symbol/interval stream and stop its manager"""
+        await self.unsubscribe(await self.detach_streams([(symbol, interval)]))
+    
+    async def detach_streams(self, streams: List[Tuple[str, str]]) -> List[str]:
+        """Stop routing (symbol, interval) streams to their managers and stop those,
+        without telling Binance yet; returns the stream names for `unsubscribe`"""
+        detached = []
+        for symbol, interval in streams:
+            stream_name = f"{symbol.lower()}@kline_{interval}"
+            manager = self.kline_managers.pop(stream_name, None)
+            if manager is not None:
+                await manager.stop()
+                detached.append(stream_name)
+        return detached
+    
+    async def unsubscribe(self, stream_names: List[str]) -> None:
+        """UNSUBSCRIBE detached streams, as few messages as Binance allows"""
+        await self._send_control("UNSUBSCRIBE", stream_names)
+        if stream_names:
+            logger.info(f"Unsubscribed from {', '.join(stream_names)}")
+    
+    async def _send_control(self, method: str, streams: List[str]) -> None:
+        """Send SUBSCRIBE/UNSUBSCRIBE requests, paced to Binance's message limit"""
+        if self._websocket is None or not streams:
+            # Streams are (re)subscribed when the connection is established
+            return
+        
+        async with self._send_lock:
+            for i in range(0, len(streams), self.MAX_PARAMS_PER_REQUEST):
+                self._request_id += 1
+                await self._websocket.send(json.dumps({
+                    "method": method,
+                    "params": streams[i:i + self.MAX_PARAMS_PER_REQUEST],
+                    "id": self._request_id,
+                }))
+                await asyncio.sleep(self.CONTROL_MESSAGE_DELAY)
+    
+    async def _route_message(self, message: str) -> None:
+        """Dispatch a combined-stream frame to the manager that owns its stream"""
+        try:
+            decoded = decode_combined(message)
+        except Exception as e:
+            logger.error(f"Invalid websocket frame: {e}")
+            return
         
+        if decoded is None:
+            # Response to a SUBSCRIBE/UNSUBSCRIBE request
+            response = json.loads(message)
+            if response.get("error"):
+                logger.error(f"Stream request {response.get('id')} failed: {response['error']}")
+            return
         
+        stream_name, update = decoded
+        manager = self.kline_managers.get(stream_name)
+        if manager is not None:
+            await manager._handle_kline_update(update)
+    
+    async def _maintain_websocket(self) -> None:
+        """Maintain the shared websocket connection and resubscribe on reconnect"""
+        while self.is_running:
+            try:
+                async with websockets.connect(BINANCE_STREAM_URL) as websocket:
+                    logger.info("Combined-stream WebSocket connection established")
+                    self._websocket = websocket
+                    ping_task = asyncio.create_task(self._ping_websocket(websocket))
+                    
+                    try:
+                        await self._send_control("SUBSCRIBE", list(self.kline_managers))
+                        for manager in self.kline_managers.values():
+                            if len(manager.candles):
+                                manager.catch_up()
+                        while self.is_running:
+                            message = await websocket.recv()
+                            await self._route_message(message)
+                    
+                    except ConnectionClosed:
+                        logger.warning("Combined-stream WebSocket connection closed")
+                    
+                    finally:
+                        self._websocket = None
+                        ping_task.cancel()
+                        try:
+                            await ping_task
+                        except asyncio.CancelledError:
+                            pass
+            
+            except Exception as e:
+                logger.error(f"Combined-stream WebSocket error: {e}")
+                if self.is_running:
+                    await asyncio.sleep(self.retry_delay)
+    
+    async def _ping_websocket(self, websocket: websockets.WebSocketClientProtocol) -> None:
+        """Send periodic pings to keep the shared connection alive"""
+        while True:
+            try:
+                await asyncio.sleep(self.ping_interval)
+                await websocket.ping()
+            except Exception as e:
+                logger.error(f"Error in ping: {e}")
+                break
+    
+    async def start(self) -> None:
+        """Run the shared websocket connection until stopped"""
+        self.is_running = True
+        try:
+            await self._maintain_websocket()
+        finally:
+            self.is_running = False
+    
+    async def stop_all(self) -> None:
+        """Stop every manager and close the shared connection"""
+        self.is_running = False
+        for manager in self.kline_managers.values():
+            await manager.stop()
+        self.kline_managers.clear()
+        if self._websocket is not None:
+            await self._websocket.close()
+
+
 class Erendil:
     def __init__(
         self, 
@@ -332,60 +677,32 @@ class Erendil:
         onclose_callback: Callable[[pl.DataFrame], None], 
         onmessage_callback: Callable[[pl.DataFrame], None], 
         limit: int = 1000,
+        exchange: Optional[BinanceExchange] = None,
+        cache_dir: Optional[str] = None,
     ) -> None:
         self.symbol = symbol
+        self.exchange = exchange
         symbol = symbol.lower()
         self.manager = BinanceKlineManager(
             limit=limit,
             symbol=symbol,
             interval=interval,
             onclose_callback=onclose_callback,
-            onmessage_callback=onmessage_callback
+            onmessage_callback=onmessage_callback,
+            cache_dir=cache_dir
         )
         
     async def run(self) -> None:
         logger.info(f"Starting trading bot for {self.symbol}")
         await self.manager.fetch_historical_data()
-        await self.manager.start_websocket_stream()
+        if self.exchange is not None:
+            # Shared connection: the exchange runs the socket, we only subscribe
+            await self.exchange.add_manager(self.manager)
+        else:
+            await self.manager.start_websocket_stream()
     
     async def stop(self) -> None:
-        await self.manager.stop()
-        
-        
-   
-'''
-class BinanceExchange:
-    def __init__(self):
-        self.kline_managers: Dict[str, BinanceKlineManager] = {}
-    
-    async def add_symbol_stream(
-        self,
-        symbol: str,
-        interval: str,
-        onclose_callback: Callable[[pl.DataFrame], None],
-        onmessage_callback: Callable[[pl.DataFrame], None],
-        limit: int = 1000,
-    ) -> None:
-        symbol = symbol.lower()
-        manager = BinanceKlineManager(
-            limit=limit,
-            symbol=symbol,
-            interval=interval,
-            onclose_callback=onclose_callback,
-            onmessage_callback=onmessage_callback
-        )
-        self.kline_managers[symbol] = manager
-        
-        await manager.fetch_historical_data()
-        await manager.start_websocket_stream()
-    
-    async def remove_symbol_stream(self, symbol: str) -> None:
-        if symbol in self.kline_managers:
-            await self.kline_managers[symbol].stop()
-            del self.kline_managers[symbol]
-    
-    async def stop_all(self) -> None:
-        for manager in self.kline_managers.values():
-            await manager.stop()
-        self.kline_managers.clear()
-'''
\ No newline at end of file
+        if self.exchange is not None:
+            await self.exchange.remove_symbol_stream(self.manager.symbol, self.manager.interval)
+        else:
+            await self.manager.stop()
@@ -0,0 +1,102 @@
+import json
+from typing import NamedTuple, Optional, Tuple, Union
+
+try:
+    import msgspec
+except ImportError:  # Optional speed-up, install with the "fast" extra
+    msgspec = None
+
+
+class KlineUpdate(NamedTuple):
+    closed: bool
+    close: float
+    # Full candle in KLINE_COLUMNS order (epoch-us timestamps), only when closed
+    row: Optional[tuple] = None
+
+
+def _kline_row(t, o, h, l, c, v, T, q, n, V, Q) -> tuple:
+    return (
+        t * 1000, float(o), float(h), float(l), float(c), float(v),
+        T * 1000, float(q), n, float(V), float(Q),
+    )
+
+
+if msgspec is not None:
+    # Ticks only need "x" and "c"; every other field is skipped while parsing
+    class _Tick(msgspec.Struct):
+        x: bool
+        c: str
+
+    class _TickEvent(msgspec.Struct):
+        k: _Tick
+
+    class _CombinedTick(msgspec.Struct):
+        stream: str
+        data: _TickEvent
+
+    class _Kline(msgspec.Struct):
+        t: int
+        T: int
+        o: str
+        h: str
+        l: str
+        c: str
+        v: str
+        q: str
+        n: int
+        V: str
+        Q: str
+
+    class _KlineEvent(msgspec.Struct):
+        k: _Kline
+
+    class _CombinedKline(msgspec.Struct):
+        data: _KlineEvent
+
+    _tick_decoder = msgspec.json.Decoder(_TickEvent)
+    _kline_decoder = msgspec.json.Decoder(_KlineEvent)
+    _combined_tick_decoder = msgspec.json.Decoder(_CombinedTick)
+    _combined_kline_decoder = msgspec.json.Decoder(_CombinedKline)
+
+    def _full_row(k: "_Kline") -> tuple:
+        return _kline_row(k.t, k.o, k.h, k.l, k.c, k.v, k.T, k.q, k.n, k.V, k.Q)
+
+    def decode_kline(message: Union[str, bytes]) -> KlineUpdate:
+        """Decode a raw <symbol>@kline_<interval> event"""
+        tick = _tick_decoder.decode(message).k
+        if not tick.x:
+            return KlineUpdate(False, float(tick.c))
+        return KlineUpdate(True, float(tick.c), _full_row(_kline_decoder.decode(message).k))
+
+    def decode_combined(message: Union[str, bytes]) -> Optional[Tuple[str, KlineUpdate]]:
+        """Decode a combined-stream frame; returns None for request responses"""
+        try:
+            frame = _combined_tick_decoder.decode(message)
+        except msgspec.ValidationError:
+            return None
+        tick = frame.data.k
+        if not tick.x:
+            return frame.stream, KlineUpdate(False, float(tick.c))
+        k = _combined_kline_decoder.decode(message).data.k
+        return frame.stream, KlineUpdate(True, float(tick.c), _full_row(k))
+
+else:
+    def _from_dict(k: dict) -> KlineUpdate:
+        if not k["x"]:
+            return KlineUpdate(False, float(k["c"]))
+        row = _kline_row(
+            k["t"], k["o"], k["h"], k["l"], k["c"], k["v"],
+            k["T"], k["q"], k["n"], k["V"], k["Q"],
+        )
+        return KlineUpdate(True, float(k["c"]), row)
+
+    def decode_kline(message: Union[str, bytes]) -> KlineUpdate:
+        """Decode a raw <symbol>@kline_<interval> event"""
+        return _from_dict(json.loads(message)["k"])
+
+    def decode_combined(message: Union[str, bytes]) -> Optional[Tuple[str, KlineUpdate]]:
+        """Decode a combined-stream frame; returns None for request responses"""
+        frame = json.loads(message)
+        if "stream" not in frame:
+            return None
+        return frame["stream"], _from_dict(frame["data"]["k"])
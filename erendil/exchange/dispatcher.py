@@ -0,0 +1,63 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_EMPTY = object()
+
+
+class LatestValueDispatcher:
+    """Run an async callback one call at a time, always with the newest value.
+
+    While a call is in flight, newer values overwrite each other in a
+    single pending slot; superseded values are counted as coalesced and
+    never evaluated. Memory stays bounded no matter how fast values arrive.
+    """
+
+    def __init__(self, callback: Callable[[Any], Awaitable[None]]):
+        self.callback = callback
+        self.received = 0
+        self.dispatched = 0
+        self.coalesced = 0
+        self._pending: Any = _EMPTY
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, value: Any) -> None:
+        """Queue `value`, replacing any value that has not been dispatched yet"""
+        self.received += 1
+        if self._pending is not _EMPTY:
+            self.coalesced += 1
+        self._pending = value
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while self._pending is not _EMPTY:
+            value, self._pending = self._pending, _EMPTY
+            self.dispatched += 1
+            try:
+                await self.callback(value)
+            except Exception as e:
+                logger.error(f"Error in callback processing: {e}")
+
+    async def stop(self) -> None:
+        """Drop the pending value and cancel the call in flight"""
+        self._pending = _EMPTY
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "received": self.received,
+            "dispatched": self.dispatched,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,66 @@
+import polars as pl
+from typing import Any, List, Optional, Sequence
+
+
+# Column layout of a kline frame, in the same order as the /api/v3/klines arrays
+KLINE_SCHEMA = {
+    "open_time":              pl.Datetime("us", "UTC"),
+    "open":                   pl.Float64,
+    "high":                   pl.Float64,
+    "low":                    pl.Float64,
+    "close":                  pl.Float64,
+    "volume":                 pl.Float64,
+    "close_time":             pl.Datetime("us", "UTC"),
+    "quote_volume":           pl.Float64,
+    "trades":                 pl.Int64,
+    "taker_buy_volume":       pl.Float64,
+    "taker_buy_quote_volume": pl.Float64,
+}
+KLINE_COLUMNS = list(KLINE_SCHEMA)
+
+
+def empty_klines() -> pl.DataFrame:
+    """Return an empty kline frame with the canonical schema"""
+    return pl.DataFrame(schema=KLINE_SCHEMA)
+
+
+def _to_series(name: str, values: Sequence[Any]) -> pl.Series:
+    dtype = KLINE_SCHEMA[name]
+    if dtype == pl.Float64:
+        # Binance sends prices and volumes as decimal strings
+        return pl.Series(name, values, dtype=pl.Utf8).cast(pl.Float64)
+    if dtype == pl.Int64:
+        return pl.Series(name, values, dtype=pl.Int64)
+    # Integer epoch milliseconds converted in bulk
+    return (
+        pl.Series(name, values, dtype=pl.Int64)
+        .cast(pl.Datetime("ms", "UTC"))
+        .dt.cast_time_unit("us")
+    )
+
+
+def klines_to_polars(data: Sequence[Sequence[Any]]) -> pl.DataFrame:
+    """Convert raw REST kline arrays into a typed Polars DataFrame"""
+    if not data:
+        return empty_klines()
+
+    # Transpose rows into columns once; the trailing "ignore" field is dropped
+    columns = list(zip(*data))
+    return pl.DataFrame([
+        _to_series(name, columns[i])
+        for i, name in enumerate(KLINE_COLUMNS)
+    ])
+
+
+def merge_klines(frames: List[pl.DataFrame], limit: Optional[int] = None) -> pl.DataFrame:
+    """Concatenate kline batches, drop duplicate candles and sort by open_time"""
+    frames = [df for df in frames if df is not None and len(df)]
+    if not frames:
+        return empty_klines()
+
+    merged = (
+        pl.concat(frames, how="vertical")
+        .unique(subset=["open_time"], keep="last")
+        .sort("open_time")
+    )
+    return merged.tail(limit) if limit else merged
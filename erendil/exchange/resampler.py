@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import numpy as np
+import polars as pl
+from typing import Callable, Dict, List, Optional
+from erendil.exchange.decoder import KlineUpdate
+from erendil.exchange.klines import KLINE_COLUMNS
+from erendil.exchange.binance import BinanceExchange, BinanceKlineManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Timeframe:
+    """Incremental aggregation state of one derived interval"""
+
+    def __init__(self, manager: BinanceKlineManager, interval_ms: int):
+        self.manager = manager
+        self.interval_ms = interval_ms
+        self.bucket: Optional[int] = None  # open_time (ms) of the candle being built
+        self.values: Optional[list] = None
+
+    def fold(self, row: tuple) -> Optional[tuple]:
+        """Add one base candle; returns the derived candle when it completes"""
+        (open_us, o, h, l, c, v, close_us, q, n, bv, bq) = row
+        open_ms = open_us // 1000
+        bucket = open_ms - open_ms % self.interval_ms
+
+        if self.bucket != bucket:
+            if self.values is not None:
+                logger.warning(
+                    f"{self.manager.stream_name}: dropping incomplete candle at {self.bucket}"
+                )
+            self.bucket = bucket
+            self.values = [o, h, l, c, v, q, n, bv, bq]
+        else:
+            acc = self.values
+            acc[1] = max(acc[1], h)
+            acc[2] = min(acc[2], l)
+            acc[3] = c
+            acc[4] += v
+            acc[5] += q
+            acc[6] += n
+            acc[7] += bv
+            acc[8] += bq
+
+        if (close_us // 1000 + 1) % self.interval_ms:
+            return None
+
+        o, h, l, c, v, q, n, bv, bq = self.values
+        self.values = None
+        close_time = (self.bucket + self.interval_ms - 1) * 1000
+        return (self.bucket * 1000, o, h, l, c, v, close_time, q, n, bv, bq)
+
+
+class MultiTimeframeFeed:
+    """Serve several timeframes of one symbol from a single base-interval stream.
+
+    Only the base interval is streamed. Every derived timeframe keeps its
+    own BinanceKlineManager (history, ring buffer, kline cache, callbacks)
+    that never opens a socket: its candles are built incrementally from the
+    closed base candles and its onclose_callback fires at its own boundary.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        base_interval: str = "1m",
+        base_limit: int = 1000,
+        cache_dir: Optional[str] = None,
+        exchange: Optional[BinanceExchange] = None,
+    ):
+        """
+        Initialize the multi-timeframe feed.
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'btcusdt')
+            base_interval: Finest interval, the only one streamed
+            base_limit: Base candles kept (at least one derived candle's worth)
+            cache_dir: Directory for the local kline cache (disabled when None)
+            exchange: Shared combined-stream connection to subscribe through
+        """
+        self.symbol = symbol.lower()
+        self.cache_dir = cache_dir
+        self.exchange = exchange
+        self.base = BinanceKlineManager(
+            symbol=self.symbol,
+            interval=base_interval,
+            onclose_callback=self._on_base_close,
+            onmessage_callback=self._on_base_tick,
+            limit=base_limit,
+            cache_dir=cache_dir,
+        )
+        self.base_ms = self.base._get_interval_ms(base_interval)
+        self.timeframes: Dict[str, _Timeframe] = {}
+        self._last_base_open: Optional[int] = None
+
+    def add_timeframe(
+        self,
+        interval: str,
+        onclose_callback: Callable[[pl.DataFrame], None],
+        onmessage_callback: Callable[[float], None],
+        limit: int = 1000,
+    ) -> BinanceKlineManager:
+        """Register a timeframe built from the base stream"""
+        if interval[-1] in "wM":
+            raise ValueError(f"Cannot resample calendar-aligned interval {interval}")
+        interval_ms = self.base._get_interval_ms(interval)
+        if interval_ms % self.base_ms:
+            raise ValueError(f"{interval} is not a multiple of the base interval {self.base.interval}")
+        if interval_ms // self.base_ms > self.base.limit:
+            raise ValueError(f"base_limit must cover at least one {interval} candle")
+
+        manager = BinanceKlineManager(
+            symbol=self.symbol,
+            interval=interval,
+            onclose_callback=onclose_callback,
+            onmessage_callback=onmessage_callback,
+            limit=limit,
+            cache_dir=self.cache_dir,
+        )
+        self.timeframes[interval] = _Timeframe(manager, interval_ms)
+        return manager
+
+    async def run(self) -> None:
+        """Load every timeframe's history, then stream the base interval"""
+        logger.info(f"Starting {self.symbol} feed: {self.base.interval} -> {', '.join(self.timeframes)}")
+        await self.base.fetch_historical_data()
+        await asyncio.gather(*[
+            tf.manager.fetch_historical_data()
+            for tf in self.timeframes.values()
+            if tf.interval_ms != self.base_ms
+        ])
+        for tf in self.timeframes.values():
+            await self._seed(tf)
+
+        if len(self.base.candles):
+            self._last_base_open = int(self.base.candles.last("open_time"))
+        for tf in self.timeframes.values():
+            tf.manager.is_running = True
+
+        if self.exchange is not None:
+            await self.exchange.add_manager(self.base)
+        else:
+            await self.base.start_websocket_stream()
+
+    async def _seed(self, tf: _Timeframe) -> None:
+        """Fold the base candles after the derived history into its timeframe"""
+        if tf.interval_ms == self.base_ms:
+            tf.manager.historical_data = self.base.historical_data
+            return
+        if not len(self.base.candles):
+            return
+
+        if len(tf.manager.candles):
+            current = tf.manager.candles.last("open_time") // 1000 + tf.interval_ms
+        else:
+            last = self.base.candles.last("open_time") // 1000
+            current = last - last % tf.interval_ms
+
+        columns = self._base_columns()
+        start = int(np.searchsorted(columns[0], current * 1000))
+        for row in self._base_rows(columns, start):
+            candle = tf.fold(row)
+            if candle is not None:
+                # The derived history ended behind the base history
+                await tf.manager._append_closed_candle(KlineUpdate(True, candle[4], candle))
+
+    def _base_columns(self) -> List[np.ndarray]:
+        """Views of the base candles' columns, in KLINE_COLUMNS order"""
+        return [self.base.candles.view(name) for name in KLINE_COLUMNS]
+
+    @staticmethod
+    def _base_rows(columns: List[np.ndarray], start: int) -> List[tuple]:
+        """Base candles from index `start` on, as rows"""
+        return list(zip(*(column[start:].tolist() for column in columns)))
+
+    async def _on_base_close(self, df: pl.DataFrame) -> None:
+        """Fold base candles closed since the last call into every timeframe"""
+        columns = self._base_columns()
+        open_times = columns[0]
+        start = 0
+        if self._last_base_open is not None:
+            start = int(np.searchsorted(open_times, self._last_base_open, side="right"))
+        if start >= len(open_times):
+            return
+        self._last_base_open = int(open_times[-1])
+
+        rows = self._base_rows(columns, start)
+        for tf in self.timeframes.values():
+            for row in rows:
+                candle = tf.fold(row)
+                if candle is not None:
+                    await tf.manager._append_closed_candle(KlineUpdate(True, candle[4], candle))
+
+    async def _on_base_tick(self, price: float) -> None:
+        for tf in self.timeframes.values():
+            if len(tf.manager.candles):
+                await tf.manager.process_data_onmessage(price)
+
+    async def stop(self) -> None:
+        if self.exchange is not None:
+            await self.exchange.remove_symbol_stream(self.base.symbol, self.base.interval)
+        else:
+            await self.base.stop()
+        for tf in self.timeframes.values():
+            await tf.manager.stop()
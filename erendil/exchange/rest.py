@@ -0,0 +1,102 @@
+import time
+import httpx
+import asyncio
+import logging
+from typing import Optional, Mapping
+from erendil.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Request weights of the endpoints we call (GET /api/v3/klines costs 2)
+KLINES_WEIGHT = 2
+
+
+class WeightRateLimiter:
+    """Token bucket over Binance's per-minute request weight, shared by all symbols"""
+
+    def __init__(self, weight_limit: int = 6000, safety_margin: float = 0.9):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            weight_limit: Binance REQUEST_WEIGHT limit per minute
+            safety_margin: Fraction of the limit we allow ourselves to use
+        """
+        self.capacity = weight_limit * safety_margin
+        self.refill_rate = self.capacity / 60  # Weight per second
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    async def acquire(self, weight: int = 1) -> None:
+        """Wait until `weight` can be spent without exceeding the budget"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # The lock queues waiters so symbols are served in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0 and self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                wait = max(wait, (weight - self.tokens) / self.refill_rate)
+                await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Sync the bucket with the weight Binance reports as already used"""
+        used = headers.get("x-mbx-used-weight-1m")
+        if used is None:
+            return
+
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - int(used))
+
+    def pause(self, seconds: float) -> None:
+        """Stop all requests for `seconds` (after a 429/418 response)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+_client: Optional[httpx.AsyncClient] = None
+rate_limiter = WeightRateLimiter(settings.binance_weight_limit)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide keep-alive client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        http2 = settings.binance_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+
+        _client = httpx.AsyncClient(
+            http2=http2,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=20,
+                max_keepalive_connections=20,
+                keepalive_expiry=120,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (call once on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,45 +1,57 @@
 import numpy as np
 import polars as pl
 from typing import Optional, Tuple
+from erendil.indicators import kernels
 from erendil.indicators.base import BaseIndicator
+from erendil.indicators.features import CandleFeatures
 from erendil.models.data_models import IndicatorParams, MAType, SmoothingType
 
 
+
 class BuySellIndicator(BaseIndicator):
     def __init__(self, params: Optional[IndicatorParams] = None):
         self.params = params or IndicatorParams()
         
     def calculate_rma(self, data: np.ndarray, length: int) -> np.ndarray:
         """Calculate RMA (Running Moving Average / Wilders Smoothing)"""
-        alpha = 1.0 / length
-        result = np.zeros_like(data)
-        result[0] = data[0]  # Initialize first value
-        
-        for i in range(1, len(data)):
-            result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-        
-        return result
+        return self._after_warmup(data, lambda x: kernels.rma(x, length))
     
     def calculate_wma(self, data: np.ndarray, length: int) -> np.ndarray:
-        """Calculate WMA (Weighted Moving Average)"""
+        """Calculate WMA (Weighted Moving Average), NaN until the first full window"""
         weights = np.arange(1, length + 1)
-        weights = weights / weights.sum()
-        return np.convolve(data, weights[::-1], mode='valid')
+        return self._windowed(data, weights / weights.sum())
 
     def calculate_ema(self, data: np.ndarray, length: int) -> np.ndarray:
         """Calculate EMA (Exponential Moving Average)"""
-        alpha = 2.0 / (length + 1)
-        result = np.zeros_like(data)
-        result[0] = data[0]
-        
-        for i in range(1, len(data)):
-            result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-        
-        return result
+        return self._after_warmup(data, lambda x: kernels.ema(x, length))
     
     def calculate_sma(self, data: np.ndarray, length: int) -> np.ndarray:
-        """Calculate SMA (Simple Moving Average)"""
-        return np.convolve(data, np.ones(length)/length, mode='valid')
+        """Calculate SMA (Simple Moving Average), NaN until the first full window"""
+        return self._windowed(data, np.ones(length) / length)
+
+    @classmethod
+    def _windowed(cls, data: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Weighted mean of the last len(weights) values (newest weighted last), one per candle"""
+        if data.ndim > 1:
+            return np.apply_along_axis(cls._windowed, -1, data, weights)
+        result = np.full(data.shape, np.nan)
+        if len(data) >= len(weights):
+            result[len(weights) - 1:] = np.convolve(data, weights[::-1], mode='valid')
+        return result
+
+    @staticmethod
+    def _after_warmup(data: np.ndarray, average) -> np.ndarray:
+        """Start a recurrence at the first candle past a windowed average's warm-up, like the streaming averages"""
+        if not data.size:
+            return average(data)
+        missing = np.isnan(data).reshape(-1, data.shape[-1]).any(axis=0)
+        if not missing[0] or missing.all():
+            # No warm-up; a later NaN poisons the recurrence as usual
+            return average(data)
+        start = int(np.argmin(missing))
+        result = np.full(data.shape, np.nan)
+        result[..., start:] = average(data[..., start:])
+        return result
     
     def ma_function(self, data: np.ndarray, length: int, smoothing_type: SmoothingType) -> np.ndarray:
         """Implement the ma_function from PineScript"""
@@ -52,55 +64,63 @@ class BuySellIndicator(BaseIndicator):
         else:  # WMA
             return self.calculate_wma(data, length)
     
-    def calculate_tr(self, df: pl.DataFrame) -> np.ndarray:
+    def calculate_tr(self, df: pl.DataFrame, features: Optional[CandleFeatures] = None) -> np.ndarray:
         """Calculate True Range"""
-        high = df['high'].to_numpy()
-        low = df['low'].to_numpy()
-        prev_close = np.roll(df['close'].to_numpy(), 1)
-        prev_close[0] = df['close'][0]
-        
-        tr = np.maximum(
-            high - low,
-            np.maximum(
-                np.abs(high - prev_close),
-                np.abs(low - prev_close)
+        return (features or CandleFeatures(df)).tr()
+    
+    def close_ma(self, features: CandleFeatures, length: int, ma_type: MAType) -> np.ndarray:
+        """SMA or EMA of close, shared through the feature cache"""
+        if ma_type == MAType.SMA:
+            return features.get(
+                ("sma", "close", length), lambda: self.calculate_sma(features.column('close'), length)
             )
-        )
-        return tr
+        return features.ema('close', length)
     
-    def process_data(self, df: pl.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    def process_data(self, df: pl.DataFrame, features: Optional[CandleFeatures] = None) -> Tuple[np.ndarray, np.ndarray]:
         if len(df) < self.params.slow_length:
             return np.array([]), np.array([])
-
-        close = df['close'].to_numpy()
+        return self.process_features(features or CandleFeatures(df))
+    
+    def process_batch(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """process_data over symbols x time matrices of aligned candles, one row per symbol"""
+        if close.shape[-1] < self.params.slow_length:
+            empty = np.empty(close.shape[:-1] + (0,))
+            return empty, empty
+        return self.process_features(CandleFeatures.from_arrays(high=high, low=low, close=close))
+    
+    def process_features(self, features: CandleFeatures) -> Tuple[np.ndarray, np.ndarray]:
+        """Buy and sell histograms from a (possibly shared) feature cache"""
+        p = self.params
         
         # Calculate MACD components
-        if self.params.oscillator_ma == MAType.SMA:
-            fast_ma = self.calculate_sma(close, self.params.fast_length)
-            slow_ma = self.calculate_sma(close, self.params.slow_length)
-        else:  # EMA
-            fast_ma = self.calculate_ema(close, self.params.fast_length)
-            slow_ma = self.calculate_ema(close, self.params.slow_length)
-        
-        macd = fast_ma - slow_ma
+        fast_ma = self.close_ma(features, p.fast_length, p.oscillator_ma)
+        slow_ma = self.close_ma(features, p.slow_length, p.oscillator_ma)
         
         # Calculate signal line
-        if self.params.signal_ma == MAType.SMA:
-            signal = self.calculate_sma(macd, self.params.signal_length)
-        else:  # EMA
-            signal = self.calculate_ema(macd, self.params.signal_length)
+        def signal_line():
+            macd = fast_ma - slow_ma
+            if p.signal_ma == MAType.SMA:
+                return self.calculate_sma(macd, p.signal_length)
+            return self.calculate_ema(macd, p.signal_length)
         
-        # Calculate TR
-        tr = self.calculate_tr(df)
+        signal = features.get(
+            ("signal", p.oscillator_ma, p.fast_length, p.slow_length, p.signal_ma, p.signal_length),
+            signal_line
+        )
         
-        # Buy signal calculation
-        atrn_buy = self.ma_function(tr * (-1.25), self.params.smoothing_length, self.params.smoothing)
-        atr_avg_buy = self.calculate_ema(atrn_buy, self.params.atr_avg_length)
-        hist_buy = signal - (atr_avg_buy - signal)
+        # Every average here is linear and rounds symmetrically, so the buy
+        # side (tr * -1.25) is exactly the negated sell side (tr * 1.25):
+        # smooth the True Range once and reuse it for both
+        def atr_average():
+            atrn = self.ma_function(features.tr() * 1.25, p.smoothing_length, p.smoothing)
+            return self.calculate_ema(atrn, p.atr_avg_length)
         
-        # Sell signal calculation
-        atrn_sell = self.ma_function(tr * 1.25, self.params.smoothing_length, self.params.smoothing)
-        atr_avg_sell = self.calculate_ema(atrn_sell, self.params.atr_avg_length)
+        atr_avg_sell = features.get(
+            ("atr_avg", p.smoothing, p.smoothing_length, p.atr_avg_length), atr_average
+        )
+        atr_avg_buy = -atr_avg_sell
+        
+        hist_buy = signal - (atr_avg_buy - signal)
         hist_sell = signal - (atr_avg_sell - signal)
         
         return hist_buy, hist_sell
@@ -0,0 +1,110 @@
+import numpy as np
+import polars as pl
+from typing import Callable, Dict, Hashable, Optional
+from erendil.core.candle_buffer import CandleBuffer
+from erendil.indicators import kernels
+
+
+class CandleFeatures:
+    """Derived series of one candle frame, each computed at most once.
+
+    Entries are keyed by tuples naming the series and its parameters, e.g.
+    ("ema", "close", 12), so indicators asking for the same thing share one
+    array. Cached arrays are read-only. Every series runs along the last
+    axis, so the same code serves one symbol or a symbols x time matrix.
+    """
+
+    def __init__(self, df: Optional[pl.DataFrame]):
+        self.df = df
+        self.hits = 0
+        self.misses = 0
+        self._cache: Dict[Hashable, np.ndarray] = {}
+
+    @classmethod
+    def from_arrays(cls, **columns: np.ndarray) -> "CandleFeatures":
+        """Features of aligned arrays (e.g. symbols x time matrices) instead of a frame"""
+        features = cls(None)
+        for name, values in columns.items():
+            features.get(("column", name), lambda values=values: np.asarray(values, dtype=np.float64).view())
+        return features
+
+    def get(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Cached value of `key`, computing it on first use"""
+        value = self._cache.get(key)
+        if value is None:
+            self.misses += 1
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            self._cache[key] = value
+        else:
+            self.hits += 1
+        return value
+
+    def evict(self, kind: str) -> None:
+        """Drop every cached series of one kind, e.g. "signal" between sweep groups"""
+        for key in [key for key in self._cache if isinstance(key, tuple) and key[0] == kind]:
+            del self._cache[key]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.get(("column", name), lambda: self.df[name].to_numpy())
+
+    def series(self, name: str) -> np.ndarray:
+        """A frame column or a derived series ("tr")"""
+        return self.tr() if name == "tr" else self.column(name)
+
+    def tr(self) -> np.ndarray:
+        """True Range, with the first candle measured against its own close"""
+        return self.get(
+            ("tr",), lambda: kernels.true_range(self.column("high"), self.column("low"), self.column("close"))
+        )
+
+    def ema(self, name: str, length: int) -> np.ndarray:
+        return self.get(("ema", name, length), lambda: kernels.ema(self.series(name), length))
+
+    def rma(self, name: str, length: int) -> np.ndarray:
+        return self.get(("rma", name, length), lambda: kernels.rma(self.series(name), length))
+
+    def atr(self, period: int) -> np.ndarray:
+        """Wilder ATR"""
+        return self.rma("tr", period)
+
+
+class FeatureStore:
+    """Features of the latest candle frame of one symbol and interval.
+
+    Every indicator on the symbol asks the store for the frame it was
+    given; a frame with the same candles returns the same CandleFeatures,
+    and the cache is dropped as soon as a candle is appended. Frames of
+    `buffer` are identified by the buffer and its version; any other
+    frame by its length and first/last candle.
+    """
+
+    def __init__(self, buffer: Optional[CandleBuffer] = None):
+        """
+        Initialize the feature store.
+
+        Args:
+            buffer: CandleBuffer the frames usually come from, e.g. the kline manager's
+        """
+        self.buffer = buffer
+        self._key: Optional[tuple] = None
+        self._features: Optional[CandleFeatures] = None
+
+    def _fingerprint(self, df: pl.DataFrame) -> tuple:
+        if self.buffer is not None:
+            version = self.buffer.frame_version(df)
+            if version is not None:
+                return ("buffer", id(self.buffer), version)
+        if df.height == 0:
+            return (0,)
+        if "open_time" in df.columns:
+            return (df.height, df["open_time"][0], df["open_time"][-1], df["close"][-1])
+        return (df.height, id(df))
+
+    def get(self, df: pl.DataFrame) -> CandleFeatures:
+        key = self._fingerprint(df)
+        if self._features is None or key != self._key:
+            self._key = key
+            self._features = CandleFeatures(df)
+        return self._features
@@ -0,0 +1,177 @@
+import logging
+import numpy as np
+import polars as pl
+from typing import Callable, Dict, Optional
+from erendil.core.config import settings
+
+try:
+    import numba
+except ImportError:  # Optional speed-up, install with the "jit" extra
+    numba = None
+
+
+logger = logging.getLogger(__name__)
+
+# Every kernel computes y[0] = x[0], y[i] = alpha * x[i] + (1 - alpha) * y[i-1]
+# along the last axis of a float array.
+Kernel = Callable[[np.ndarray, float], np.ndarray]
+
+BLOCK_SIZE = 128
+
+
+def _python_recurrence(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Reference loop, the behaviour every other backend must reproduce"""
+    result = np.zeros_like(x)
+    result[..., 0] = x[..., 0]
+    for i in range(1, x.shape[-1]):
+        result[..., i] = alpha * x[..., i] + (1 - alpha) * result[..., i - 1]
+    return result
+
+
+def _numpy_recurrence(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Blocked linear filter: one matrix product per block plus a short carry recursion"""
+    n = x.shape[-1]
+    if n <= 2:
+        return _python_recurrence(x, alpha)
+
+    missing = np.isnan(x)
+    if missing.any():
+        # A NaN poisons every later value; in the block products it would reach earlier ones too
+        result = _numpy_recurrence(np.where(missing, 0.0, x), alpha)
+        result[np.logical_or.accumulate(missing, axis=-1)] = np.nan
+        return result
+
+    decay = 1.0 - alpha
+    block = min(BLOCK_SIZE, n)
+    blocks = -(-n // block)
+    padded = np.zeros(x.shape[:-1] + (blocks * block,))
+    padded[..., :n] = x
+    padded = padded.reshape(x.shape[:-1] + (blocks, block))
+
+    # Response of each block to its own inputs, starting from zero
+    lags = np.arange(block)
+    powers = decay ** lags
+    lag = lags[:, None] - lags[None, :]
+    response = np.where(lag >= 0, alpha * decay ** np.maximum(lag, 0), 0.0)
+    local = padded @ response.T
+
+    # State entering each block; y[-1] = x[0] reproduces y[0] = x[0]
+    carry = np.empty(x.shape[:-1] + (blocks,))
+    carry[..., 0] = x[..., 0]
+    if blocks > 1:
+        ends = local[..., :-1, -1]
+        carry[..., 1:] = _carry(ends, x[..., 0], decay ** block)
+
+    result = local + carry[..., None] * (decay * powers)
+    return result.reshape(x.shape[:-1] + (blocks * block,))[..., :n]
+
+
+def _carry(ends: np.ndarray, first: np.ndarray, factor: float) -> np.ndarray:
+    """c[k] = ends[k] + factor * c[k-1] with c[-1] = first, solved with the same kernel"""
+    if factor == 0.0:
+        return ends.copy()
+    # Rewrite as a unit-step recurrence: c[k] = a' * z[k] + (1 - a') * c[k-1]
+    alpha = 1.0 - factor
+    z = np.concatenate([np.asarray(first)[..., None], ends / alpha], axis=-1)
+    return _numpy_recurrence(z, alpha)[..., 1:]
+
+
+def _polars_recurrence(x: np.ndarray, alpha: float) -> np.ndarray:
+    """Polars ewm_mean(adjust=False), which uses the same first-value seeding"""
+    if x.ndim == 1:
+        return pl.Series(x).ewm_mean(alpha=alpha, adjust=False).to_numpy()
+    rows = x.reshape(-1, x.shape[-1])
+    frame = pl.DataFrame(rows.T, schema=[str(i) for i in range(len(rows))])
+    smoothed = frame.select(pl.all().ewm_mean(alpha=alpha, adjust=False)).to_numpy()
+    return smoothed.T.reshape(x.shape)
+
+
+BACKENDS: Dict[str, Kernel] = {
+    "numpy": _numpy_recurrence,
+    "polars": _polars_recurrence,
+    "python": _python_recurrence,
+}
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _numba_rows(x, alpha):
+        result = np.empty_like(x)
+        for r in range(x.shape[0]):
+            value = x[r, 0]
+            result[r, 0] = value
+            for i in range(1, x.shape[1]):
+                value = alpha * x[r, i] + (1 - alpha) * value
+                result[r, i] = value
+        return result
+
+    def _numba_recurrence(x: np.ndarray, alpha: float) -> np.ndarray:
+        """Compiled reference loop"""
+        rows = np.ascontiguousarray(x, dtype=np.float64).reshape(-1, x.shape[-1])
+        return _numba_rows(rows, alpha).reshape(x.shape)
+
+    BACKENDS["numba"] = _numba_recurrence
+
+# Fastest first
+PREFERENCE = ("numba", "polars", "numpy", "python")
+
+
+def _select_backend() -> str:
+    if settings.kernel_backend:
+        if settings.kernel_backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown kernel backend {settings.kernel_backend!r}, available: {', '.join(BACKENDS)}"
+            )
+        return settings.kernel_backend
+    return next(name for name in PREFERENCE if name in BACKENDS)
+
+
+active_backend = _select_backend()
+logger.debug(f"Recurrence kernel backend: {active_backend}")
+
+
+def recurrence(data: np.ndarray, alpha: float, backend: Optional[str] = None) -> np.ndarray:
+    """y[0] = x[0], y[i] = alpha * x[i] + (1 - alpha) * y[i-1] over the last axis"""
+    x = np.asarray(data, dtype=np.float64)
+    if x.shape[-1] == 0:
+        return x.copy()
+    return BACKENDS[backend or active_backend](x, alpha)
+
+
+def ema(data: np.ndarray, length: int, backend: Optional[str] = None) -> np.ndarray:
+    return recurrence(data, 2.0 / (length + 1), backend)
+
+
+def rma(data: np.ndarray, length: int, backend: Optional[str] = None) -> np.ndarray:
+    """Wilder's smoothing, also used for the ATR"""
+    return recurrence(data, 1.0 / length, backend)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range over the last axis, the first candle measured against its own close"""
+    prev_close = np.concatenate([close[..., :1], close[..., :-1]], axis=-1)
+    return np.maximum(
+        high - low,
+        np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+
+
+def rolling_max(data: np.ndarray, window: int) -> np.ndarray:
+    """max(x[i-window+1 : i+1]) over the last axis (shorter windows at the start), in O(n).
+
+    Van Herk/Gil-Werman: with the input cut into blocks of `window`, every
+    window spans at most two blocks, so its max is the max of a suffix max
+    of one block and a prefix max of the next.
+    """
+    x = np.asarray(data, dtype=np.float64)
+    n = x.shape[-1]
+    if window <= 1 or n == 0:
+        return x.copy()
+
+    blocks = -(-(n + window - 1) // window)
+    padded = np.full(x.shape[:-1] + (blocks * window,), -np.inf)
+    padded[..., window - 1:window - 1 + n] = x
+    padded = padded.reshape(x.shape[:-1] + (blocks, window))
+
+    prefix = np.maximum.accumulate(padded, axis=-1).reshape(x.shape[:-1] + (-1,))
+    suffix = np.maximum.accumulate(padded[..., ::-1], axis=-1)[..., ::-1].reshape(x.shape[:-1] + (-1,))
+    return np.maximum(suffix[..., :n], prefix[..., window - 1:window - 1 + n])
@@ -0,0 +1,174 @@
+import numpy as np
+import polars as pl
+from collections import deque
+from typing import Deque, Optional, Tuple
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, MAType, SmoothingType, StoplossParams
+
+
+class _Recurrence:
+    """y[i] = alpha * x[i] + (1 - alpha) * y[i-1], seeded with the first input"""
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+
+class _Window:
+    """Simple or weighted mean over the last `length` inputs (None until filled)"""
+    __slots__ = ("weights", "values")
+
+    def __init__(self, length: int, weighted: bool):
+        weights = np.arange(1, length + 1) if weighted else np.ones(length)
+        self.weights = weights / weights.sum()
+        self.values: Deque[float] = deque(maxlen=length)
+
+    def update(self, x: Optional[float]) -> Optional[float]:
+        if x is None:
+            return None
+        self.values.append(x)
+        if len(self.values) < self.values.maxlen:
+            return None
+        return float(np.dot(self.weights, self.values))
+
+
+def _moving_average(kind, length: int):
+    if kind in (MAType.EMA, SmoothingType.EMA):
+        return _Recurrence(2.0 / (length + 1))
+    if kind == SmoothingType.RMA:
+        return _Recurrence(1.0 / length)
+    return _Window(length, weighted=kind == SmoothingType.WMA)
+
+
+def _update(ma, x: Optional[float]) -> Optional[float]:
+    return None if x is None else ma.update(x)
+
+
+class StreamingBuySellIndicator(BuySellIndicator):
+    """BuySellIndicator updated in O(1) per closed candle.
+
+    `seed` replays a history once; `update` then folds one candle at a
+    time into the EMA/RMA (or windowed SMA/WMA) states and keeps only the
+    last `tail` histogram values, which match the tail of `process_data`.
+    """
+
+    def __init__(self, params: Optional[IndicatorParams] = None, tail: int = 3):
+        super().__init__(params)
+        self.tail = tail
+        self.reset()
+
+    def reset(self) -> None:
+        p = self.params
+        self.count = 0
+        self._prev_close: Optional[float] = None
+        self._fast = _moving_average(p.oscillator_ma, p.fast_length)
+        self._slow = _moving_average(p.oscillator_ma, p.slow_length)
+        self._signal = _moving_average(p.signal_ma, p.signal_length)
+        self._atrn_buy = _moving_average(p.smoothing, p.smoothing_length)
+        self._atrn_sell = _moving_average(p.smoothing, p.smoothing_length)
+        self._avg_buy = _Recurrence(2.0 / (p.atr_avg_length + 1))
+        self._avg_sell = _Recurrence(2.0 / (p.atr_avg_length + 1))
+        self._hist_buy: Deque[float] = deque(maxlen=self.tail)
+        self._hist_sell: Deque[float] = deque(maxlen=self.tail)
+
+    def seed(self, df: pl.DataFrame) -> None:
+        """Rebuild the state from a full candle history"""
+        self.reset()
+        for high, low, close in zip(df['high'].to_list(), df['low'].to_list(), df['close'].to_list()):
+            self.update(high, low, close)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[Optional[float], Optional[float]]:
+        """Fold one closed candle; returns the new (hist_buy, hist_sell) values"""
+        prev_close = close if self._prev_close is None else self._prev_close
+        self._prev_close = close
+        self.count += 1
+
+        fast = self._fast.update(close)
+        slow = self._slow.update(close)
+        macd = None if fast is None or slow is None else fast - slow
+        signal = _update(self._signal, macd)
+
+        tr = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+        avg_buy = _update(self._avg_buy, self._atrn_buy.update(tr * (-1.25)))
+        avg_sell = _update(self._avg_sell, self._atrn_sell.update(tr * 1.25))
+        if signal is None or avg_buy is None:
+            return None, None
+
+        hist_buy = signal - (avg_buy - signal)
+        hist_sell = signal - (avg_sell - signal)
+        self._hist_buy.append(hist_buy)
+        self._hist_sell.append(hist_sell)
+        return hist_buy, hist_sell
+
+    @property
+    def hist_buy(self) -> np.ndarray:
+        return np.array(self._hist_buy)
+
+    @property
+    def hist_sell(self) -> np.ndarray:
+        return np.array(self._hist_sell)
+
+
+class StreamingTrailingStoploss(TrailingStoploss):
+    """TrailingStoploss updated in amortized O(1) per closed candle"""
+
+    def __init__(self, params: Optional[StoplossParams] = None, tail: int = 2):
+        super().__init__(params)
+        self.tail = tail
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self._atr = _Recurrence(1.0 / self.params.atr_period)
+        self._prev_close: Optional[float] = None
+        # Monotonic deque of (index, offset): decreasing offsets, front is the window max
+        self._offsets: Deque[Tuple[int, float]] = deque()
+        self._ts: Deque[float] = deque(maxlen=self.tail)
+
+    def seed(self, df: pl.DataFrame) -> None:
+        """Rebuild the state from a full candle history"""
+        self.reset()
+        for high, low, close in zip(df['high'].to_list(), df['low'].to_list(), df['close'].to_list()):
+            self.update(high, low, close)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """Fold one closed candle; returns the new trailing stop"""
+        p = self.params
+        prev_close = close if self._prev_close is None else self._prev_close
+
+        tr = max(high - low, max(abs(high - prev_close), abs(low - prev_close)))
+        offset = high - (p.multiplier * self._atr.update(tr))
+        while self._offsets and self._offsets[-1][1] <= offset:
+            self._offsets.pop()
+        self._offsets.append((self.count, offset))
+        if self._offsets[0][0] <= self.count - p.hhv_period:
+            self._offsets.popleft()
+        highest = self._offsets[0][1]
+
+        if self.count < 16:
+            ts = close
+        else:
+            ts = highest if close > highest and close > prev_close else self._ts[-1]
+
+        self._prev_close = close
+        self.count += 1
+        self._ts.append(ts)
+        return ts
+
+    @property
+    def ts(self) -> np.ndarray:
+        return np.array(self._ts)
+
+    @property
+    def current(self) -> Tuple[float, float]:
+        """(current, previous) trailing stop, like the scalars of `process_data`"""
+        return self._ts[-1], self._ts[-2] if len(self._ts) > 1 else self._ts[-1]
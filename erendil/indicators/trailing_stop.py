@@ -1,7 +1,9 @@
 import numpy as np
 import polars as pl
 from typing import Optional, Tuple
+from erendil.indicators import kernels
 from erendil.indicators.base import BaseIndicator
+from erendil.indicators.features import CandleFeatures
 from erendil.models.data_models import StoplossParams
 
 
@@ -9,58 +11,42 @@ class TrailingStoploss(BaseIndicator):
     def __init__(self, params: Optional[StoplossParams] = None):
         self.params = params or StoplossParams()
     
-    def calculate_atr(self, df: pl.DataFrame) -> np.ndarray:
-        """Calculate ATR using Wilder's smoothing - needs fixing"""
-        high = df['high'].to_numpy()
-        low = df['low'].to_numpy()
-        close = np.roll(df['close'].to_numpy(), 1)
-        close[0] = df['close'][0]
+    def calculate_atr(self, df: pl.DataFrame, features: Optional[CandleFeatures] = None) -> np.ndarray:
+        """Calculate ATR using Wilder's smoothing"""
+        return (features or CandleFeatures(df)).atr(self.params.atr_period)
         
-        tr = np.maximum(
-            high - low,
-            np.maximum(
-                np.abs(high - close),
-                np.abs(low - close)
-            )
-        )
-        
-        # Use Wilder's smoothing
-        atr = np.zeros_like(tr)
-        atr[0] = tr[0]
-        for i in range(1, len(tr)):
-            atr[i] = (atr[i-1] * (self.params.atr_period - 1) + tr[i]) / self.params.atr_period
-            
-        return atr
-        
-    def process_data(self, df: pl.DataFrame) -> Tuple[np.ndarray, float, float]:
+    def process_data(self, df: pl.DataFrame, features: Optional[CandleFeatures] = None) -> Tuple[np.ndarray, float, float]:
         if len(df) < max(self.params.atr_period, self.params.hhv_period):
             return np.array([]), 0.0, 0.0
             
-        close = df['close'].to_numpy()
-        high = df['high'].to_numpy()
-        atr = self.calculate_atr(df)
+        ts = self.process_features(features or CandleFeatures(df))
+        return ts, ts[-1], ts[-2] if len(ts) > 1 else ts[-1]
+    
+    def process_batch(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """Trailing stops over symbols x time matrices of aligned candles, one row per symbol"""
+        if close.shape[-1] < max(self.params.atr_period, self.params.hhv_period):
+            return np.empty(close.shape[:-1] + (0,))
+        return self.process_features(CandleFeatures.from_arrays(high=high, low=low, close=close))
+    
+    def process_features(self, features: CandleFeatures) -> np.ndarray:
+        """Trailing stop series from a (possibly shared) feature cache"""
+        close = features.column('close')
+        high = features.column('high')
+        atr = features.atr(self.params.atr_period)
         
         # Calculate offset
         offset = high - (self.params.multiplier * atr)
         
-        # Calculate rolling highest properly
-        highest = np.zeros_like(offset)
-        prev = np.zeros_like(offset)
-        
-        for i in range(len(offset)):
-            start_idx = max(0, i - self.params.hhv_period + 1)
-            highest[i] = np.max(offset[start_idx:i+1])
-            prev[i] = highest[i]
-        
-        ts = np.zeros_like(close)
-        
-        for i in range(len(close)):
-            if i < 16:
-                ts[i] = close[i]
-            else:
-                condition = close[i] > highest[i] and close[i] > close[i-1]
-                ts[i] = highest[i] if condition else prev[i]
-            if i + 1 < len(prev):
-                prev[i+1] = ts[i]
-        
-        return ts, ts[-1], ts[-2] if len(ts) > 1 else ts[-1]
\ No newline at end of file
+        # Rolling highest over hhv_period candles (fewer at the start)
+        highest = kernels.rolling_max(offset, self.params.hhv_period)
+        
+        # The stop starts at close for the first 16 candles, then jumps to
+        # highest whenever close breaks above it on a rising candle and holds
+        # its last value otherwise: a forward fill of those updates
+        index = np.arange(close.shape[-1])
+        updated = np.zeros(close.shape, dtype=bool)
+        updated[..., :16] = True
+        updated[..., 16:] = (close[..., 16:] > highest[..., 16:]) & (close[..., 16:] > close[..., 15:-1])
+        source = np.where(index < 16, close, highest)
+        last_update = np.maximum.accumulate(np.where(updated, index, 0), axis=-1)
+        return np.take_along_axis(source, last_update, axis=-1)
\ No newline at end of file
@@ -22,6 +22,16 @@ class IndicatorParams:
     smoothing_length: int = 10
     smoothing: SmoothingType = SmoothingType.RMA
 
+    def __post_init__(self):
+        # Checked once here rather than on every candle close; enum values are accepted too
+        self.oscillator_ma = MAType(self.oscillator_ma)
+        self.signal_ma = MAType(self.signal_ma)
+        self.smoothing = SmoothingType(self.smoothing)
+        lengths = ("fast_length", "slow_length", "atr_avg_length", "signal_length", "smoothing_length")
+        invalid = [name for name in lengths if getattr(self, name) < 1]
+        if invalid:
+            raise ValueError(f"Indicator lengths must be at least 1: {', '.join(invalid)}")
+
 
 class MarketSignal(BaseModel):
     price:     float
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import argparse
+from erendil.simulator.server import BinanceSimulator, SimulatorConfig
+
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+
+
+async def serve(args: argparse.Namespace) -> None:
+    simulator = BinanceSimulator(SimulatorConfig(
+        speed=args.speed,
+        history=args.history,
+        ticks_per_candle=args.ticks_per_candle,
+        volatility=args.volatility,
+        seed=args.seed,
+        weight_limit=args.weight_limit,
+        error_rate=args.error_rate,
+        disconnect_after=args.disconnect_after,
+        recorded_dir=args.recorded_dir,
+    ))
+    runner = await simulator.start(args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Binance REST/WebSocket simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=1.0, help="Simulated seconds per real second")
+    parser.add_argument("--history", type=int, default=5000, help="Candles available before start")
+    parser.add_argument("--ticks-per-candle", type=int, default=20)
+    parser.add_argument("--volatility", type=float, default=0.002, help="Typical move per candle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weight-limit", type=int, default=6000, help="REST weight per minute before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of REST calls answered with 429")
+    parser.add_argument("--disconnect-after", type=float, default=None,
+                        help="Drop websocket connections after about this many seconds")
+    parser.add_argument("--recorded-dir", default=None,
+                        help="Kline cache directory (<SYMBOL>_<interval>.parquet) to replay")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import time
+import zlib
+import numpy as np
+import polars as pl
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+
+class SimClock:
+    """Simulated exchange clock, optionally running faster than real time"""
+
+    def __init__(self, speed: float = 1.0, start_ms: Optional[int] = None):
+        self.speed = speed
+        self.start_ms = start_ms if start_ms is not None else int(time.time() * 1000)
+        self._t0 = time.monotonic()
+
+    def now(self) -> int:
+        """Current simulated time in epoch milliseconds"""
+        return self.start_ms + int((time.monotonic() - self._t0) * 1000 * self.speed)
+
+    def seconds_until(self, sim_ms: int) -> float:
+        """Real seconds until the simulated clock reaches `sim_ms`"""
+        return max(0.0, (sim_ms - self.now()) / 1000 / self.speed)
+
+    def monotonic_at(self, sim_ms: int) -> float:
+        """time.monotonic() value at which the simulated clock reads `sim_ms`"""
+        return self._t0 + (sim_ms - self.start_ms) / 1000 / self.speed
+
+
+def interval_to_ms(interval: str) -> int:
+    multipliers = {
+        's': 1000,
+        'm': 60 * 1000,
+        'h': 60 * 60 * 1000,
+        'd': 24 * 60 * 60 * 1000,
+        'w': 7 * 24 * 60 * 60 * 1000,
+    }
+    unit = interval[-1]
+    if unit not in multipliers:
+        raise ValueError(f"Unsupported simulator interval: {interval}")
+    return int(interval[:-1]) * multipliers[unit]
+
+
+def _uniform(key: int, counters: np.ndarray) -> np.ndarray:
+    """Counter-based uniform(-1, 1) numbers (splitmix64), reproducible for any index"""
+    with np.errstate(over="ignore"):
+        z = np.uint64(key) + counters.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (2.0 / 2 ** 53) - 1.0
+
+
+class KlineSeries(ABC):
+    """Candles of one symbol/interval, addressed by index from `origin_ms`.
+
+    Every candle is a path of `ticks_per_candle` prices; the websocket
+    streams the path tick by tick and the closed candle (and REST) report
+    its open/high/low/close, so both sides always agree.
+    """
+
+    def __init__(self, symbol: str, interval: str, origin_ms: int, ticks_per_candle: int):
+        self.symbol = symbol.upper()
+        self.interval = interval
+        self.interval_ms = interval_to_ms(interval)
+        self.origin_ms = origin_ms - origin_ms % self.interval_ms
+        self.ticks_per_candle = ticks_per_candle
+
+    def index_at(self, time_ms: int) -> int:
+        return (time_ms - self.origin_ms) // self.interval_ms
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of candles available (unbounded for synthetic data)"""
+        pass
+
+    @abstractmethod
+    def paths(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Price paths (candles x ticks) and volumes of candles [start, stop)"""
+        pass
+
+    def rows(self, start: int, stop: int) -> List[list]:
+        """REST kline arrays for candles [start, stop)"""
+        start, stop = max(start, 0), min(stop, len(self))
+        if stop <= start:
+            return []
+
+        paths, volumes = self.paths(start, stop)
+        open_times = self.origin_ms + np.arange(start, stop) * self.interval_ms
+        rows = []
+        for i, open_time in enumerate(open_times.tolist()):
+            path = paths[i]
+            rows.append(self._row(open_time, path, volumes[i]))
+        return rows
+
+    def _row(self, open_time: int, path: np.ndarray, volume: float) -> list:
+        close = float(path[-1])
+        trades = len(path)
+        return [
+            open_time, f"{path[0]:.8f}", f"{path.max():.8f}", f"{path.min():.8f}",
+            f"{close:.8f}", f"{volume:.8f}", open_time + self.interval_ms - 1,
+            f"{volume * close:.8f}", trades, f"{volume / 2:.8f}",
+            f"{volume * close / 2:.8f}", "0",
+        ]
+
+    def event(self, index: int, tick: int, event_time: int) -> Optional[dict]:
+        """Kline websocket event for candle `index` after `tick` ticks"""
+        if not 0 <= index < len(self):
+            return None
+
+        paths, volumes = self.paths(index, index + 1)
+        path = paths[0][:tick + 1]
+        closed = tick == self.ticks_per_candle - 1
+        volume = float(volumes[0]) * len(path) / self.ticks_per_candle
+        open_time = self.origin_ms + index * self.interval_ms
+        return {
+            "e": "kline",
+            "E": event_time,
+            "s": self.symbol,
+            "k": {
+                "t": open_time,
+                "T": open_time + self.interval_ms - 1,
+                "s": self.symbol,
+                "i": self.interval,
+                "f": 0,
+                "L": len(path) - 1,
+                "o": f"{path[0]:.8f}",
+                "c": f"{path[-1]:.8f}",
+                "h": f"{path.max():.8f}",
+                "l": f"{path.min():.8f}",
+                "v": f"{volume:.8f}",
+                "n": len(path),
+                "x": closed,
+                "q": f"{volume * path[-1]:.8f}",
+                "V": f"{volume / 2:.8f}",
+                "Q": f"{volume * path[-1] / 2:.8f}",
+                "B": "0",
+            },
+        }
+
+
+class SyntheticSeries(KlineSeries):
+    """Geometric random walk, generated lazily and deterministically per stream"""
+
+    CHUNK = 4096
+
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        origin_ms: int,
+        ticks_per_candle: int = 20,
+        volatility: float = 0.002,
+        start_price: float = 100.0,
+        seed: int = 0,
+    ):
+        super().__init__(symbol, interval, origin_ms, ticks_per_candle)
+        self.key = zlib.crc32(f"{self.symbol}:{interval}:{seed}".encode()) << 32
+        # Per-tick step so a whole candle moves by about `volatility`
+        self.step = volatility / np.sqrt(ticks_per_candle) * np.sqrt(3.0)
+        self._log_start = np.log(start_price)
+        self._log_close = np.empty(0)
+
+    def __len__(self) -> int:
+        return np.iinfo(np.int64).max
+
+    def _returns(self, start: int, stop: int) -> np.ndarray:
+        n = self.ticks_per_candle
+        counters = np.arange(start * n, stop * n, dtype=np.int64)
+        return (self.step * _uniform(self.key, counters)).reshape(stop - start, n)
+
+    def _ensure(self, stop: int) -> None:
+        """Extend the cached candle closes up to index `stop`"""
+        while len(self._log_close) < stop:
+            start = len(self._log_close)
+            end = max(stop, start + self.CHUNK)
+            prev = self._log_close[-1] if start else self._log_start
+            closes = prev + np.cumsum(self._returns(start, end).sum(axis=1))
+            self._log_close = np.concatenate([self._log_close, closes])
+
+    def paths(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        self._ensure(stop)
+        prev = self._log_close[start - 1] if start else self._log_start
+        starts = np.concatenate([[prev], self._log_close[start:stop - 1]])
+        paths = np.exp(starts[:, None] + np.cumsum(self._returns(start, stop), axis=1))
+        volumes = 100.0 * (1.5 + _uniform(self.key ^ 0x5EED, np.arange(start, stop)))
+        return paths, volumes
+
+
+class RecordedSeries(KlineSeries):
+    """Replay of a stored kline frame, re-based so candle 0 opens at `origin_ms`"""
+
+    def __init__(self, symbol: str, interval: str, origin_ms: int, df: pl.DataFrame,
+                 ticks_per_candle: int = 20):
+        super().__init__(symbol, interval, origin_ms, ticks_per_candle)
+        df = df.sort("open_time")
+        self._ohlc = df.select("open", "high", "low", "close").to_numpy()
+        self._volume = df["volume"].to_numpy()
+
+    def __len__(self) -> int:
+        return len(self._ohlc)
+
+    def paths(self, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Walk open -> low -> high -> close (or open -> high -> low -> close on
+        # down candles) so ticks visit the recorded extremes
+        o, h, l, c = self._ohlc[start:stop].T
+        up = c >= o
+        first = np.where(up, l, h)
+        second = np.where(up, h, l)
+        anchors = np.stack([o, first, second, c], axis=1)
+        positions = np.linspace(0, 3, self.ticks_per_candle)
+        paths = np.stack([np.interp(positions, np.arange(4), row) for row in anchors])
+        return paths, self._volume[start:stop]
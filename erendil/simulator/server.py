@@ -0,0 +1,310 @@
+import json
+import time
+import random
+import asyncio
+import logging
+import polars as pl
+from pathlib import Path
+from aiohttp import web, WSMsgType
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+from erendil.simulator.market import KlineSeries, RecordedSeries, SimClock, SyntheticSeries, interval_to_ms
+
+
+logger = logging.getLogger(__name__)
+
+KLINES_WEIGHT = 2
+
+
+@dataclass
+class SimulatorConfig:
+    speed: float = 1.0
+    history: int = 5000
+    ticks_per_candle: int = 20
+    volatility: float = 0.002
+    seed: int = 0
+    weight_limit: int = 6000
+    error_rate: float = 0.0
+    disconnect_after: Optional[float] = None
+    recorded_dir: Optional[str] = None
+
+
+@dataclass(eq=False)
+class _Connection:
+    ws: web.WebSocketResponse
+    combined: bool
+    streams: Set[str] = field(default_factory=set)
+
+
+class BinanceSimulator:
+    """Local stand-in for the Binance klines REST endpoint and kline websockets.
+
+    Serves GET /api/v3/klines (with X-MBX-USED-WEIGHT-1M headers and 429s),
+    raw streams on /ws/<symbol>@kline_<interval> and combined streams on
+    /stream with SUBSCRIBE/UNSUBSCRIBE. Data is synthetic or replayed from
+    a kline cache directory, on a clock that can run faster than real time.
+    """
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.clock = SimClock(self.config.speed)
+        self.series: Dict[Tuple[str, str], KlineSeries] = {}
+        self.stats = {"rest_requests": 0, "rate_limited": 0, "frames_sent": 0, "disconnects": 0}
+        self._subscribers: Dict[str, Set[_Connection]] = {}
+        self._pumps: Dict[str, asyncio.Task] = {}
+        self._weight_minute = 0
+        self._weight_used = 0
+
+        self.app = web.Application()
+        self.app.router.add_get("/api/v3/klines", self.handle_klines)
+        self.app.router.add_get("/api/v3/ping", self.handle_ping)
+        self.app.router.add_get("/api/v3/time", self.handle_time)
+        self.app.router.add_get("/ws/{stream}", self.handle_raw_stream)
+        self.app.router.add_get("/ws", self.handle_raw_stream)
+        self.app.router.add_get("/stream", self.handle_combined_stream)
+        self.app.router.add_get("/simulator/stats", self.handle_stats)
+        self.app.on_shutdown.append(self._on_shutdown)
+
+    def get_series(self, symbol: str, interval: str) -> KlineSeries:
+        key = (symbol.upper(), interval)
+        if key not in self.series:
+            interval_ms = interval_to_ms(interval)
+            recorded = self._load_recorded(*key)
+            history = min(self.config.history, len(recorded)) if recorded is not None else self.config.history
+            origin = self.clock.start_ms - history * interval_ms
+
+            if recorded is not None:
+                self.series[key] = RecordedSeries(
+                    key[0], interval, origin, recorded, self.config.ticks_per_candle
+                )
+            else:
+                self.series[key] = SyntheticSeries(
+                    key[0], interval, origin,
+                    ticks_per_candle=self.config.ticks_per_candle,
+                    volatility=self.config.volatility,
+                    start_price=random.Random(f"{key}:{self.config.seed}").uniform(1, 1000),
+                    seed=self.config.seed,
+                )
+        return self.series[key]
+
+    def _load_recorded(self, symbol: str, interval: str) -> Optional[pl.DataFrame]:
+        if not self.config.recorded_dir:
+            return None
+        path = Path(self.config.recorded_dir) / f"{symbol}_{interval}.parquet"
+        return pl.read_parquet(path) if path.exists() else None
+
+    def _position(self, series: KlineSeries, now: int) -> Tuple[int, int]:
+        """Current candle index and the last tick already emitted in it"""
+        index = series.index_at(now)
+        elapsed = now - (series.origin_ms + index * series.interval_ms)
+        return index, elapsed * series.ticks_per_candle // series.interval_ms - 1
+
+    # REST
+
+    def _spend_weight(self, weight: int) -> Optional[int]:
+        """Account request weight; returns Retry-After seconds when over the limit"""
+        minute = int(time.time() // 60)
+        if minute != self._weight_minute:
+            self._weight_minute, self._weight_used = minute, 0
+        self._weight_used += weight
+        if self._weight_used > self.config.weight_limit:
+            return 60 - int(time.time() % 60)
+        return None
+
+    async def handle_klines(self, request: web.Request) -> web.Response:
+        self.stats["rest_requests"] += 1
+        retry_after = self._spend_weight(KLINES_WEIGHT)
+        if retry_after is None and random.random() < self.config.error_rate:
+            retry_after = 1
+        headers = {"X-MBX-USED-WEIGHT-1M": str(self._weight_used)}
+        if retry_after is not None:
+            self.stats["rate_limited"] += 1
+            headers["Retry-After"] = str(retry_after)
+            return web.json_response(
+                {"code": -1003, "msg": "Too many requests"}, status=429, headers=headers
+            )
+
+        query = request.query
+        try:
+            series = self.get_series(query["symbol"], query["interval"])
+        except (KeyError, ValueError) as e:
+            return web.json_response({"code": -1100, "msg": str(e)}, status=400, headers=headers)
+
+        limit = min(int(query.get("limit", 500)), 1000)
+        now = self.clock.now()
+        current, tick = self._position(series, now)
+        end_time = min(int(query.get("endTime", now)), now)
+        stop = min(series.index_at(end_time), current) + 1
+        if "startTime" in query:
+            start = -(-(int(query["startTime"]) - series.origin_ms) // series.interval_ms)
+            stop = min(stop, start + limit)
+        else:
+            start = stop - limit
+
+        rows = series.rows(start, min(stop, current))
+        if stop > current >= start:
+            # The candle still forming only shows the ticks emitted so far
+            event = series.event(current, max(tick, 0), now)
+            if event is not None:
+                k = event["k"]
+                rows.append([
+                    k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"],
+                    k["q"], k["n"], k["V"], k["Q"], "0",
+                ])
+        return web.json_response(rows, headers=headers)
+
+    async def handle_ping(self, request: web.Request) -> web.Response:
+        return web.json_response({})
+
+    async def handle_time(self, request: web.Request) -> web.Response:
+        return web.json_response({"serverTime": self.clock.now()})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            **self.stats,
+            "connections": len({c for subs in self._subscribers.values() for c in subs}),
+            "streams": sum(1 for subs in self._subscribers.values() if subs),
+            "sim_time": self.clock.now(),
+        })
+
+    # WebSocket
+
+    async def handle_raw_stream(self, request: web.Request) -> web.WebSocketResponse:
+        streams = [request.match_info["stream"]] if "stream" in request.match_info else []
+        return await self._serve_websocket(request, streams, combined=False)
+
+    async def handle_combined_stream(self, request: web.Request) -> web.WebSocketResponse:
+        streams = [s for s in request.query.get("streams", "").split("/") if s]
+        return await self._serve_websocket(request, streams, combined=True)
+
+    async def _serve_websocket(self, request: web.Request, streams, combined: bool) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=None)
+        await ws.prepare(request)
+        conn = _Connection(ws, combined)
+        self._subscribe(conn, streams)
+
+        disconnect = None
+        if self.config.disconnect_after:
+            delay = self.config.disconnect_after * random.uniform(0.5, 1.5)
+            disconnect = asyncio.get_running_loop().call_later(
+                delay, lambda: asyncio.ensure_future(self._drop(conn))
+            )
+
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._handle_control(conn, msg.data)
+                elif msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            if disconnect is not None:
+                disconnect.cancel()
+            self._unsubscribe(conn, list(conn.streams))
+        return ws
+
+    async def _drop(self, conn: _Connection) -> None:
+        self.stats["disconnects"] += 1
+        await conn.ws.close()
+
+    async def _handle_control(self, conn: _Connection, data: str) -> None:
+        try:
+            request = json.loads(data)
+            method, params, request_id = request["method"], request.get("params", []), request["id"]
+        except (ValueError, KeyError, TypeError):
+            await conn.ws.send_str(json.dumps({"error": {"code": 2, "msg": "Invalid request"}}))
+            return
+
+        result = None
+        if method == "SUBSCRIBE":
+            self._subscribe(conn, params)
+        elif method == "UNSUBSCRIBE":
+            self._unsubscribe(conn, params)
+        elif method == "LIST_SUBSCRIPTIONS":
+            result = sorted(conn.streams)
+        else:
+            await conn.ws.send_str(json.dumps({"error": {"code": 2, "msg": f"Unknown method {method}"}, "id": request_id}))
+            return
+        await conn.ws.send_str(json.dumps({"result": result, "id": request_id}))
+
+    def _subscribe(self, conn: _Connection, streams) -> None:
+        for stream in streams:
+            symbol, _, interval = stream.partition("@kline_")
+            self.get_series(symbol, interval)
+            conn.streams.add(stream)
+            self._subscribers.setdefault(stream, set()).add(conn)
+            if interval not in self._pumps:
+                self._pumps[interval] = asyncio.create_task(self._pump(interval))
+
+    def _unsubscribe(self, conn: _Connection, streams) -> None:
+        for stream in streams:
+            conn.streams.discard(stream)
+            self._subscribers.get(stream, set()).discard(conn)
+
+    async def _pump(self, interval: str) -> None:
+        """Emit ticks for every subscribed stream of one interval on the simulated clock"""
+        interval_ms = interval_to_ms(interval)
+        ticks = self.config.ticks_per_candle
+        step = interval_ms / ticks
+        last_index: Dict[str, int] = {}
+
+        while True:
+            now = self.clock.now()
+            next_emit = int((now // step + 1) * step)
+            await asyncio.sleep(self.clock.seconds_until(next_emit))
+
+            active = [
+                (stream, self._subscribers[stream])
+                for stream in list(self._subscribers)
+                if stream.endswith(f"@kline_{interval}") and self._subscribers[stream]
+            ]
+            for stream, subscribers in active:
+                series = self.get_series(stream.partition("@kline_")[0], interval)
+                index, tick = self._position(series, next_emit)
+                if tick < 0:
+                    # On a candle boundary: the previous candle just closed
+                    index, tick = index - 1, ticks - 1
+
+                events = []
+                # When the loop falls behind, still deliver every missed close
+                previous = last_index.get(stream)
+                if previous is not None and index > previous + 1:
+                    events.extend(
+                        series.event(missed, ticks - 1, next_emit)
+                        for missed in range(max(previous + 1, index - 100), index)
+                    )
+                events.append(series.event(index, tick, next_emit))
+                last_index[stream] = index
+                await self._broadcast(stream, subscribers, [e for e in events if e is not None])
+
+    async def _broadcast(self, stream: str, subscribers: Set[_Connection], events) -> None:
+        for event in events:
+            raw = json.dumps(event)
+            combined = None
+            for conn in list(subscribers):
+                if conn.ws.closed:
+                    continue
+                if conn.combined:
+                    if combined is None:
+                        combined = f'{{"stream":"{stream}","data":{raw}}}'
+                    await conn.ws.send_str(combined)
+                else:
+                    await conn.ws.send_str(raw)
+                self.stats["frames_sent"] += 1
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        for task in self._pumps.values():
+            task.cancel()
+        for conn in {c for subs in self._subscribers.values() for c in subs}:
+            await conn.ws.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> web.AppRunner:
+        """Start serving in the running event loop; returns the runner for cleanup"""
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info(
+            f"Binance simulator on http://{host}:{port} (speed x{self.config.speed}); point "
+            f"BINANCE_BASE_URL=http://{host}:{port} BINANCE_WS_URL=ws://{host}:{port}/ws "
+            f"BINANCE_STREAM_URL=ws://{host}:{port}/stream at it"
+        )
+        return runner
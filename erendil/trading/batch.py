@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import numpy as np
+import polars as pl
+from dataclasses import astuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from erendil.trading.trade_manager import TradeManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSignalEvaluator:
+    """Evaluate the candle closes of many TradeManagers in one vectorized pass.
+
+    Closes arriving within `window` seconds of each other are collected.
+    Managers that share indicator parameters, history length and last
+    candle are stacked into symbols x time matrices and computed together
+    off the event loop; each manager then acts on its own row through
+    `apply_signals`. Every close is evaluated: a manager's later closes
+    in the same window go in later rounds, applied in candle order.
+    `submit` returns once the close's signals are applied, so a
+    CloseScheduler in front of the batch caps and times the decisions,
+    not the queueing. Incremental managers already update in O(1) per candle and are passed
+    straight through.
+    """
+
+    def __init__(self, window: float = 0.05, max_batch: Optional[int] = None):
+        """
+        Initialize the batch evaluator.
+
+        Args:
+            window: Seconds to wait after the first close for the others to arrive
+            max_batch: Queued closes that end the window early, e.g. the most a
+                CloseScheduler in front of the batch lets through at once
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.evaluated = 0
+        self._pending: List[Tuple[TradeManager, pl.DataFrame, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._full = asyncio.Event()
+        # Batches are applied one after another, so a manager's closes stay in order
+        self._apply_lock = asyncio.Lock()
+
+    def callback(self, manager: TradeManager) -> Callable[[pl.DataFrame], Awaitable[None]]:
+        """onclose_callback for `manager` that routes its closes through the batch"""
+        async def onclose(df: pl.DataFrame) -> None:
+            await self.submit(manager, df)
+        return onclose
+
+    async def submit(self, manager: TradeManager, df: pl.DataFrame) -> None:
+        """Evaluate a closed candle of `manager` in the next batch; returns once its signals are applied"""
+        if manager.incremental:
+            await manager.handle_candle_close(df)
+            return
+        if len(df) < manager.min_candles:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((manager, df, future))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        if self.max_batch is not None and len(self._pending) >= self.max_batch:
+            self._full.set()
+        await future
+
+    async def _flush_after_window(self) -> None:
+        try:
+            await asyncio.wait_for(self._full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        pending, self._pending = self._pending, []
+        self._flush_task = None
+        self._full.clear()
+
+        # The n-th close of each manager in this window goes in round n
+        rounds: List[List[Tuple[TradeManager, pl.DataFrame, asyncio.Future]]] = []
+        closes: Dict[int, int] = {}
+        for entry in pending:
+            n = closes[id(entry[0])] = closes.get(id(entry[0]), -1) + 1
+            if n == len(rounds):
+                rounds.append([])
+            rounds[n].append(entry)
+
+        async with self._apply_lock:
+            try:
+                for entries in rounds:
+                    await self._evaluate_round(entries)
+            finally:
+                # No submitter is left waiting, even if the flush failed or was cancelled
+                for _, _, future in pending:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batch was not evaluated"))
+
+    async def _evaluate_round(self, entries: List[Tuple[TradeManager, pl.DataFrame, asyncio.Future]]) -> None:
+        """Evaluate closes of distinct managers, stacked by shared parameters and history"""
+        groups: Dict[tuple, List[Tuple[TradeManager, pl.DataFrame, asyncio.Future]]] = {}
+        for entry in entries:
+            manager, df, _ = entry
+            key = (
+                astuple(manager.indicator.params),
+                astuple(manager.stoploss.params),
+                df.height,
+                df['open_time'][-1],
+            )
+            groups.setdefault(key, []).append(entry)
+
+        for group in groups.values():
+            try:
+                results = await asyncio.to_thread(self._evaluate, group)
+            except Exception as e:
+                # Raised to every submitter, which logs it with its symbol
+                for _, _, future in group:
+                    if not future.done():
+                        future.set_exception(RuntimeError(f"Error evaluating batch of {len(group)} symbols: {e}"))
+                continue
+            self.batches += 1
+            self.evaluated += len(group)
+
+            outcomes = await asyncio.gather(*[
+                manager.apply_signals(hist_buy, hist_sell, current_ts, df['close'][-1], df['close_time'][-1])
+                for (manager, df, _), (hist_buy, hist_sell, current_ts) in zip(group, results)
+            ], return_exceptions=True)
+            for (_, _, future), outcome in zip(group, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(None)
+
+    @staticmethod
+    def _evaluate(group: List[Tuple[TradeManager, pl.DataFrame, asyncio.Future]]) -> List[tuple]:
+        """(hist_buy, hist_sell, current trailing stop) of every manager in the group"""
+        frames = [df for _, df, _ in group]
+        high = np.stack([df['high'].to_numpy() for df in frames])
+        low = np.stack([df['low'].to_numpy() for df in frames])
+        close = np.stack([df['close'].to_numpy() for df in frames])
+
+        manager = group[0][0]
+        hist_buy, hist_sell = manager.indicator.process_batch(high, low, close)
+        ts = manager.stoploss.process_batch(high, low, close)
+        return [(hist_buy[i], hist_sell[i], ts[i, -1]) for i in range(len(group))]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"batches": self.batches, "evaluated": self.evaluated, "pending": len(self._pending)}
@@ -0,0 +1,229 @@
+import os
+import asyncio
+import itertools
+import logging
+import numpy as np
+import polars as pl
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.features import CandleFeatures
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, StoplossParams
+
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = ("thread", "process")
+
+# Histogram values the buy/sell checks look at
+SIGNAL_TAIL = 3
+
+# Shared blocks attached by this worker process by (name, generation), least recently used first
+_attached: "OrderedDict[Tuple[str, int], SharedMemory]" = OrderedDict()
+
+
+class SharedCandles:
+    """High/low/close of one symbol's recent candles in shared memory.
+
+    The block holds a (3, size) float64 array written append-only; when
+    it runs out of room the newest `capacity` candles move to the front.
+    Workers read the slice [start, end) without any copy being pickled.
+    """
+
+    def __init__(self, capacity: int, generation: int = 0):
+        self.capacity = capacity
+        self.generation = generation  # tells a reused name apart from the block a worker attached
+        self.size = 2 * capacity
+        self.shm = SharedMemory(create=True, size=3 * self.size * 8)
+        self.array = np.ndarray((3, self.size), dtype=np.float64, buffer=self.shm.buf)
+        self.start = self.end = 0
+        self.last_open_time = None
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def sync(self, df: pl.DataFrame) -> None:
+        """Copy the candles of `df` not mirrored yet"""
+        new = None
+        if self.last_open_time is not None:
+            open_times = df['open_time']
+            idx = open_times.search_sorted(self.last_open_time)
+            if idx < len(df) and open_times[idx] == self.last_open_time:
+                new = df.slice(idx + 1)
+                if self.end - self.start < len(df) - len(new):
+                    # The frame reaches back past what is mirrored
+                    new = None
+
+        if new is None:
+            # First sync, or the history no longer overlaps: mirror it whole
+            self.start = self.end = 0
+            new = df
+        if self.end + len(new) > self.size:
+            keep = min(self.end - self.start, self.capacity - len(new))
+            self.array[:, :keep] = self.array[:, self.end - keep:self.end]
+            self.start, self.end = 0, keep
+
+        rows = len(new)
+        for i, name in enumerate(("high", "low", "close")):
+            self.array[i, self.end:self.end + rows] = new[name].to_numpy()
+        self.end += rows
+        # The frame's length is what the indicators see
+        self.start = max(self.start, self.end - len(df))
+        self.last_open_time = df['open_time'][-1]
+
+    def close(self) -> None:
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name: str, generation: int, live: int) -> SharedMemory:
+    """A worker's mapping of a shared block, keeping at most `live` blocks mapped"""
+    key = (name, generation)
+    shm = _attached.get(key)
+    if shm is None:
+        # Spawned workers share the parent's resource tracker, which unlinks the block once
+        shm = _attached[key] = SharedMemory(name=name)
+    _attached.move_to_end(key)
+    # Blocks the parent released or reallocated are no longer used and go first;
+    # their memory is only returned once every worker unmaps them
+    while len(_attached) > max(live, 1):
+        _, stale = _attached.popitem(last=False)
+        try:
+            stale.close()
+        except BufferError:
+            # Still viewed, e.g. from a traceback kept after an error; unmapped once that goes
+            pass
+    return shm
+
+
+def _compute(
+    name: str, generation: int, live: int, size: int, start: int, end: int,
+    indicator_params: IndicatorParams, stoploss_params: StoplossParams,
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Signals of the candles [start, end) of a shared block, run in a worker"""
+    shm = _attach(name, generation, live)
+    high, low, close = np.ndarray((3, size), dtype=np.float64, buffer=shm.buf)[:, start:end]
+
+    features = CandleFeatures.from_arrays(high=high, low=low, close=close)
+    hist_buy, hist_sell = BuySellIndicator(indicator_params).process_features(features)
+    ts = TrailingStoploss(stoploss_params).process_features(features)
+    return hist_buy[-SIGNAL_TAIL:].copy(), hist_sell[-SIGNAL_TAIL:].copy(), float(ts[-1])
+
+
+def _compute_many(tasks: List[tuple]) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+    return [_compute(*task) for task in tasks]
+
+
+class ComputeExecutor:
+    """Where TradeManagers evaluate their indicators on a candle close.
+
+    With "thread" the history is computed in a thread of this process, as
+    TradeManager does without an executor. With "process" every manager's
+    high/low/close is mirrored into shared memory (only new candles are
+    copied) and a process pool computes the signals, returning only the
+    last few histogram values and the current trailing stop, so closes of
+    many symbols spread over every core. Closes arriving in the same event
+    loop pass are sent in a few chunks per worker rather than one by one.
+    """
+
+    def __init__(self, kind: str = "thread", workers: Optional[int] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            kind: thread or process
+            workers: Worker processes (all cores when None)
+        """
+        if kind not in EXECUTORS:
+            raise ValueError(f"Unknown compute executor {kind!r}, expected one of {', '.join(EXECUTORS)}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.evaluated = 0
+        self.submits = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if kind == "process":
+            # Spawned, not forked: the parent runs an event loop and threads
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._mirrors: Dict[int, SharedCandles] = {}
+        self._generations = itertools.count()
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._queued: List[Tuple[tuple, asyncio.Future]] = []
+
+    async def signals(self, manager, df: pl.DataFrame) -> Tuple[np.ndarray, np.ndarray, float]:
+        """(hist_buy, hist_sell, current trailing stop) of `manager` after the close of `df`"""
+        self.evaluated += 1
+        if self._pool is None:
+            return await asyncio.to_thread(manager.compute_signals, df)
+
+        key = id(manager)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        # A mirror is only rewritten once the workers are done reading it
+        async with lock:
+            mirror = self._mirrors.get(key)
+            if mirror is None or len(df) > mirror.capacity:
+                if mirror is not None:
+                    mirror.close()
+                # Room for the history to grow a little before reallocating
+                mirror = self._mirrors[key] = SharedCandles(max(len(df) * 5 // 4, 64), next(self._generations))
+            mirror.sync(df)
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            if not self._queued:
+                loop.call_soon(self._submit_queued)
+            self._queued.append((
+                (mirror.name, mirror.generation, len(self._mirrors), mirror.size, mirror.start, mirror.end, manager.indicator.params, manager.stoploss.params),
+                future,
+            ))
+            return await future
+
+    def _submit_queued(self) -> None:
+        queued, self._queued = self._queued, []
+        # Two chunks per worker balance the load without a round trip per symbol
+        size = -(-len(queued) // (2 * self.workers))
+        for i in range(0, len(queued), size):
+            chunk = queued[i:i + size]
+            self.submits += 1
+            done = asyncio.wrap_future(self._pool.submit(_compute_many, [task for task, _ in chunk]))
+            done.add_done_callback(lambda done, chunk=chunk: self._resolve(chunk, done))
+
+    @staticmethod
+    def _resolve(chunk: List[Tuple[tuple, asyncio.Future]], done: asyncio.Future) -> None:
+        error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+        for i, (_, future) in enumerate(chunk):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[i])
+
+    def release(self, manager) -> None:
+        """Free the shared memory of a manager that stopped trading"""
+        mirror = self._mirrors.pop(id(manager), None)
+        self._locks.pop(id(manager), None)
+        if mirror is not None:
+            mirror.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "evaluated": self.evaluated,
+            "submits": self.submits,
+            "mirrors": len(self._mirrors),
+            "shared_bytes": sum(mirror.shm.size for mirror in self._mirrors.values()),
+        }
+
+    def close(self) -> None:
+        """Stop the workers and free every shared block"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        for mirror in self._mirrors.values():
+            mirror.close()
+        self._mirrors.clear()
+        self._locks.clear()
@@ -0,0 +1,170 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from erendil.database.trade_db import TradeDatabase
+from erendil.database.trade_journal import TradeJournal
+
+
+logger = logging.getLogger(__name__)
+
+
+class TradePersister:
+    """Write-behind persistence of trade entries.
+
+    Trades are put on a bounded queue and a background task saves them to
+    the database and then the journal, in order, retrying failed writes.
+    The caller only waits on the enqueue, unless `maxsize` trades are
+    already waiting, in which case it waits for room. Once closed, the
+    persister accepts no more trades.
+    """
+
+    def __init__(
+        self,
+        db: TradeDatabase,
+        journal: TradeJournal,
+        symbol: str,
+        interval: str,
+        maxsize: int = 1000,
+        retries: int = 5,
+        retry_delay: float = 0.5,
+    ):
+        """
+        Initialize the persister.
+
+        Args:
+            db: Database the trades are saved to
+            journal: Trade journal for trades the database accepted
+            symbol: Trading pair symbol
+            interval: Candle interval
+            maxsize: Trades queued before submit waits
+            retries: Attempts per write before the trade is given up on
+            retry_delay: Seconds before the first retry, doubled on each further one
+        """
+        self.db = db
+        self.journal = journal
+        self.symbol = symbol
+        self.interval = interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.persisted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.retried = 0
+        self.max_depth = 0
+        self.max_lag = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._maxsize = maxsize
+        self._consumer: Optional[asyncio.Task] = None
+        self._closed = False
+        # Enqueue times of the trades not written yet, oldest first
+        self._enqueued: deque = deque()
+
+    async def submit(self, trade_entry: Dict) -> None:
+        """Queue a trade entry for persistence"""
+        if self._closed:
+            # The journal and database are closed; reopening them here would leak them
+            raise RuntimeError(f"Trade persister for {self.symbol} {self.interval} is closed")
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._maxsize)
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+        enqueued = time.monotonic()
+        await self._queue.put((enqueued, trade_entry))
+        self._enqueued.append(enqueued)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    async def _consume(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Everything already queued goes to the database together
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._persist(batch)
+            except Exception as e:
+                logger.error(f"Unexpected error persisting {len(batch)} trades: {e}")
+            finally:
+                for _ in batch:
+                    self._enqueued.popleft()
+                    self._queue.task_done()
+
+    async def _persist(self, batch: List[Tuple[float, Dict]]) -> None:
+        saved = await asyncio.gather(*(
+            self._retry("database", self.db.insert_trade, entry, self.symbol, self.interval)
+            for _, entry in batch
+        ))
+        for (enqueued, entry), inserted in zip(batch, saved):
+            if inserted is None:
+                self.failed += 1
+                continue
+            if not inserted:
+                self.duplicates += 1
+                continue
+            seq = await self._retry("journal", asyncio.to_thread, self.journal.append, entry)
+            if seq is None:
+                self.failed += 1
+                continue
+            self.persisted += 1
+            self.max_lag = max(self.max_lag, time.monotonic() - enqueued)
+            logger.debug(f"Trade entry {seq} persisted for {self.symbol} {self.interval}")
+
+    async def _retry(self, target: str, write, *args):
+        """Result of `write(*args)`, or None once every attempt failed"""
+        delay = self.retry_delay
+        for attempt in range(1, self.retries + 1):
+            try:
+                return await write(*args)
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error(f"Giving up on a {self.symbol} trade after {attempt} {target} attempts: {e}")
+                    return None
+                logger.warning(f"Retrying {self.symbol} trade {target} write in {delay:.1f}s: {e}")
+                self.retried += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    @property
+    def depth(self) -> int:
+        """Trades waiting to be written"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest unwritten trade has waited"""
+        return time.monotonic() - self._enqueued[0] if self._enqueued else 0.0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+            "persisted": self.persisted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+    async def flush(self) -> None:
+        """Wait until every queued trade is written"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Write queued trades, then close the journal and the database"""
+        if self._closed:
+            return
+        self._closed = True
+        await self.flush()
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        await asyncio.to_thread(self.journal.close)
+        await self.db.close()
@@ -0,0 +1,260 @@
+import json
+import asyncio
+import logging
+import tomllib
+from pathlib import Path
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+from erendil.exchange.binance import BinanceExchange, BinanceKlineManager
+from erendil.models.data_models import IndicatorParams, StoplossParams
+from erendil.models.enums import MAType, SmoothingType
+from erendil.trading.batch import BatchSignalEvaluator
+from erendil.trading.compute import ComputeExecutor
+from erendil.trading.scheduler import CloseScheduler
+from erendil.trading.trade_manager import TradeManager
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BotConfig:
+    symbol: str
+    interval: str
+    capital_per_trade: float = 100
+    fee_percent: float = 0.1
+    max_buys: int = 3
+    incremental: bool = True
+    limit: int = 1000  # closed candles kept in memory
+    indicator: IndicatorParams = field(default_factory=IndicatorParams)
+    stoploss: StoplossParams = field(default_factory=StoplossParams)
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol.upper()}_{self.interval}"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None) -> "BotConfig":
+        """Bot entry of a runtime config, missing settings taken from `defaults`"""
+        merged = {**(defaults or {}), **data}
+        indicator = {**(defaults or {}).get("indicator", {}), **data.get("indicator", {})}
+        stoploss = {**(defaults or {}).get("stoploss", {}), **data.get("stoploss", {})}
+        unknown = set(merged) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"Unknown bot settings: {', '.join(sorted(unknown))}")
+
+        for name, enum in (("oscillator_ma", MAType), ("signal_ma", MAType), ("smoothing", SmoothingType)):
+            if name in indicator:
+                indicator[name] = enum(indicator[name])
+        merged["symbol"] = merged["symbol"].upper()
+        merged["indicator"] = IndicatorParams(**indicator)
+        merged["stoploss"] = StoplossParams(**stoploss)
+        return cls(**merged)
+
+
+@dataclass
+class RuntimeConfig:
+    bots: List[BotConfig]
+    data_dir: str = "."  # trade logs and databases
+    cache_dir: Optional[str] = "kline_cache"
+    batch_window: float = 0.05
+    compute: str = "thread"  # where non-incremental bots recompute: thread or process
+    compute_workers: Optional[int] = None
+    max_concurrent_closes: int = 16  # closes handled at once; the rest queue, open positions first
+
+
+def load_config(path: str) -> RuntimeConfig:
+    """Read a runtime config from TOML or JSON.
+
+    Top-level settings are those of RuntimeConfig; the `defaults` table
+    applies to every entry of the `bots` list, which takes BotConfig fields
+    with `indicator` and `stoploss` tables of IndicatorParams/StoplossParams.
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f) if path.endswith(".toml") else json.load(f)
+    defaults = data.pop("defaults", {})
+    bots = [BotConfig.from_dict(bot, defaults) for bot in data.pop("bots", [])]
+    unknown = set(data) - {f.name for f in fields(RuntimeConfig)}
+    if unknown:
+        raise ValueError(f"Unknown runtime settings: {', '.join(sorted(unknown))}")
+    keys = [bot.key for bot in bots]
+    duplicates = {key for key in keys if keys.count(key) > 1}
+    if duplicates:
+        raise ValueError(f"Bots configured more than once: {', '.join(sorted(duplicates))}")
+    return RuntimeConfig(bots=bots, **data)
+
+
+class BotRuntime:
+    """Many trading bots on one event loop and one exchange connection.
+
+    Each bot is a TradeManager fed by its own kline stream on a shared
+    BinanceExchange. Candle closes are queued by a CloseScheduler and then
+    go through one BatchSignalEvaluator, or to a shared process pool when
+    `compute` is "process".
+    Bots can be added and removed while the runtime runs, and `apply`
+    reconciles the running bots with a (re)loaded config.
+    """
+
+    def __init__(self, config: Optional[RuntimeConfig] = None, exchange: Optional[BinanceExchange] = None):
+        """
+        Initialize the runtime.
+
+        Args:
+            config: Where bots keep their files, and the bots `start` launches
+            exchange: Shared exchange connection (a new one when None)
+        """
+        self.config = config or RuntimeConfig(bots=[])
+        self.exchange = exchange or BinanceExchange()
+        # The scheduler lets at most max_concurrent_closes through, so a batch that size is complete
+        self.batch = BatchSignalEvaluator(window=self.config.batch_window, max_batch=self.config.max_concurrent_closes)
+        self.executor = ComputeExecutor(self.config.compute, self.config.compute_workers)
+        self.scheduler = CloseScheduler(self.config.max_concurrent_closes)
+        self.bots: Dict[str, Tuple[BotConfig, TradeManager, BinanceKlineManager]] = {}
+        self._lock = asyncio.Lock()
+        self._feed: Optional[asyncio.Task] = None
+
+    async def add_bot(self, bot: BotConfig) -> TradeManager:
+        """Start trading a symbol/interval"""
+        async with self._lock:
+            return await self._add_bot(bot)
+
+    async def remove_bot(self, symbol: str, interval: str) -> None:
+        """Stop trading a symbol/interval, writing out its queued trades"""
+        async with self._lock:
+            await self._remove_bots([f"{symbol.upper()}_{interval}"])
+
+    async def _add_bot(self, bot: BotConfig, subscribe: bool = True) -> TradeManager:
+        # Called with self._lock held, so the registry and the subscriptions change together.
+        # Without `subscribe` the caller passes the feed to exchange.add_managers
+        if bot.key in self.bots:
+            raise ValueError(f"Bot already running: {bot.key}")
+
+        data_dir = Path(self.config.data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        manager = TradeManager(
+            symbol=bot.symbol, interval=bot.interval,
+            capital_per_trade=bot.capital_per_trade, fee_percent=bot.fee_percent, max_buys=bot.max_buys,
+            log_file=str(data_dir / f"{bot.key}_log_file.json"),
+            db_path=str(data_dir / f"{bot.key}_trades.db"),
+            incremental=bot.incremental,
+            indicator_params=bot.indicator, stoploss_params=bot.stoploss,
+            executor=self.executor,
+        )
+        await manager.initialize()
+        try:
+            feed = await self.exchange.add_symbol_stream(
+                bot.symbol, bot.interval,
+                # Batches run on one core; the process pool spreads single closes over all of them
+                onclose_callback=self.scheduler.callback(
+                    manager, manager.handle_candle_close if self.executor.kind == "process" else self.batch.callback(manager)
+                ),
+                onmessage_callback=manager.handle_price_update,
+                limit=bot.limit, cache_dir=self.config.cache_dir, subscribe=subscribe,
+            )
+        except Exception:
+            await manager.close()
+            raise
+        # Closes hand over frames of the feed's ring buffer, so the feature cache can key on its version
+        manager.features.buffer = feed.candles
+        self.bots[bot.key] = (bot, manager, feed)
+        logger.info(f"Started bot {bot.key} ({len(self.bots)} running)")
+        return manager
+
+    async def _remove_bots(self, keys: List[str]) -> None:
+        # Called with self._lock held. Closes stop arriving first, every bot's trades
+        # are written out together, and only then is Binance told, in as few messages as it allows
+        entries = [self.bots.pop(key) for key in keys if key in self.bots]
+        if not entries:
+            return
+        streams = await self.exchange.detach_streams([(bot.symbol, bot.interval) for bot, _, _ in entries])
+        for _, manager, _ in entries:
+            self.scheduler.discard(manager)
+        results = await asyncio.gather(*(self._close(manager) for _, manager, _ in entries), return_exceptions=True)
+        for (bot, _, _), result in zip(entries, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error stopping bot {bot.key}: {result}")
+            else:
+                logger.info(f"Stopped bot {bot.key}")
+        await self.exchange.unsubscribe(streams)
+        logger.info(f"{len(self.bots)} bots running")
+
+    async def _close(self, manager: TradeManager) -> None:
+        # A close already running may still trade
+        await self.scheduler.settle(manager)
+        await manager.close()
+
+    async def apply(self, bots: List[BotConfig]) -> None:
+        """Add, remove and restart bots so exactly `bots` run"""
+        async with self._lock:
+            wanted = {bot.key: bot for bot in bots}
+            stale = [
+                running for key, (running, _, _) in self.bots.items()
+                if key not in wanted or asdict(wanted[key]) != asdict(running)
+            ]
+            await self._remove_bots([bot.key for bot in stale])
+
+            added = [bot for key, bot in wanted.items() if key not in self.bots]
+            # History downloads overlap; the REST rate limiter paces them
+            results = await asyncio.gather(
+                *(self._add_bot(bot, subscribe=False) for bot in added), return_exceptions=True
+            )
+            started = []
+            for bot, result in zip(added, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Could not start bot {bot.key}: {result}")
+                else:
+                    started.append(bot.key)
+            if not started:
+                return
+            try:
+                # One SUBSCRIBE (per 200 streams) for every new bot
+                await self.exchange.add_managers([self.bots[key][2] for key in started])
+            except Exception as e:
+                logger.error(f"Could not subscribe {len(started)} bots: {e}")
+                await self._remove_bots(started)
+
+    async def start(self) -> None:
+        """Start the configured bots and the shared connection"""
+        if self._feed is None:
+            self._feed = asyncio.create_task(self.exchange.start())
+        await self.apply(self.config.bots)
+
+    async def watch(self, path: str, poll_interval: float = 5.0) -> None:
+        """Reapply the config at `path` whenever the file changes"""
+        modified = Path(path).stat().st_mtime
+        while True:
+            await asyncio.sleep(poll_interval)
+            try:
+                current = Path(path).stat().st_mtime
+                if current == modified:
+                    continue
+                modified = current
+                config = load_config(path)
+                logger.info(f"Config {path} changed, applying {len(config.bots)} bots")
+                await self.apply(config.bots)
+            except Exception as e:
+                logger.error(f"Could not apply config {path}: {e}")
+
+    async def stop(self) -> None:
+        """Stop every bot and close the connection"""
+        async with self._lock:
+            await self._remove_bots(list(self.bots))
+        await self.exchange.stop_all()
+        if self._feed is not None:
+            self._feed.cancel()
+            try:
+                await self._feed
+            except asyncio.CancelledError:
+                pass
+            self._feed = None
+        self.executor.close()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            key: {
+                "pnl": manager.pnl, "position": manager.position_log.position, **manager.persister.stats,
+                **{f"close_latency_{k}": v for k, v in self.scheduler.latency(key).items()},
+            }
+            for key, (_, manager, _) in self.bots.items()
+        }
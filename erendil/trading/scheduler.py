@@ -0,0 +1,175 @@
+import time
+import heapq
+import asyncio
+import logging
+import numpy as np
+import polars as pl
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from erendil.trading.trade_manager import TradeManager
+
+
+logger = logging.getLogger(__name__)
+
+CloseHandler = Callable[[pl.DataFrame], Awaitable[None]]
+
+
+class CloseScheduler:
+    """Queue candle closes and hand them to the TradeManagers a few at a time.
+
+    Closes of every stream land on the same interval boundary. Instead of
+    starting them all at once, they are queued by priority (managers with
+    an open position first, then in arrival order) and at most
+    `max_concurrent` run together, so the first decisions are not held up
+    by the whole herd. A manager's closes are handled one at a time in the
+    order its candles closed, so none is skipped when a close arrives
+    before the previous one is handled. Close-to-decision latency is kept
+    per symbol.
+    """
+
+    def __init__(self, max_concurrent: int = 16, window: int = 1000):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Closes handled at the same time
+            window: Latest latencies kept per symbol
+        """
+        self.max_concurrent = max_concurrent
+        self.window = window
+        self.received = 0
+        self.handled = 0
+        self.deferred = 0
+        self.failed = 0
+        self.max_queued = 0
+        self.latencies: Dict[str, Deque[float]] = {}
+        # Managers with a close ready to run, by (priority, sequence); stale entries are skipped
+        self._heap: List[Tuple[int, int, int]] = []
+        self._ready: Dict[int, int] = {}  # manager key -> sequence of its live heap entry
+        self._queued: Dict[int, Deque[Tuple[TradeManager, pl.DataFrame, CloseHandler, float]]] = {}
+        self._active: Set[int] = set()  # managers with a close running
+        self._pending = 0
+        self._sequence = 0
+        self._running = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._finished = asyncio.Condition()  # notified whenever a close is handled
+
+    def callback(self, manager: TradeManager, handler: Optional[CloseHandler] = None) -> CloseHandler:
+        """onclose_callback for `manager` that goes through the queue; `handler` defaults to handle_candle_close"""
+        handler = handler or manager.handle_candle_close
+
+        async def onclose(df: pl.DataFrame) -> None:
+            self.submit(manager, df, handler)
+        return onclose
+
+    @staticmethod
+    def priority(manager: TradeManager) -> int:
+        """Lower runs first: an open position may have to exit"""
+        return 0 if manager.position_log.position > 0 else 1
+
+    def submit(self, manager: TradeManager, df: pl.DataFrame, handler: CloseHandler) -> None:
+        """Queue a closed candle of `manager`"""
+        self.received += 1
+        key = id(manager)
+        queue = self._queued.setdefault(key, deque())
+        queue.append((manager, df, handler, time.monotonic()))
+        self._pending += 1
+        self.max_queued = max(self.max_queued, self._pending)
+        if len(queue) > 1 or key in self._active:
+            # Runs once the manager's earlier close is handled
+            self.deferred += 1
+        else:
+            self._push(manager, key)
+        self._idle.clear()
+        self._dispatch()
+
+    def discard(self, manager: TradeManager) -> None:
+        """Drop the queued closes of a manager that stopped trading"""
+        key = id(manager)
+        self._pending -= len(self._queued.pop(key, ()))
+        self._ready.pop(key, None)
+        if not self._queued and not self._running:
+            self._idle.set()
+
+    async def settle(self, manager: TradeManager) -> None:
+        """Wait until no close of `manager` is running, e.g. before closing it after `discard`"""
+        async with self._finished:
+            await self._finished.wait_for(lambda: id(manager) not in self._active)
+
+    def _push(self, manager: TradeManager, key: int) -> None:
+        self._sequence += 1
+        self._ready[key] = self._sequence
+        heapq.heappush(self._heap, (self.priority(manager), self._sequence, key))
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_concurrent and self._heap:
+            priority, sequence, key = heapq.heappop(self._heap)
+            if self._ready.get(key) != sequence:
+                continue  # discarded
+            queue = self._queued[key]
+            # The position may have changed while queued, e.g. a stop-loss exit on a tick
+            current = self.priority(queue[0][0])
+            if current != priority:
+                heapq.heappush(self._heap, (current, sequence, key))
+                continue
+            del self._ready[key]
+            entry = queue.popleft()
+            if not queue:
+                del self._queued[key]
+            self._pending -= 1
+            self._active.add(key)
+            self._running += 1
+            asyncio.create_task(self._run(*entry))
+
+    async def _run(self, manager: TradeManager, df: pl.DataFrame, handler: CloseHandler, received: float) -> None:
+        try:
+            await handler(df)
+            self.handled += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error handling candle close for {manager.symbol}: {e}")
+        finally:
+            key = f"{manager.symbol}_{manager.interval}"
+            latencies = self.latencies.get(key)
+            if latencies is None:
+                latencies = self.latencies[key] = deque(maxlen=self.window)
+            latencies.append(time.monotonic() - received)
+            self._running -= 1
+            self._active.discard(id(manager))
+            if id(manager) in self._queued:
+                # Its next close queues again, behind the closes already waiting
+                self._push(manager, id(manager))
+            self._dispatch()
+            if not self._running and not self._queued:
+                self._idle.set()
+            async with self._finished:
+                self._finished.notify_all()
+
+    async def join(self) -> None:
+        """Wait until every queued close is handled"""
+        await self._idle.wait()
+
+    def latency(self, key: Optional[str] = None) -> Dict[str, float]:
+        """Close-to-decision latency percentiles in seconds, of one SYMBOL_interval or all"""
+        if key is not None:
+            values = np.fromiter(self.latencies.get(key, ()), dtype=np.float64)
+        else:
+            values = np.concatenate([np.fromiter(v, dtype=np.float64) for v in self.latencies.values()] or [np.empty(0)])
+        if not len(values):
+            return {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p99 = np.percentile(values, [50, 99])
+        return {"count": len(values), "p50": float(p50), "p99": float(p99), "max": float(values.max())}
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "received": self.received,
+            "handled": self.handled,
+            "deferred": self.deferred,
+            "failed": self.failed,
+            "queued": self._pending,
+            "running": self._running,
+            "max_queued": self.max_queued,
+            **{f"latency_{k}": v for k, v in self.latency().items() if k != "count"},
+        }
@@ -1,22 +1,25 @@
-import aiofiles
 import polars as pl
 from asyncio import Lock
-import logging, json, asyncio
-from datetime import datetime
-from typing import Optional, Dict, List
+import logging, asyncio
+from typing import Optional, Dict
 from datetime import datetime, timedelta, timezone
-from erendil.models.data_models import MarketSignal
+from erendil.models.data_models import IndicatorParams, MarketSignal, StoplossParams
 from erendil.database.trade_db import TradeDatabase
+from erendil.database.trade_journal import TradeJournal
 from erendil.trading.position import PositionManager
+from erendil.trading.persister import TradePersister
+from erendil.trading.compute import ComputeExecutor
 from erendil.indicators.buy_sell import BuySellIndicator
 from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.indicators.features import FeatureStore
+from erendil.indicators.streaming import StreamingBuySellIndicator, StreamingTrailingStoploss
 
 
 logger = logging.getLogger(__name__)
         
 
 class TradeManager:
-    def __init__(self, symbol: str, interval: str, capital_per_trade: float=100, fee_percent: float=0.1, max_buys: int=3, log_file: str = "trade_log.json", db_path: str = "trades.db"):
+    def __init__(self, symbol: str, interval: str, capital_per_trade: float=100, fee_percent: float=0.1, max_buys: int=3, log_file: str = "trade_log.json", db_path: str = "trades.db", incremental: bool = True, journal_fsync: str = "always", indicator_params: Optional[IndicatorParams] = None, stoploss_params: Optional[StoplossParams] = None, executor: Optional[ComputeExecutor] = None):
         self.pnl = 0
         self.buy_count = 0
         self.trade_log = []
@@ -25,15 +28,24 @@ class TradeManager:
         self.interval = interval
         self.max_buys = max_buys
         self.log_file = log_file
+        # Trades are appended to a journal and periodically snapshotted into log_file
+        self.journal = TradeJournal(log_file, symbol, interval, fsync=journal_fsync)
         self.fee_percent = fee_percent
         self.cached_trailing_stop = None
         self.db = TradeDatabase(db_path)
-        self.stoploss = TrailingStoploss()
-        self.indicator = BuySellIndicator()
+        self.incremental = incremental
+        # Runs full recomputes; a thread of this process when None
+        self.executor = executor
+        # Streaming indicators update in O(1) per candle instead of recomputing the history
+        self.stoploss = (StreamingTrailingStoploss if incremental else TrailingStoploss)(stoploss_params)
+        self.indicator = (StreamingBuySellIndicator if incremental else BuySellIndicator)(indicator_params)
+        self._last_open_time = None
+        self.features = FeatureStore()
+        self._indicator_lock = Lock()
         self.position_log = PositionManager()
         self.capital_per_trade = capital_per_trade
-        
-        self.file_lock = Lock()
+        # Trades are written behind the signal path
+        self.persister = TradePersister(self.db, self.journal, symbol, interval)
     
     async def initialize(self):
         """Initialize the database"""
@@ -44,30 +56,15 @@ class TradeManager:
         return utc_time.astimezone(ist)
     
     async def _save_trade_entry(self, trade_entry: Dict):
-        """Save trade entry to both database and log file"""
-        saved_to_db = await self.db.save_trade(trade_entry, self.symbol, self.interval) 
-        if saved_to_db:
-            try:
-                async with self.file_lock:
-                    json_data = {
-                        "trades": [],
-                        "symbol": self.symbol,
-                        "interval": self.interval,
-                    }
-                    try:
-                        async with aiofiles.open(self.log_file, 'r') as f:
-                            content = await f.read()
-                            if content:
-                                json_data = json.loads(content)
-                    except FileNotFoundError:
-                        pass
-                    json_data['trades'].append(trade_entry)
-                    async with aiofiles.open(self.log_file, 'w') as f:
-                        await f.write(json.dumps(json_data, indent=2, default=str))
-                    logger.debug(f"Trade entry saved successfully to {self.log_file}")
-            except Exception as e:
-                logger.error(f"Error saving trade log: {e}")
-    
+        """Queue trade entry for the database and log file"""
+        await self.persister.submit(trade_entry)
+
+    async def close(self):
+        """Write queued trades, snapshot the trade journal and close the database"""
+        await self.persister.close()
+        if self.executor is not None:
+            self.executor.release(self)
+
     def _create_trade_entry(self, signal: MarketSignal, action: str, position_size: float, 
         fee: float, pnl: Optional[float] = None) -> Dict:
         """Create a trade entry dictionary"""
@@ -186,25 +183,35 @@ class TradeManager:
             trade_entry = self._create_trade_entry(signal, "SELL_SECOND", exit_position, fee, exit_pnl)
             await self._save_trade_entry(trade_entry)
     
+    @property
+    def min_candles(self) -> int:
+        """Candles needed before signals are evaluated"""
+        return max(self.indicator.params.slow_length, self.stoploss.params.hhv_period) + 2
+    
     async def handle_candle_close(self, df: pl.DataFrame):
         """Process completed candle - compute all indicators and signals"""
-        if len(df) < max(self.indicator.params.slow_length, self.stoploss.params.hhv_period) + 2:
+        if len(df) < self.min_candles:
             return
         
-        hist_buy, hist_sell, current_ts, current_price, latest_timestamp = None, None, None, None, None
-            
-        def compute():
-            nonlocal hist_buy, hist_sell, current_ts, current_price, latest_timestamp
-            latest_row = df.tail(1)
-            current_price = latest_row['close'][0]
-            latest_timestamp = latest_row['close_time'][0]
-            
-            # Compute indicators
-            hist_buy, hist_sell = self.indicator.process_data(df)
-            ts_array, current_ts, prev_ts = self.stoploss.process_data(df)
-        
-        await asyncio.to_thread(compute)
+        if self.incremental:
+            hist_buy, hist_sell, current_ts = await self._update_indicators(df)
+        elif self.executor is not None:
+            hist_buy, hist_sell, current_ts = await self.executor.signals(self, df)
+        else:
+            hist_buy, hist_sell, current_ts = await asyncio.to_thread(self.compute_signals, df)
         
+        await self.apply_signals(hist_buy, hist_sell, current_ts, df['close'][-1], df['close_time'][-1])
+    
+    def compute_signals(self, df: pl.DataFrame):
+        """Indicator histograms and current trailing stop from the whole history"""
+        # Compute indicators, sharing TR/ATR/MAs through the feature cache
+        features = self.features.get(df)
+        hist_buy, hist_sell = self.indicator.process_data(df, features)
+        ts_array, current_ts, prev_ts = self.stoploss.process_data(df, features)
+        return hist_buy, hist_sell, current_ts
+    
+    async def apply_signals(self, hist_buy, hist_sell, current_ts: float, current_price: float, latest_timestamp: datetime):
+        """Act on the indicator values of the candle that just closed"""
         # Cache trailing stop for real-time checks
         self.cached_trailing_stop = current_ts
         
@@ -230,6 +237,31 @@ class TradeManager:
                 )
                 await self.sell(signal, current_ts)
     
+    async def _update_indicators(self, df: pl.DataFrame):
+        """Fold candles not seen yet into the streaming indicators"""
+        async with self._indicator_lock:
+            start = None
+            if self._last_open_time is not None:
+                open_times = df['open_time']
+                idx = open_times.search_sorted(self._last_open_time)
+                if idx < len(df) and open_times[idx] == self._last_open_time:
+                    start = idx + 1
+            
+            if start is None:
+                # First candle close, or the history no longer overlaps: replay it once
+                def seed():
+                    self.indicator.seed(df)
+                    self.stoploss.seed(df)
+                await asyncio.to_thread(seed)
+            else:
+                new = df.slice(start)
+                for high, low, close in zip(new['high'].to_list(), new['low'].to_list(), new['close'].to_list()):
+                    self.indicator.update(high, low, close)
+                    self.stoploss.update(high, low, close)
+            
+            self._last_open_time = df['open_time'][-1]
+            return self.indicator.hist_buy, self.indicator.hist_sell, self.stoploss.current[0]
+    
     async def handle_price_update(self, current_price: float):
         """Check real-time price against cached trailing stop"""
         
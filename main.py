@@ -1,6 +1,10 @@
+import signal
 import asyncio
 import logging
+import argparse
 from erendil.exchange.binance import Erendil
+from erendil.exchange.rest import close_http_client
+from erendil.trading.runtime import BotRuntime, load_config
 from erendil.trading.trade_manager import TradeManager
 
 
@@ -12,7 +16,27 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
         
         
+def cancel_on_signals() -> None:
+    """Turn the first SIGINT or SIGTERM into a cancellation of the running task, so its cleanup runs"""
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+
+    def stop(sig: signal.Signals) -> None:
+        logger.info(f"Received {sig.name}")
+        # A second signal gets the default handling, e.g. Ctrl-C again aborts the cleanup
+        for s in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(s)
+        task.cancel()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop, sig)
+        except NotImplementedError:  # Windows: Ctrl-C still cancels through asyncio.run
+            pass
+
+
 async def main():
+    cancel_on_signals()
     interval = "1m"
     symbol = "ATOMUSDT"
     trade_manager = TradeManager(
@@ -22,7 +46,7 @@ async def main():
         db_path=f"{symbol}_{interval}_trades.db"
     )  
     trader = Erendil(
-        limit = 5000, interval = interval, symbol = symbol,
+        limit = 5000, interval = interval, symbol = symbol, cache_dir = "kline_cache",
         onclose_callback = trade_manager.handle_candle_close,
         onmessage_callback = trade_manager.handle_price_update
     )
@@ -32,9 +56,37 @@ async def main():
         await trader.run()
         while True:
             await asyncio.sleep(1)
-    except KeyboardInterrupt:
+    except asyncio.CancelledError:
+        pass
+    finally:
         logger.info("Shutting down...")
-        await trader.stop()
+        try:
+            await trader.stop()
+        finally:
+            # Writes the trades still queued for the database and journal
+            await trade_manager.close()
+            await close_http_client()
+
+
+async def run_bots(config_path: str):
+    """Every bot of a config file in this process; edits to the file are applied live"""
+    cancel_on_signals()
+    runtime = BotRuntime(load_config(config_path))
+    try:
+        await runtime.start()
+        await runtime.watch(config_path)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        logger.info("Shutting down...")
+        try:
+            await runtime.stop()
+        finally:
+            await close_http_client()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Erendil trading bot")
+    parser.add_argument("--config", help="TOML/JSON file of bots to run together in one process")
+    args = parser.parse_args()
+    asyncio.run(run_bots(args.config) if args.config else main())
@@ -0,0 +1,32 @@
+import json
+import asyncio
+from erendil.backtest.backtester import Backtester
+from erendil.database.trade_journal import read_trade_log
+from erendil.trading.trade_manager import TradeManager
+
+
+async def replay(history, directory) -> list:
+    """Every candle sends its close as a price tick, then closes, as the live feed does"""
+    log_file = str(directory / "trade_log.json")
+    manager = TradeManager("TESTUSDT", "1m", log_file=log_file, db_path=str(directory / "trades.db"),
+                           journal_fsync="never")
+    await manager.initialize()
+    for i, price in enumerate(history["close"].to_list()):
+        await manager.handle_price_update(price)
+        await manager.handle_candle_close(history.head(i + 1))
+    await manager.close()
+    return (read_trade_log(log_file) or {"trades": []})["trades"]
+
+
+def test_backtest_trades_match_trade_manager(tmp_path, make_history):
+    history = make_history(1_500, seed=7, volatility=0.004)
+    live = asyncio.run(replay(history, tmp_path))
+    backtest = json.loads(json.dumps(Backtester().run(history).trades, default=str))
+
+    assert {trade["action"] for trade in live} >= {"BUY", "SELL_FIRST", "SELL_SECOND"}
+    assert len(live) == len(backtest)
+    for a, b in zip(live, backtest):
+        if a["action"] == "SELL_SECOND":
+            # The live stop exit is stamped with the wall clock
+            a, b = dict(a, timestamp=None), dict(b, timestamp=None)
+        assert a == b
@@ -0,0 +1,72 @@
+import asyncio
+import numpy as np
+from erendil.trading.batch import BatchSignalEvaluator
+from erendil.trading.trade_manager import TradeManager
+
+
+def manager(tmp_path, name: str) -> TradeManager:
+    manager = TradeManager(name, "1m", incremental=False,
+                           log_file=str(tmp_path / f"{name}_log_file.json"), db_path=str(tmp_path / f"{name}.db"))
+    manager.applied = []
+
+    async def apply_signals(hist_buy, hist_sell, current_ts, current_price, latest_timestamp):
+        manager.applied.append((latest_timestamp, hist_buy, hist_sell, current_ts))
+    manager.apply_signals = apply_signals
+    return manager
+
+
+def test_two_closes_of_one_manager_in_one_window(tmp_path, make_history):
+    history = make_history(302, seed=1)
+    first, second = history.head(301), history.slice(1, 301)
+    bot, other = manager(tmp_path, "AUSDT"), manager(tmp_path, "BUSDT")
+    batch = BatchSignalEvaluator(window=0.05)
+
+    async def run():
+        await asyncio.gather(batch.submit(bot, first), batch.submit(other, first), batch.submit(bot, second))
+        while len(bot.applied) + len(other.applied) < 3:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert [timestamp for timestamp, *_ in bot.applied] == [first['close_time'][-1], second['close_time'][-1]]
+    for df, (_, hist_buy, hist_sell, current_ts) in zip((first, second), bot.applied):
+        exp_buy, exp_sell, exp_ts = bot.compute_signals(df)
+        assert np.allclose(hist_buy, exp_buy) and np.allclose(hist_sell, exp_sell) and np.isclose(current_ts, exp_ts)
+    assert len(other.applied) == 1
+    assert batch.stats["evaluated"] == 3
+
+
+def test_scheduler_waits_for_batched_decisions(tmp_path, make_history):
+    from erendil.trading.scheduler import CloseScheduler
+
+    history = make_history(301, seed=2)
+    bots = [manager(tmp_path, f"S{i}USDT") for i in range(4)]
+    scheduler = CloseScheduler(max_concurrent=2)
+    # A full batch ends the window, which would otherwise hold every close for a minute
+    batch = BatchSignalEvaluator(window=60, max_batch=2)
+
+    async def run():
+        callbacks = [scheduler.callback(bot, batch.callback(bot)) for bot in bots]
+        for onclose in callbacks:
+            await onclose(history)
+        await asyncio.wait_for(scheduler.join(), 5)
+        return [len(bot.applied) for bot in bots]
+
+    assert asyncio.run(run()) == [1] * 4
+    assert batch.stats["batches"] == 2
+
+
+def test_batch_rows_match_per_symbol_results(make_history):
+    from erendil.indicators.buy_sell import BuySellIndicator
+    from erendil.indicators.trailing_stop import TrailingStoploss
+
+    frames = [make_history(500, seed=i) for i in range(6)]
+    indicator, stoploss = BuySellIndicator(), TrailingStoploss()
+    high, low, close = (np.stack([df[column].to_numpy() for df in frames]) for column in ("high", "low", "close"))
+    hist_buy, hist_sell = indicator.process_batch(high, low, close)
+    ts = stoploss.process_batch(high, low, close)
+    for i, df in enumerate(frames):
+        exp_buy, exp_sell = indicator.process_data(df)
+        _, current_ts, _ = stoploss.process_data(df)
+        np.testing.assert_array_equal(hist_buy[i], exp_buy)
+        np.testing.assert_array_equal(hist_sell[i], exp_sell)
+        assert ts[i, -1] == current_ts
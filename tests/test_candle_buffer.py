@@ -0,0 +1,100 @@
+import numpy as np
+import polars as pl
+from erendil.core.candle_buffer import CandleBuffer
+from erendil.exchange.klines import KLINE_COLUMNS, klines_to_polars
+from erendil.indicators.features import FeatureStore
+
+
+def row(i: int) -> list:
+    """Candle i of a 1m series, in KLINE_COLUMNS order, with close == i"""
+    open_ms = 1_700_000_000_000 + i * 60_000
+    return [open_ms * 1000, i, i, i, i, 1.0, (open_ms + 59_999) * 1000, 1.0, 1, 0.5, 0.5]
+
+
+def rest_rows(start: int, stop: int) -> list:
+    rows = []
+    for i in range(start, stop):
+        open_ms = 1_700_000_000_000 + i * 60_000
+        rows.append([open_ms, str(i), str(i), str(i), str(i), "1", open_ms + 59_999, "1", 1, "0.5", "0.5", "0"])
+    return rows
+
+
+def test_frame_outlives_more_than_slack_appends():
+    buffer = CandleBuffer(capacity=5, slack=2)
+    for i in range(5):
+        buffer.append(row(i))
+    frame = buffer.to_polars()
+    close = buffer.view("close")
+
+    for i in range(5, 9):
+        buffer.append(row(i))
+
+    assert frame["close"].to_list() == [0, 1, 2, 3, 4]
+    assert close.tolist() == [0, 1, 2, 3, 4]
+    assert buffer.to_polars()["close"].to_list() == [4, 5, 6, 7, 8]
+
+
+def test_frame_survives_extend_of_a_whole_capacity():
+    buffer = CandleBuffer(capacity=5, slack=2)
+    buffer.extend(klines_to_polars(rest_rows(0, 5)))
+    frame = buffer.to_polars()
+
+    # A gap backfill writes up to `capacity` candles at once
+    buffer.extend(klines_to_polars(rest_rows(5, 10)))
+
+    assert frame["close"].to_list() == [0, 1, 2, 3, 4]
+    assert buffer.to_polars()["close"].to_list() == [5, 6, 7, 8, 9]
+
+
+def test_frame_survives_clear():
+    buffer = CandleBuffer(capacity=5, slack=2)
+    buffer.extend(klines_to_polars(rest_rows(0, 5)))
+    frame = buffer.to_polars()
+
+    buffer.clear()
+    buffer.extend(klines_to_polars(rest_rows(100, 103)))
+
+    assert frame["close"].to_list() == [0, 1, 2, 3, 4]
+    assert buffer.to_polars()["close"].to_list() == [100, 101, 102]
+
+
+def test_ring_is_reused_while_nothing_is_handed_out():
+    buffer = CandleBuffer(capacity=5, slack=2)
+    for i in range(100):
+        buffer.append(row(i))
+    assert buffer.reallocations == 0
+    assert buffer.view("close").tolist() == [95, 96, 97, 98, 99]
+
+    # Handing out a frame every append copies once per `slack` appends at most
+    for i in range(100, 120):
+        buffer.to_polars()
+        buffer.append(row(i))
+    assert buffer.reallocations <= 20 // buffer.slack + 1
+
+
+def test_frame_matches_appended_rows():
+    buffer = CandleBuffer(capacity=3, slack=1)
+    for i in range(10):
+        buffer.append(row(i))
+    frame = buffer.to_polars()
+    assert frame.columns == KLINE_COLUMNS
+    assert frame["close"].to_list() == [7, 8, 9]
+    assert np.array_equal(frame["trades"].to_numpy(), [1, 1, 1])
+    assert buffer.last("close") == 9
+
+
+def test_feature_store_keys_buffer_frames_on_the_version():
+    buffer = CandleBuffer(capacity=5, slack=2)
+    for i in range(5):
+        buffer.append(row(i))
+    store = FeatureStore(buffer)
+    frame = buffer.to_polars()
+    features = store.get(frame)
+    assert store.get(buffer.to_polars()) is features
+
+    # Same length, first/last open_time and close as before, but a different candle in between
+    buffer.clear()
+    buffer.extend(frame.with_columns(high=frame["high"] + pl.Series([0, 0, 1, 0, 0])))
+    assert store.get(buffer.to_polars()) is not features
+    # A frame that did not come from the buffer falls back to its contents
+    assert store.get(frame.clone()) is store.get(frame.clone())
@@ -0,0 +1,51 @@
+import asyncio
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta, timezone
+from erendil.trading import compute
+from erendil.trading.compute import ComputeExecutor
+from erendil.trading.trade_manager import TradeManager
+
+
+def history(n: int, seed: int) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return pl.DataFrame({
+        "open_time": pl.datetime_range(start, start + timedelta(minutes=n - 1), "1m", eager=True, time_zone="UTC"),
+        "high": close * 1.001, "low": close * 0.999, "close": close,
+    })
+
+
+def attached() -> int:
+    """Blocks mapped by the worker this runs in"""
+    return len(compute._attached)
+
+
+def test_workers_unmap_released_blocks(tmp_path):
+    managers = [
+        TradeManager(f"SYM{i}USDT", "1m", incremental=False,
+                     log_file=str(tmp_path / f"{i}_log_file.json"), db_path=str(tmp_path / f"{i}.db"))
+        for i in range(3)
+    ]
+    frames = [history(300, i) for i in range(3)]
+    executor = ComputeExecutor("process", 1)
+
+    async def run():
+        first = await asyncio.gather(*(executor.signals(m, df) for m, df in zip(managers, frames)))
+        mapped = executor._pool.submit(attached).result()
+        for manager in managers[1:]:
+            executor.release(manager)
+        # Outgrows its block, so the worker is sent a new one
+        again = await executor.signals(managers[0], history(600, 0))
+        return first, mapped, again, executor._pool.submit(attached).result()
+
+    try:
+        first, mapped, again, remaining = asyncio.run(run())
+    finally:
+        executor.close()
+    assert mapped == 3
+    assert remaining == 1
+    expected = managers[0].compute_signals(history(600, 0))
+    assert np.allclose(again[0], expected[0][-compute.SIGNAL_TAIL:])
+    assert np.isclose(again[2], expected[2])
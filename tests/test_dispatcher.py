@@ -0,0 +1,24 @@
+import asyncio
+from erendil.exchange.dispatcher import LatestValueDispatcher
+
+
+def test_stop_cancels_the_call_in_flight_and_drops_the_pending_value():
+    async def run():
+        started, seen = asyncio.Event(), []
+
+        async def callback(value):
+            seen.append(value)
+            started.set()
+            await asyncio.sleep(60)
+
+        dispatcher = LatestValueDispatcher(callback)
+        dispatcher.submit(1)
+        await started.wait()
+        dispatcher.submit(2)
+        task = dispatcher._task
+        await asyncio.wait_for(dispatcher.stop(), 1)
+        assert task.cancelled()
+        await asyncio.sleep(0)
+        return seen
+
+    assert asyncio.run(run()) == [1]
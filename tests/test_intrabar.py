@@ -0,0 +1,32 @@
+import numpy as np
+import polars as pl
+from datetime import datetime, timedelta, timezone
+from erendil.backtest.intrabar import IntrabarStops
+
+
+def minutes(n: int) -> pl.DataFrame:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    open_time = pl.datetime_range(start, start + timedelta(minutes=n - 1), "1m", eager=True, time_zone="UTC")
+    return pl.DataFrame({
+        "open_time": open_time,
+        "open": np.full(n, 100.0),
+        "high": np.full(n, 101.0),
+        "low": np.full(n, 99.0),
+        "close": np.full(n, 100.0),
+        "close_time": open_time + timedelta(seconds=59, milliseconds=999),
+    })
+
+
+def test_candle_spanning_more_than_a_chunk_is_read_to_its_close():
+    fine = minutes(20).with_columns(
+        low=pl.when(pl.int_range(pl.len()) == 18).then(90.0).otherwise(pl.col("low"))
+    )
+    # Two 10m strategy candles, the second breaking the stop only in its ninth minute
+    coarse = fine.group_by_dynamic("open_time", every="10m").agg(
+        pl.col("open").first(), pl.col("high").max(), pl.col("low").min(),
+        pl.col("close").last(), pl.col("close_time").last(),
+    )
+    intrabar = IntrabarStops(fine.lazy(), chunk_rows=4)
+    find = intrabar.finder(coarse, np.array([95.0, 95.0]))
+    assert find(0, 2) == (1, 90.0)
+    assert intrabar.chunks_loaded == 3
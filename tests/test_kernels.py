@@ -0,0 +1,124 @@
+import numpy as np
+import polars as pl
+import pytest
+from erendil.indicators import kernels
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.streaming import StreamingBuySellIndicator
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, StoplossParams
+from erendil.models.enums import MAType, SmoothingType
+
+BACKENDS = list(kernels.BACKENDS)
+# Around the numpy backend's block boundaries, and below its two-value cut-over
+LENGTHS = [1, 2, 3, 14, kernels.BLOCK_SIZE - 1, kernels.BLOCK_SIZE, kernels.BLOCK_SIZE + 1,
+           2 * kernels.BLOCK_SIZE, 2 * kernels.BLOCK_SIZE + 1, 5_000]
+PERIODS = [1, 2, 9, 14, 26, 200]
+
+
+def make_series(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+
+
+def loop_ema(data: np.ndarray, length: int) -> np.ndarray:
+    """calculate_ema as it was before the kernels"""
+    alpha = 2.0 / (length + 1)
+    result = np.zeros_like(data)
+    result[0] = data[0]
+    for i in range(1, len(data)):
+        result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
+    return result
+
+
+def loop_rma(data: np.ndarray, length: int) -> np.ndarray:
+    """calculate_atr's Wilder smoothing as it was before the kernels"""
+    result = np.zeros_like(data)
+    result[0] = data[0]
+    for i in range(1, len(data)):
+        result[i] = (result[i-1] * (length - 1) + data[i]) / length
+    return result
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("n", LENGTHS)
+def test_ema_and_rma_match_the_loops(backend, n):
+    x = make_series(n, seed=n)
+    for period in PERIODS:
+        np.testing.assert_allclose(kernels.ema(x, period, backend), loop_ema(x, period), rtol=1e-9)
+        np.testing.assert_allclose(kernels.rma(x, period, backend), loop_rma(x, period), rtol=1e-9)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_rows_of_a_matrix_are_independent(backend):
+    matrix = np.stack([make_series(3 * kernels.BLOCK_SIZE + 5, seed=s) for s in range(4)])
+    expected = np.stack([loop_ema(row, 12) for row in matrix])
+    np.testing.assert_allclose(kernels.ema(matrix, 12, backend), expected, rtol=1e-9)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_empty_input(backend):
+    assert kernels.ema(np.array([]), 12, backend).shape == (0,)
+    assert kernels.rma(np.empty((3, 0)), 14, backend).shape == (3, 0)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("position", [0, 1, kernels.BLOCK_SIZE - 1, kernels.BLOCK_SIZE, 150, 299])
+def test_nan_poisons_only_later_values(backend, position):
+    x = make_series(300)
+    x[position] = np.nan
+    expected = loop_ema(x, 14)
+    actual = kernels.ema(x, 14, backend)
+    assert np.isnan(actual[position:]).all()
+    np.testing.assert_allclose(actual[:position], expected[:position], rtol=1e-9)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_nan_in_one_row_leaves_the_others(backend):
+    matrix = np.stack([make_series(300, seed=s) for s in range(3)])
+    matrix[1, 200] = np.nan
+    actual = kernels.rma(matrix, 14, backend)
+    np.testing.assert_allclose(actual[[0, 2]], np.stack([loop_rma(matrix[0], 14), loop_rma(matrix[2], 14)]), rtol=1e-9)
+    np.testing.assert_allclose(actual[1, :200], loop_rma(matrix[1], 14)[:200], rtol=1e-9)
+
+
+def test_atr_matches_the_wilder_loop():
+    n = 1_000
+    close = make_series(n)
+    high, low = close * 1.002, close * 0.997
+    prev_close = np.concatenate([close[:1], close[:-1]])
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    df = pl.DataFrame({"high": high, "low": low, "close": close})
+    for period in (1, 10, 14):
+        atr = TrailingStoploss(StoplossParams(atr_period=period)).calculate_atr(df)
+        np.testing.assert_allclose(atr, loop_rma(tr, period), rtol=1e-9)
+
+
+@pytest.mark.parametrize("averages", [
+    {"oscillator_ma": MAType.SMA},
+    {"signal_ma": MAType.SMA},
+    {"smoothing": SmoothingType.SMA},
+    {"smoothing": SmoothingType.WMA},
+    {"oscillator_ma": MAType.SMA, "signal_ma": MAType.SMA, "smoothing": SmoothingType.WMA},
+])
+def test_windowed_averages_match_streaming(averages):
+    close = make_series(200)
+    high, low = close * 1.002, close * 0.997
+    params = IndicatorParams(**averages)
+    hist_buy, hist_sell = BuySellIndicator(params).process_batch(np.stack([high]), np.stack([low]), np.stack([close]))
+    assert hist_buy.shape == (1, 200)
+
+    streaming = StreamingBuySellIndicator(params, tail=200)
+    streaming.seed(pl.DataFrame({"high": high, "low": low, "close": close}))
+    warm = len(streaming.hist_buy)
+    # NaN while a windowed average fills, then the streaming values candle by candle
+    assert np.isnan(hist_buy[0, :200 - warm]).all()
+    np.testing.assert_allclose(hist_buy[0, 200 - warm:], streaming.hist_buy, rtol=1e-9)
+    np.testing.assert_allclose(hist_sell[0, 200 - warm:], streaming.hist_sell, rtol=1e-9)
+
+
+def test_invalid_averages_fail_at_construction():
+    assert IndicatorParams(oscillator_ma="SMA", smoothing="WMA").smoothing is SmoothingType.WMA
+    with pytest.raises(ValueError):
+        IndicatorParams(smoothing="HMA")
+    with pytest.raises(ValueError, match="slow_length"):
+        IndicatorParams(slow_length=0)
@@ -0,0 +1,36 @@
+import asyncio
+from erendil.exchange.binance import BinanceKlineManager
+
+
+def row(i: int) -> list:
+    open_ms = 1_700_000_000_000 + i * 60_000
+    return [open_ms * 1000, i, i, i, i, 1.0, (open_ms + 59_999) * 1000, 1.0, 1, 0.5, 0.5]
+
+
+def test_stop_cancels_backfills_and_waits_for_close_callbacks():
+    async def run():
+        decided = []
+
+        async def onclose(df):
+            await asyncio.sleep(0.05)
+            decided.append(df.height)
+
+        async def onmessage(price):
+            pass
+
+        async def backfill_forever(open_time):
+            await asyncio.sleep(60)
+
+        manager = BinanceKlineManager("testusdt", "1m", onclose, onmessage, limit=10)
+        manager.candles.append(row(0))
+        manager._backfill_until = backfill_forever
+        manager.catch_up()
+        await manager.process_data_onclose()
+        await asyncio.sleep(0)
+        assert len(manager._tasks) == 1 and len(manager._callbacks) == 1
+
+        await asyncio.wait_for(manager.stop(), 1)
+        assert not manager._tasks and not manager._callbacks
+        return decided
+
+    assert asyncio.run(run()) == [1]
@@ -0,0 +1,21 @@
+from erendil.database.kline_store import KlineStore
+
+
+def row(i: int) -> list:
+    """Candle i as the websocket decoder hands it over: KLINE_COLUMNS order, epoch-us timestamps"""
+    open_ms = 1_700_000_000_000 + i * 60_000
+    return [open_ms * 1000, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0, (open_ms + 59_999) * 1000, 100.5, 7, 0.5, 50.25]
+
+
+def test_decoded_rows_load_back_like_appended_frames(tmp_path):
+    rows = KlineStore(str(tmp_path / "rows"), "TESTUSDT", "1m")
+    for i in range(3):
+        rows.append_row(row(i))
+    loaded = rows.load()
+    assert loaded["open_time"].dt.epoch("us").to_list() == [row(i)[0] for i in range(3)]
+    assert loaded["close"].to_list() == [100.5, 101.5, 102.5]
+
+    frames = KlineStore(str(tmp_path / "frames"), "TESTUSDT", "1m")
+    frames.append(loaded)
+    assert rows.tail_path.read_text() == frames.tail_path.read_text()
+    assert frames.load().equals(loaded)
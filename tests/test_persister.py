@@ -0,0 +1,31 @@
+import asyncio
+import pytest
+from erendil.database.trade_db import TradeDatabase
+from erendil.database.trade_journal import TradeJournal
+from erendil.trading.persister import TradePersister
+
+
+def trade(i: int) -> dict:
+    return {
+        "action": "BUY", "price": 100.0 + i, "fee": 0.1, "pnl": None, "signal_reason": "Buy signal detected",
+        "position_size": 1.0, "total_invested": 100.0, "entry_price": 100.0, "remaining_position": 1.0,
+        "total_pnl": 0.0, "timestamp": f"2024-01-01T00:00:{i:02d}",
+    }
+
+
+def test_submit_after_close_is_refused(tmp_path):
+    async def run():
+        db = TradeDatabase(str(tmp_path / "trades.db"))
+        await db.initialize()
+        journal = TradeJournal(str(tmp_path / "log.json"), "TESTUSDT", "1m", fsync="never")
+        persister = TradePersister(db, journal, "TESTUSDT", "1m")
+        await persister.submit(trade(0))
+        await persister.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            await persister.submit(trade(1))
+        assert persister._consumer is None
+        await persister.close()
+        return persister.persisted
+
+    assert asyncio.run(run()) == 1
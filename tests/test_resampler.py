@@ -0,0 +1,106 @@
+import asyncio
+import polars as pl
+from erendil.exchange.klines import klines_to_polars
+from erendil.exchange.resampler import MultiTimeframeFeed
+
+START_MS = 1_700_006_400_000  # a 15m (and 1h) boundary
+MINUTE_MS = 60_000
+
+
+def base_rows(start: int, stop: int) -> list:
+    """REST rows of 1m candles with prices varying inside every candle"""
+    rows = []
+    for i in range(start, stop):
+        open_ms = START_MS + i * MINUTE_MS
+        close = 100 + (i * 7919 % 101) / 10
+        rows.append([
+            open_ms, str(close - 0.3), str(close + 0.5 + i % 3), str(close - 0.9 - i % 5), str(close),
+            str(1 + i % 4), open_ms + MINUTE_MS - 1, str(100 + i), 10 + i % 7, str(0.5 + i % 2), str(50 + i), "0",
+        ])
+    return rows
+
+
+def live_row(i: int) -> tuple:
+    """Closed 1m candle as the websocket decoder hands it over (epoch-us timestamps)"""
+    t, o, h, l, c, v, T, q, n, bv, bq, _ = base_rows(i, i + 1)[0]
+    return (t * 1000, float(o), float(h), float(l), float(c), float(v), T * 1000, float(q), n, float(bv), float(bq))
+
+
+def aggregate(base: pl.DataFrame, every: str) -> pl.DataFrame:
+    return (
+        base.sort("open_time")
+        .group_by_dynamic("open_time", every=every, closed="left", label="left")
+        .agg(
+            pl.col("open").first(), pl.col("high").max(), pl.col("low").min(), pl.col("close").last(),
+            pl.col("volume").sum(), pl.col("close_time").last(), pl.col("quote_volume").sum(),
+            pl.col("trades").sum(), pl.col("taker_buy_volume").sum(), pl.col("taker_buy_quote_volume").sum(),
+        )
+    )
+
+
+def assert_candles_equal(derived: pl.DataFrame, expected: pl.DataFrame, interval_ms: int) -> None:
+    expected = expected.with_columns(
+        close_time=pl.col("open_time") + pl.duration(milliseconds=interval_ms - 1)
+    ).select(derived.columns)
+    assert derived["open_time"].to_list() == expected["open_time"].to_list()
+    for name in derived.columns:
+        if derived[name].dtype == pl.Float64:
+            assert (derived[name] - expected[name]).abs().max() < 1e-9, name
+        else:
+            assert derived[name].to_list() == expected[name].to_list(), name
+
+
+async def feed_candles(seed_minutes: int, live_minutes: int) -> tuple:
+    feed = MultiTimeframeFeed("testusdt", base_limit=500)
+    closed = {"5m": [], "15m": []}
+
+    def on_close(interval):
+        async def callback(df):
+            closed[interval].append(df["open_time"][-1])
+        return callback
+
+    async def on_tick(price):
+        pass
+
+    managers = {interval: feed.add_timeframe(interval, on_close(interval), on_tick) for interval in closed}
+    base = klines_to_polars(base_rows(0, seed_minutes))
+    feed.base.historical_data = base
+    # The derived REST history ends one 5m candle behind the base history
+    complete_5m = seed_minutes // 5 - 1
+    managers["5m"].historical_data = aggregate(base, "5m").head(complete_5m).with_columns(
+        close_time=pl.col("open_time") + pl.duration(milliseconds=5 * MINUTE_MS - 1)
+    )
+    for tf in feed.timeframes.values():
+        await feed._seed(tf)
+    feed._last_base_open = int(feed.base.candles.last("open_time"))
+
+    for i in range(seed_minutes, seed_minutes + live_minutes):
+        feed.base.candles.append(live_row(i))
+        await feed._on_base_close(feed.base.historical_data)
+    await asyncio.sleep(0)
+    everything = klines_to_polars(base_rows(0, seed_minutes + live_minutes))
+    return managers, everything, closed
+
+
+def test_derived_candles_match_aggregated_base_candles():
+    managers, base, closed = asyncio.run(feed_candles(seed_minutes=62, live_minutes=58))
+
+    # 62 seed minutes complete 12 5m candles; the REST history had 11
+    five = managers["5m"].historical_data
+    assert len(five) == 120 // 5
+    assert_candles_equal(five, aggregate(base, "5m"), 5 * MINUTE_MS)
+    assert len(closed["5m"]) == len(five) - 11
+
+    # 15m has no history of its own: built from the open 15m candle at seed time
+    fifteen = managers["15m"].historical_data
+    assert fifteen["open_time"][0] == base["open_time"][60]
+    assert_candles_equal(fifteen, aggregate(base.slice(60), "15m"), 15 * MINUTE_MS)
+    assert len(closed["15m"]) == len(fifteen)
+
+
+def test_seed_appends_a_derived_candle_the_rest_history_missed():
+    managers, base, closed = asyncio.run(feed_candles(seed_minutes=30, live_minutes=0))
+    five = managers["5m"].historical_data
+    assert len(five) == 6
+    assert_candles_equal(five, aggregate(base, "5m"), 5 * MINUTE_MS)
+    assert len(closed["5m"]) == 1
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+from erendil.core.candle_buffer import CandleBuffer
+from erendil.trading.runtime import BotConfig, BotRuntime, RuntimeConfig
+
+
+class FakeExchange:
+    """Records subscriptions and control messages; loading a feed takes a while, like a history download"""
+
+    def __init__(self):
+        self.streams = set()
+        self.messages = []
+
+    async def add_symbol_stream(self, symbol, interval, onclose_callback, onmessage_callback, limit, cache_dir,
+                                subscribe=True):
+        await asyncio.sleep(0.05)
+        feed = SimpleNamespace(stream_name=f"{symbol.lower()}@kline_{interval}", candles=CandleBuffer(capacity=limit))
+        if subscribe:
+            await self.add_managers([feed])
+        return feed
+
+    async def add_managers(self, feeds):
+        names = [feed.stream_name for feed in feeds]
+        if self.streams & set(names):
+            raise ValueError(f"Stream already subscribed: {names}")
+        self.streams.update(names)
+        self.messages.append(("SUBSCRIBE", names))
+
+    async def detach_streams(self, streams):
+        await asyncio.sleep(0)
+        names = [f"{symbol.lower()}@kline_{interval}" for symbol, interval in streams]
+        detached = [name for name in names if name in self.streams]
+        self.streams.difference_update(detached)
+        return detached
+
+    async def unsubscribe(self, names):
+        if names:
+            self.messages.append(("UNSUBSCRIBE", names))
+
+    async def start(self):
+        await asyncio.Event().wait()
+
+    async def stop_all(self):
+        self.streams.clear()
+
+
+def runtime(directory) -> BotRuntime:
+    return BotRuntime(RuntimeConfig(bots=[], data_dir=str(directory), cache_dir=None), exchange=FakeExchange())
+
+
+def test_remove_waits_for_a_bot_being_added(tmp_path):
+    async def scenario():
+        bots = runtime(tmp_path)
+        adding = asyncio.create_task(bots.add_bot(BotConfig("BTCUSDT", "1m")))
+        await asyncio.sleep(0)
+        await bots.remove_bot("BTCUSDT", "1m")
+        await adding
+        registry, streams = set(bots.bots), set(bots.exchange.streams)
+        await bots.stop()
+        return registry, streams
+
+    registry, streams = asyncio.run(scenario())
+    assert registry == set()
+    assert streams == set()
+
+
+def test_concurrent_adds_of_one_bot(tmp_path):
+    async def scenario():
+        bots = runtime(tmp_path)
+        bot = BotConfig("BTCUSDT", "1m")
+        results = await asyncio.gather(bots.add_bot(bot), bots.add_bot(bot), return_exceptions=True)
+        registry, streams = set(bots.bots), set(bots.exchange.streams)
+        await bots.stop()
+        return results, registry, streams
+
+    results, registry, streams = asyncio.run(scenario())
+    assert isinstance(results[1], ValueError) and "already running" in str(results[1])
+    assert registry == {"BTCUSDT_1m"}
+    assert streams == {"btcusdt@kline_1m"}
+
+
+def test_bots_are_subscribed_and_stopped_in_one_message(tmp_path):
+    async def scenario():
+        bots = runtime(tmp_path)
+        await bots.apply([BotConfig(f"S{i}USDT", "1m") for i in range(5)])
+        managers = [manager for _, manager, _ in bots.bots.values()]
+        closed = []
+        for manager in managers:
+            close = manager.close
+
+            async def record(manager=manager, close=close):
+                # Trades are written out before Binance is told
+                assert bots.exchange.messages[-1][0] != "UNSUBSCRIBE"
+                await close()
+                closed.append(manager.symbol)
+            manager.close = record
+        await bots.stop()
+        return bots.exchange.messages, closed
+
+    messages, closed = asyncio.run(scenario())
+    assert [(method, len(names)) for method, names in messages] == [("SUBSCRIBE", 5), ("UNSUBSCRIBE", 5)]
+    assert sorted(closed) == [f"S{i}USDT" for i in range(5)]
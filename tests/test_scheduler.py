@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+from erendil.trading.scheduler import CloseScheduler
+
+
+def manager(symbol: str, position: float = 0.0) -> SimpleNamespace:
+    return SimpleNamespace(symbol=symbol, interval="1m", position_log=SimpleNamespace(position=position))
+
+
+def test_every_close_of_a_manager_is_handled_in_order():
+    async def run():
+        scheduler = CloseScheduler(max_concurrent=4)
+        bot = manager("AUSDT")
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(df):
+            await release.wait()
+            handled.append(df)
+
+        for candle in range(3):
+            scheduler.submit(bot, candle, handler)
+            await asyncio.sleep(0)
+        queued = scheduler.stats["queued"]
+        release.set()
+        await scheduler.join()
+        return handled, queued, scheduler.stats
+
+    handled, queued, stats = asyncio.run(run())
+    assert handled == [0, 1, 2]
+    assert queued == 2
+    assert stats["handled"] == 3 and stats["deferred"] == 2 and stats["queued"] == 0
+
+
+def test_priority_is_checked_when_dispatched():
+    async def run():
+        scheduler = CloseScheduler(max_concurrent=1)
+        release = asyncio.Event()
+        order = []
+
+        async def blocker(df):
+            await release.wait()
+
+        async def handler(df):
+            order.append(df)
+
+        scheduler.submit(manager("BUSYUSDT"), None, blocker)
+        flat, held = manager("FLATUSDT"), manager("HELDUSDT", position=1.0)
+        scheduler.submit(flat, "flat", handler)
+        scheduler.submit(held, "held", handler)
+        # A stop-loss exit on a tick while the close is queued
+        held.position_log.position = 0.0
+        release.set()
+        await scheduler.join()
+        return order
+
+    assert asyncio.run(run()) == ["flat", "held"]
+
+
+def test_discard_drops_queued_closes():
+    async def run():
+        scheduler = CloseScheduler(max_concurrent=1)
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(df):
+            await release.wait()
+            handled.append(df)
+
+        bot = manager("AUSDT")
+        for candle in range(3):
+            scheduler.submit(bot, candle, handler)
+        await asyncio.sleep(0)
+        scheduler.discard(bot)
+        release.set()
+        await asyncio.wait_for(scheduler.join(), 1)
+        return handled, scheduler.stats["queued"]
+
+    assert asyncio.run(run()) == ([0], 0)
+
+
+def test_settle_waits_for_a_running_close():
+    async def run():
+        scheduler = CloseScheduler(max_concurrent=1)
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(df):
+            await release.wait()
+            handled.append(df)
+
+        bot = manager("AUSDT")
+        scheduler.submit(bot, 0, handler)
+        await asyncio.sleep(0)
+        scheduler.discard(bot)
+        settling = asyncio.create_task(scheduler.settle(bot))
+        await asyncio.sleep(0.01)
+        waited = not settling.done()
+        release.set()
+        await asyncio.wait_for(settling, 1)
+        return waited, handled
+
+    assert asyncio.run(run()) == (True, [0])
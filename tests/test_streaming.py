@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from erendil.indicators.buy_sell import BuySellIndicator
+from erendil.indicators.streaming import StreamingBuySellIndicator, StreamingTrailingStoploss
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import IndicatorParams, StoplossParams
+
+
+@pytest.mark.parametrize("params", [
+    IndicatorParams(),
+    IndicatorParams(fast_length=5, slow_length=13, signal_length=4, smoothing_length=7, atr_avg_length=6),
+])
+def test_candle_by_candle_matches_batch(make_history, params):
+    history = make_history(400, seed=3)
+    stoploss_params = StoplossParams(atr_period=7, hhv_period=12, multiplier=2.0)
+    indicator, stoploss = StreamingBuySellIndicator(params), StreamingTrailingStoploss(stoploss_params)
+    indicator.seed(history.head(100))
+    stoploss.seed(history.head(100))
+
+    batch, batch_stop = BuySellIndicator(params), TrailingStoploss(stoploss_params)
+    for end in range(101, history.height + 1):
+        high, low, close = (history[column][end - 1] for column in ("high", "low", "close"))
+        indicator.update(high, low, close)
+        stoploss.update(high, low, close)
+        if end % 25 and end != history.height:
+            continue
+        df = history.head(end)
+        hist_buy, hist_sell = batch.process_data(df)
+        ts, current, previous = batch_stop.process_data(df)
+        np.testing.assert_allclose(indicator.hist_buy, hist_buy[-indicator.tail:], rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(indicator.hist_sell, hist_sell[-indicator.tail:], rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(stoploss.ts, ts[-stoploss.tail:], rtol=1e-12)
+        assert stoploss.current == pytest.approx((current, previous), rel=1e-12)
+        # The signal checks see the same pattern
+        assert indicator.check_buy_signal(indicator.hist_buy) == batch.check_buy_signal(hist_buy)
+        assert indicator.check_sell_signal(indicator.hist_sell) == batch.check_sell_signal(hist_sell)
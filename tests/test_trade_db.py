@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from erendil.database.trade_db import TradeDatabase
+
+
+def trade(i: int) -> dict:
+    return {
+        "action": "BUY", "price": 100.0 + i, "fee": 0.1, "pnl": None, "signal_reason": "Buy signal detected",
+        "position_size": 1.0, "total_invested": 100.0, "entry_price": 100.0, "remaining_position": 1.0,
+        "total_pnl": 0.0, "timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}",
+    }
+
+
+def test_burst_is_saved_once(tmp_path):
+    async def run():
+        db = TradeDatabase(str(tmp_path / "trades.db"))
+        await db.initialize()
+        saved = await asyncio.gather(*(db.save_trade(trade(i), "TESTUSDT", "1m") for i in range(50)))
+        again = await db.save_trade(trade(0), "TESTUSDT", "1m")
+        rows = await db.get_trades("TESTUSDT", "1m")
+        await db.close()
+        return saved, again, rows
+
+    saved, again, rows = asyncio.run(run())
+    assert all(saved) and not again
+    assert [row["price"] for row in rows] == [100.0 + i for i in range(50)]
+
+
+def test_failed_rollback_still_answers_every_caller(tmp_path):
+    async def run():
+        db = TradeDatabase(str(tmp_path / "trades.db"))
+        await db.initialize()
+        connection = await db._connection()
+
+        async def fail(*args):
+            raise OSError("disk I/O error")
+
+        connection.commit = fail
+        connection.rollback = fail
+        results = await asyncio.wait_for(
+            asyncio.gather(*(db.insert_trade(trade(i), "TESTUSDT", "1m") for i in range(5)), return_exceptions=True),
+            timeout=5,
+        )
+        await db.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, OSError) for result in results)
+
+
+def test_cancelled_writer_answers_every_caller(tmp_path):
+    async def run():
+        db = TradeDatabase(str(tmp_path / "trades.db"), max_batch=2)
+        await db.initialize()
+        connection = await db._connection()
+        started = asyncio.Event()
+
+        async def slow_commit():
+            started.set()
+            await asyncio.sleep(60)
+
+        connection.commit = slow_commit
+        callers = [asyncio.create_task(db.insert_trade(trade(i), "TESTUSDT", "1m")) for i in range(5)]
+        await started.wait()
+        db._writer.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=5)
+        db._writer = None
+        await db.close()
+        return results
+
+    results = asyncio.run(run())
+    # The batch being committed and the trades queued behind it
+    assert len(results) == 5
+    assert all(isinstance(result, RuntimeError) for result in results)
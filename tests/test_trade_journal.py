@@ -0,0 +1,110 @@
+import json
+from erendil.database.trade_journal import TradeJournal, journal_path, read_trade_log, sealed_path
+
+
+def trade(i: int) -> dict:
+    return {"action": "BUY", "price": 100.0 + i, "seq": i, "signal_reason": "Buy signal detected"}
+
+
+def seqs(log_file) -> list:
+    return [t["seq"] for t in read_trade_log(str(log_file))["trades"]]
+
+
+def test_snapshot_holds_every_trade_in_order(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never", snapshot_every=10)
+    for i in range(1_000):
+        journal.append(trade(i))
+    journal.close()
+
+    assert journal.snapshots > 1
+    data = json.loads(log_file.read_text())
+    assert [t["seq"] for t in data["trades"]] == list(range(1_000))
+    assert (data["symbol"], data["interval"], data["journal_seq"]) == ("TESTUSDT", "1m", 1_000)
+    assert not sealed_path(str(log_file)).exists()
+    assert journal_path(str(log_file)).stat().st_size == 0
+
+
+def test_snapshots_grow_geometrically(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never", snapshot_every=10, snapshot_growth=0.5)
+    for i in range(10_000):
+        journal.append(trade(i))
+        if journal._snapshotter:
+            journal._snapshotter.join()
+    # Each fold waits for the journal to reach half the log: a few dozen, not one per 10 trades
+    assert journal.snapshots < 40
+    journal.close()
+    assert seqs(log_file) == list(range(10_000))
+
+
+def test_legacy_log_is_extended(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    # The shape the bot wrote before the journal existed
+    log_file.write_text(json.dumps({"trades": [trade(i) for i in range(3)], "symbol": "TESTUSDT", "interval": "1m"}, indent=2))
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never")
+    assert journal.append(trade(3)) == 4
+    journal.close()
+
+    data = json.loads(log_file.read_text())
+    assert [t["seq"] for t in data["trades"]] == [0, 1, 2, 3]
+    assert data["journal_seq"] == 4
+
+
+def test_appends_during_a_fold_go_to_a_fresh_journal(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never", snapshot_every=1_000)
+    for i in range(5):
+        journal.append(trade(i))
+    with journal._lock:
+        journal._rotate()
+    journal.append(trade(5))
+    # A reader between the rotation and the fold sees the sealed segment too
+    assert seqs(log_file) == list(range(6))
+
+    journal._fold()
+    assert seqs(log_file) == list(range(6))
+    assert json.loads(log_file.read_text())["journal_seq"] == 5
+    journal.close()
+    assert seqs(log_file) == list(range(6))
+
+
+def test_fold_interrupted_by_a_crash_is_finished_on_restart(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never", snapshot_every=1_000)
+    for i in range(5):
+        journal.append(trade(i))
+    journal.snapshot()
+    for i in range(5, 8):
+        journal.append(trade(i))
+    with journal._lock:
+        journal._rotate()
+    journal.append(trade(8))
+    # Crash: the sealed segment is never folded and a torn line is left behind
+    journal._file.write('{"seq": 10, "tra')
+    journal._file.close()
+
+    recovered = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never")
+    assert not sealed_path(str(log_file)).exists()
+    assert json.loads(log_file.read_text())["journal_seq"] == 8
+    assert recovered.seq == 9
+    assert recovered.append(trade(9)) == 10
+    recovered.close()
+    assert seqs(log_file) == list(range(10))
+
+
+def test_folded_lines_left_in_a_journal_are_skipped(tmp_path):
+    log_file = tmp_path / "TESTUSDT_1m_log_file.json"
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never", snapshot_every=1_000)
+    for i in range(3):
+        journal.append(trade(i))
+    journal.close()
+    # A crash between the fold and the removal of its segment
+    sealed_path(str(log_file)).write_text(
+        "".join(json.dumps({"seq": i + 1, "trade": trade(i)}) + "\n" for i in range(3))
+    )
+
+    journal = TradeJournal(str(log_file), "TESTUSDT", "1m", fsync="never")
+    journal.append(trade(3))
+    journal.close()
+    assert seqs(log_file) == [0, 1, 2, 3]
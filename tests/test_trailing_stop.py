@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from erendil.indicators import kernels
+from erendil.indicators.features import CandleFeatures
+from erendil.indicators.trailing_stop import TrailingStoploss
+from erendil.models.data_models import StoplossParams
+
+
+def loop_process_data(stoploss: TrailingStoploss, df) -> np.ndarray:
+    """The per-row window max and ts recurrence the vectorized version replaced"""
+    close = df['close'].to_numpy()
+    high = df['high'].to_numpy()
+    offset = high - (stoploss.params.multiplier * stoploss.calculate_atr(df))
+
+    highest = np.zeros_like(offset)
+    prev = np.zeros_like(offset)
+    for i in range(len(offset)):
+        start_idx = max(0, i - stoploss.params.hhv_period + 1)
+        highest[i] = np.max(offset[start_idx:i+1])
+        prev[i] = highest[i]
+
+    ts = np.zeros_like(close)
+    for i in range(len(close)):
+        if i < 16:
+            ts[i] = close[i]
+        else:
+            condition = close[i] > highest[i] and close[i] > close[i-1]
+            ts[i] = highest[i] if condition else prev[i]
+        if i + 1 < len(prev):
+            prev[i+1] = ts[i]
+    return ts
+
+
+@pytest.mark.parametrize("n", [1, 15, 17, 2_000])
+@pytest.mark.parametrize("hhv", [1, 10, 100, 1_000])
+def test_vectorized_stop_matches_the_loop(make_history, n, hhv):
+    df = make_history(n, seed=n)
+    stoploss = TrailingStoploss(StoplossParams(hhv_period=hhv))
+    # process_features, as process_data returns nothing for histories shorter than the hhv window
+    np.testing.assert_array_equal(stoploss.process_features(CandleFeatures(df)), loop_process_data(stoploss, df))
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 64, 500])
+def test_rolling_max_matches_windows(window):
+    x = np.random.default_rng(window).normal(size=(3, 300))
+    expected = np.stack([[row[max(0, i - window + 1):i + 1].max() for i in range(len(row))] for row in x])
+    np.testing.assert_array_equal(kernels.rolling_max(x, window), expected)
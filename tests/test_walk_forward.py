@@ -0,0 +1,59 @@
+import polars as pl
+import pytest
+from erendil.backtest.walk_forward import walk_forward
+
+TRAIN, TEST = 600, 200
+GRID = {"fast_length": [8, 12], "slow_length": [21, 26], "multiplier": [2.0, 3.0]}
+
+
+@pytest.fixture
+def histories(make_history):
+    return {f"SYM{i}USDT": make_history(1_400, seed=i, volatility=0.004) for i in range(2)}
+
+
+def test_resume_recomputes_only_missing_windows(tmp_path, histories):
+    checkpoint = tmp_path / "walk_forward.jsonl"
+    full = walk_forward(histories, GRID, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+    assert full.height == 2 * 4
+
+    # Cut back to the fingerprint and half the windows, plus a line torn mid-write
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    kept = 1 + (len(lines) - 1) // 2
+    checkpoint.write_text("".join(lines[:kept]) + lines[-1][:20])
+    resumed = walk_forward(histories, GRID, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+    assert resumed.equals(full)
+    assert len(checkpoint.read_text().splitlines()) == len(lines)
+
+
+def test_checkpoint_of_another_run_is_refused(tmp_path, histories):
+    checkpoint = tmp_path / "walk_forward.jsonl"
+    walk_forward(histories, GRID, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+    with pytest.raises(ValueError, match="different grid"):
+        walk_forward(histories, GRID, TRAIN + TEST, TEST, processes=2, checkpoint=str(checkpoint))
+
+
+def test_windows_over_changed_candles_are_recomputed(tmp_path, histories):
+    checkpoint = tmp_path / "walk_forward.jsonl"
+    full = walk_forward(histories, GRID, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+
+    # Only the last window covers the last TEST candles
+    history = histories["SYM0USDT"]
+    changed = dict(histories, SYM0USDT=pl.concat([history[:-TEST], history[-TEST:].with_columns(pl.col("close") * 1.01)]))
+    rerun = walk_forward(changed, GRID, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+    fresh = walk_forward(changed, GRID, TRAIN, TEST, processes=2)
+    assert rerun.equals(fresh)
+    differs = rerun.join(full, on=["symbol", "window"], suffix="_before").filter(
+        pl.col("test_pnl") != pl.col("test_pnl_before")
+    )
+    assert differs.select("symbol", "window").rows() == [("SYM0USDT", full["window"].max())]
+
+
+@pytest.mark.parametrize("grid", [
+    {"fast_length": [26], "slow_length": [12]},
+    {"multiplier": []},
+])
+def test_grid_without_combinations_is_refused(tmp_path, histories, grid):
+    checkpoint = tmp_path / "walk_forward.jsonl"
+    with pytest.raises(ValueError, match="no parameter combinations"):
+        walk_forward(histories, grid, TRAIN, TEST, processes=2, checkpoint=str(checkpoint))
+    assert not checkpoint.exists()